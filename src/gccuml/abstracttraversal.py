@@ -8,7 +8,7 @@
 
 import os
 from collections import deque, namedtuple
-from typing import List, Tuple, Any, Set
+from typing import List, Tuple, Any, Set, Callable, Iterable, Dict
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -70,6 +70,68 @@ def get_nodes_from_graph(node, traversal: GraphAbstractTraversal):
     return container.container
 
 
+def find_strongly_connected_components(
+    nodes_list: Iterable[Any], get_subnodes: Callable[[Any], Iterable[Any]], get_node_id: Callable[[Any], Any] = id
+) -> List[List[Any]]:
+    """Find strongly connected components of graph using iterative Tarjan's algorithm.
+
+    Components are returned in reverse topological order, so each component
+    is preceded by all components reachable from it.
+    """
+    index_dict: Dict[Any, int] = {}
+    lowlink_dict: Dict[Any, int] = {}
+    on_stack: Set[Any] = set()
+    nodes_stack: List[Any] = []
+    ret_list: List[List[Any]] = []
+
+    def visit_node(node):
+        node_id = get_node_id(node)
+        node_index = len(index_dict)
+        index_dict[node_id] = node_index
+        lowlink_dict[node_id] = node_index
+        nodes_stack.append(node)
+        on_stack.add(node_id)
+        return (node, node_id, iter(get_subnodes(node)))
+
+    for start_node in nodes_list:
+        if get_node_id(start_node) in index_dict:
+            continue
+        work_stack = [visit_node(start_node)]
+        while work_stack:
+            _node, node_id, subnodes_iter = work_stack[-1]
+            descended = False
+            for sub_node in subnodes_iter:
+                sub_id = get_node_id(sub_node)
+                if sub_id not in index_dict:
+                    work_stack.append(visit_node(sub_node))
+                    descended = True
+                    break
+                if sub_id in on_stack:
+                    lowlink_dict[node_id] = min(lowlink_dict[node_id], index_dict[sub_id])
+            if descended:
+                continue
+
+            ## all subnodes visited
+            work_stack.pop()
+            if work_stack:
+                parent_id = work_stack[-1][1]
+                lowlink_dict[parent_id] = min(lowlink_dict[parent_id], lowlink_dict[node_id])
+            if lowlink_dict[node_id] != index_dict[node_id]:
+                continue
+            ## node is root of component
+            component = []
+            while True:
+                item = nodes_stack.pop()
+                item_id = get_node_id(item)
+                on_stack.discard(item_id)
+                component.append(item)
+                if item_id == node_id:
+                    break
+            ret_list.append(component)
+
+    return ret_list
+
+
 # ===========================================================
 
 
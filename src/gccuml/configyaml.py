@@ -7,8 +7,9 @@
 #
 
 import os
+import re
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Set
 import glob
 import yaml
 
@@ -27,6 +28,8 @@ TOP_LEVEL_ITEMS = {
     "query_driver",
     "user_data",
     "diagrams",
+    "jobs",
+    "parse_cache_directory",
 }
 
 
@@ -151,6 +154,82 @@ class Filter:
 
         return True
 
+    def check_include_element(self, element_name: str, source_path: str = None) -> bool:
+        """Check if element (e.g. function) passes filter.
+
+        Supports 'namespaces', 'elements' and 'paths' rules. Rule item can be string
+        or regex given as dict with 'r' key (clang-uml style). Every include rule present
+        in config have to be satisfied.
+        """
+        if element_name is None:
+            element_name = ""
+        element_name = element_name.removeprefix("::")
+        ns_string = element_name.rpartition("::")[0]
+
+        if match_rule_list(self.exclude_dict.get("namespaces"), ns_string, match_substring=True):
+            return False
+        if match_rule_list(self.exclude_dict.get("elements"), element_name):
+            return False
+
+        include_namespaces = self.include_dict.get("namespaces")
+        if include_namespaces and not match_rule_list(include_namespaces, ns_string, match_substring=True):
+            return False
+        include_elements = self.include_dict.get("elements")
+        if include_elements and not match_rule_list(include_elements, element_name):
+            return False
+
+        return self.check_include_path(source_path)
+
+    def has_path_rules(self) -> bool:
+        return bool(self.include_dict.get("paths") or self.exclude_dict.get("paths"))
+
+    def check_include_path(self, source_path: str) -> bool:
+        """Check if source path (with or without line number) passes 'paths' rules."""
+        if source_path:
+            ## remove line number
+            source_path = source_path.rpartition(":")[0] or source_path
+        if source_path and match_rule_list(self.exclude_dict.get("paths"), source_path, match_prefix=True):
+            return False
+        include_paths = self.include_dict.get("paths")
+        if include_paths:
+            if not source_path:
+                return False
+            if not match_rule_list(include_paths, source_path, match_prefix=True):
+                return False
+        return True
+
+    def get_source_entries_ids(self, content) -> Set[str]:
+        """Return ids of entries of 'content' (LangContent) placed in paths passing the filter.
+
+        Returns None if there is no 'paths' rule, so all entries are accepted.
+        """
+        if not self.has_path_rules():
+            return None
+        return content.get_entries_ids_by_source(self.check_include_path)
+
+
+## rule item is string or dict with regex under 'r' key
+def match_rule_list(rules_list, value: str, match_substring=False, match_prefix=False) -> bool:
+    if not rules_list:
+        return False
+    for rule_item in rules_list:
+        if isinstance(rule_item, dict):
+            regex = rule_item.get("r")
+            if regex is None:
+                _LOGGER.warning("unsupported filter rule: %s", rule_item)
+                continue
+            if re.fullmatch(regex, value):
+                return True
+            continue
+        rule_item = str(rule_item).removeprefix("::")
+        if match_substring and rule_item in value:
+            return True
+        if match_prefix and value.startswith(rule_item):
+            return True
+        if rule_item == value:
+            return True
+    return False
+
 
 def join_paths(base_dir, child_dir):
     if os.path.isabs(child_dir):
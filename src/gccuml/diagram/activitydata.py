@@ -147,3 +147,25 @@ class SubGraph(ActivityData):
 
     def append(self, item):
         self.subitems.append(item)
+
+
+## count statements (nodes) contained in given data (item or list of items)
+def count_statements(data) -> int:
+    counter = 0
+    items_stack = [data]
+    while items_stack:
+        item = items_stack.pop()
+        if item is None:
+            continue
+        if isinstance(item, (list, tuple)):
+            items_stack.extend(item)
+            continue
+        if isinstance(item, Statement):
+            counter += 1
+        sub_items = getattr(item, "items", None)
+        if sub_items:
+            items_stack.append(sub_items)
+        sub_items = getattr(item, "subitems", None)
+        if sub_items:
+            items_stack.append(sub_items)
+    return counter
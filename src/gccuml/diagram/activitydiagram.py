@@ -12,7 +12,9 @@ from typing import Dict
 
 from gccuml.diagram import activitydata
 from gccuml.diagram.plantuml.activitydiagram import ActivityDiagramGenerator as PlantUmlGenerator
+from gccuml.diagram.plantuml.activitydiagram import generate_index_diagram as generate_plantuml_index
 from gccuml.diagram.graphviz.activitygraph import ActivityGraphGenerator as DotGenerator
+from gccuml.diagram.graphviz.activitygraph import generate_index_graph as generate_dot_index
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -38,3 +40,15 @@ def generate_dot(data_dict: Dict[str, activitydata.ActivityData], out_path):
 def generate_plantuml(data_dict: Dict[str, activitydata.ActivityData], out_path):
     generator = PlantUmlGenerator(data_dict)
     generator.generate(out_path)
+
+
+## generate diagram linking items to their diagram files
+## 'index_dict' is dict of pairs: item label -> relative path of item diagram
+def generate_index(engine: str, index_dict: Dict[str, str], out_path):
+    if engine == "dot":
+        generate_dot_index(index_dict, out_path)
+        return
+    if engine == "plantuml":
+        generate_plantuml_index(index_dict, out_path)
+        return
+    raise RuntimeError(f"unknown engine: {engine}")
@@ -495,3 +495,21 @@ class ActivityGraphGenerator:
         temporary_dot = "/tmp/graph.dot"
         self.generate(temporary_dot)
         graphviz.render("dot", format="svg", filepath=temporary_dot, outfile=out_path)
+
+
+def generate_index_graph(index_dict: Dict[str, str], out_path):
+    dotgraph = graphviz.Digraph()
+    dotgraph.attr(None, {"rankdir": "LR", "fontname": "SansSerif,sans-serif"})
+    node_attr = {
+        "shape": "box",
+        "style": "filled, rounded",
+        "fillcolor": activitydata.NODE_COLOR,
+        "fontsize": "10",
+        "fontname": "SansSerif,sans-serif",
+    }
+    dotgraph.attr("node", node_attr)
+    for item_index, (item_label, item_path) in enumerate(index_dict.items()):
+        dotgraph.node(f"item_{item_index}", label=item_label, href=item_path)
+    content = dotgraph.source
+    _LOGGER.info("writing output to file %s", out_path)
+    write_file(out_path, content)
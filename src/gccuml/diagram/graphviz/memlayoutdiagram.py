@@ -9,7 +9,7 @@ import os
 import logging
 from enum import Enum, auto
 from typing import NamedTuple
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import html
 
 from showgraph.io import write_file
@@ -64,6 +64,10 @@ class MemoryLayoutDiagramGenerator:
             self.memory_layout = {}
         self.content_list = []
         self.actors_set = set()
+        ## (struct name, field name) -> index of field
+        self.fields_index: Dict[Tuple[str, str], int] = {}
+        ## struct name -> name of template (only for template instantiations)
+        self.template_names: Dict[str, str] = {}
 
     def generate(self, out_path, graphnote=None):
         if not self.memory_layout:
@@ -77,6 +81,7 @@ digraph memory_layout {
             return
 
         self.content_list = []
+        self._index_structs()
 
         ##
         ## generate
@@ -145,6 +150,18 @@ ranksep = 2
         _LOGGER.info("writing output to file %s", out_path)
         write_file(out_path, content)
 
+    def _index_structs(self):
+        self.fields_index = {}
+        self.template_names = {}
+        for struct_data in self.memory_layout.values():
+            struct_name = struct_data.name
+            template_name, template_sep, _ = struct_name.partition("<")
+            if template_sep:
+                self.template_names[struct_name] = template_name
+            for field_index, field_item in enumerate(struct_data.fields):
+                ## first struct and field of given name
+                self.fields_index.setdefault((struct_name, field_item[0]), field_index)
+
     def _add_nodes(self):
         self.actors_set = set()
 
@@ -201,10 +218,9 @@ ranksep = 2
             if struct_name not in self.actors_set:
                 continue
 
-            template_parts = struct_name.split("<")
-            if len(template_parts) > 1:
+            template_name = self.template_names.get(struct_name)
+            if template_name is not None:
                 # template instantiation detected - connect to template
-                template_name = template_parts[0]
                 self._add_connection(struct_name, "-1", template_name, "-1")
 
             for field_index, field_item in enumerate(struct_data.fields):
@@ -239,15 +255,7 @@ ranksep = 2
         )
 
     def _find_field_index(self, struct_type, struct_field):
-        for struct_data in self.memory_layout.values():
-            struct_name = struct_data.name
-            if struct_type != struct_name:
-                continue
-            for field_index, field_item in enumerate(struct_data.fields):
-                field_name = field_item[0]
-                if field_name == struct_field:
-                    return field_index
-        return -1
+        return self.fields_index.get((struct_type, struct_field), -1)
 
     def _add_connection(self, from_item, from_port, to_item, to_port, style=None):
         from_actor_id = name_to_id(from_item)
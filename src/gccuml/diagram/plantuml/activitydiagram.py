@@ -624,3 +624,16 @@ stop
 
         _LOGGER.info("writing output to file %s", out_path)
         write_file(out_path, content)
+
+
+def generate_index_diagram(index_dict: Dict[str, str], out_path):
+    content_list = ["@startuml", ""]
+    if not index_dict:
+        content_list.append("note as N1\nEmpty graph\nend note")
+    for item_index, (item_label, item_path) in enumerate(index_dict.items()):
+        item_label = item_label.replace('"', "'")
+        content_list.append(f'rectangle "{item_label}" as item_{item_index} [[{item_path}]]')
+    content_list.append("\n@enduml\n")
+    content = "\n".join(content_list)
+    _LOGGER.info("writing output to file %s", out_path)
+    write_file(out_path, content)
@@ -9,11 +9,12 @@ import os
 import logging
 from enum import Enum, auto
 from typing import NamedTuple, Tuple
-from typing import List, Dict
+from typing import List, Dict, Set, Iterable
 from dataclasses import dataclass
 
 from showgraph.io import write_file
 
+from gccuml.io import open_output_file
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -46,17 +47,26 @@ class ClassDiagramGenerator:
             self._item_id = itemid
             self._name: str = name
             self.bases: List[ClassDiagramGenerator.ClassBase] = []
-            self.fields: List[ClassDiagramGenerator.ClassField] = []
             self.methods: List[ClassDiagramGenerator.ClassMethod] = []
             self.generics: List[str] = []  # template parameters
 
             self.aliasof: ClassDiagramGenerator.TypeAlias = None
-            self.inner_types: List[ClassDiagramGenerator.TypeAlias] = []
+
+            ## fields and inner types are indexed, so they should be added by 'add_field' and 'add_inner'
+            self._fields: List[ClassDiagramGenerator.ClassField] = []
+            self._front_fields: List[ClassDiagramGenerator.ClassField] = []  # added to front, in reversed order
+            self._fields_names: Set[str] = set()
+            self._inner_types: List[ClassDiagramGenerator.TypeAlias] = []
+            self._inner_ids: Set[str] = set()
 
         @property
         def item_id(self):
             return self._item_id
 
+        @item_id.setter
+        def item_id(self, var):
+            self._item_id = var
+
         @property
         def name(self):
             return self.get_name()
@@ -71,21 +81,61 @@ class ClassDiagramGenerator:
                 return f"""{self._name}<{gen_str}>"""
             return self._name
 
+        @property
+        def fields(self) -> List["ClassDiagramGenerator.ClassField"]:
+            if self._front_fields:
+                self._front_fields.reverse()
+                self._fields = self._front_fields + self._fields
+                self._front_fields = []
+            return self._fields
+
+        @fields.setter
+        def fields(self, fields_list: List["ClassDiagramGenerator.ClassField"]):
+            self._fields = fields_list
+            self._front_fields = []
+            self._fields_names = {field_def.name for field_def in fields_list}
+
+        @property
+        def inner_types(self) -> List["ClassDiagramGenerator.TypeAlias"]:
+            return self._inner_types
+
+        @inner_types.setter
+        def inner_types(self, inner_list: List["ClassDiagramGenerator.TypeAlias"]):
+            self._inner_types = inner_list
+            self._inner_ids = {inner_def.item_id for inner_def in inner_list}
+
+        ## 'front' places field before already added fields
+        def add_field(self, field_def: "ClassDiagramGenerator.ClassField", front=False):
+            if front:
+                ## merged on access to 'fields', so adding is not quadratic
+                self._front_fields.append(field_def)
+            else:
+                self.fields.append(field_def)
+            self._fields_names.add(field_def.name)
+
+        def add_inner(self, inner_def: "ClassDiagramGenerator.TypeAlias"):
+            self._inner_types.append(inner_def)
+            self._inner_ids.add(inner_def.item_id)
+
         def has_field(self, field_name):
-            for field_def in self.fields:
-                if field_def.name == field_name:
-                    return True
-            return False
+            return field_name in self._fields_names
 
         def has_inner(self, item_id: str):
-            for inner_def in self.inner_types:
-                if inner_def.item_id == item_id:
-                    return True
-            return False
+            return item_id in self._inner_ids
 
-    FunctionArg = NamedTuple("FunctionArg", [("name", str), ("type", str)])
-    ClassBase = NamedTuple("ClassBase", [("item_id", str), ("name", str), ("access", str)])
-    TypeAlias = NamedTuple("TypeAlias", [("item_id", str), ("name", str)])
+    ## tuples are defined as nested classes, so they can be pickled (passed to subprocesses)
+    class FunctionArg(NamedTuple):
+        name: str
+        type: str
+
+    class ClassBase(NamedTuple):
+        item_id: str
+        name: str
+        access: str
+
+    class TypeAlias(NamedTuple):
+        item_id: str
+        name: str
 
     @dataclass
     class ClassField:
@@ -98,18 +148,18 @@ class ClassDiagramGenerator:
         bitfield_size: int = None  ## None if regular variable (no bitfield)
         value: str = None  ## None if no explicit (default) value
 
-    ClassMethod = NamedTuple(
-        "ClassMethod",
-        [
-            ("name", str),
-            ("type", str),
-            ("modifier", str),
-            ("access", str),
-            ("args", List[FunctionArg]),
-            ("static", bool),
-        ],
-    )
-    Connection = NamedTuple("Connection", [("from_class", str), ("to_class", str), ("label", str)])
+    class ClassMethod(NamedTuple):
+        name: str
+        type: str
+        modifier: str
+        access: str
+        args: List["ClassDiagramGenerator.FunctionArg"]
+        static: bool
+
+    class Connection(NamedTuple):
+        from_class: str
+        to_class: str
+        label: str
 
     FIELD_ACCESS_DICT = {"private": "-", "protected": "#", "package private": "~", "public": "+"}
 
@@ -127,7 +177,7 @@ class ClassDiagramGenerator:
 
     def add_class_field(self, class_name, field_data: ClassField):
         class_data: ClassDiagramGenerator.ClassData = self.class_items[class_name]
-        class_data.fields.append(field_data)
+        class_data.add_field(field_data)
 
     def add_class_method(self, class_name, method_data: ClassMethod):
         class_data: ClassDiagramGenerator.ClassData = self.class_items[class_name]
@@ -144,14 +194,16 @@ class ClassDiagramGenerator:
             write_file(out_path, content)
             return
 
-        # generate
-        content_list = []
-        content_list.append(
-            """\
-@startuml
-"""
-        )
-
+        _LOGGER.info("writing output to file %s", out_path)
+        ## lines are written while generated, so whole diagram is not kept in memory
+        with open_output_file(out_path) as out_file:
+            out_file.write("@startuml\n\n")
+            for line in self._generate_lines():
+                out_file.write(line)
+                out_file.write("\n")
+            out_file.write("\n@enduml\n")
+
+    def _generate_lines(self) -> Iterable[str]:
         handled_nodes = set()
 
         ##
@@ -172,13 +224,13 @@ class ClassDiagramGenerator:
             #     gen_string = ", ".join(class_data.generics)
             #     gen_string = f"<{gen_string}> "
 
-            content_list.append(f"""class "{actor}" as {actor_id} {gen_string}{struct_spot}{{""")
+            yield f"""class "{actor}" as {actor_id} {gen_string}{struct_spot}{{"""
 
-            self._generate_fields(class_data, content_list)
+            yield from self._generate_fields(class_data)
 
-            self._generate_methods(class_data, content_list)
+            yield from self._generate_methods(class_data)
 
-            content_list.append("}")
+            yield "}"
 
         ## add bases and aliases
         for class_data in self.class_items.values():
@@ -189,7 +241,7 @@ class ClassDiagramGenerator:
                 handled_nodes.add(actor_id)
                 # actor = base.item_id + " " + base.name
                 actor = base.name
-                content_list.append(f"""class "{actor}" as {actor_id}""")
+                yield f"""class "{actor}" as {actor_id}"""
 
             for inner_type in class_data.inner_types:
                 actor_id = inner_type.item_id
@@ -198,7 +250,7 @@ class ClassDiagramGenerator:
                 handled_nodes.add(actor_id)
                 # actor = inner_type.item_id + " " + inner_type.name
                 actor = inner_type.name
-                content_list.append(f"""class "{actor}" as {actor_id}""")
+                yield f"""class "{actor}" as {actor_id}"""
 
             alias_type = class_data.aliasof
             if alias_type:
@@ -206,9 +258,9 @@ class ClassDiagramGenerator:
                 handled_nodes.add(actor_id)
                 # actor = alias_type.item_id + " " + alias_type.name
                 actor = alias_type.name
-                content_list.append(f"""class "{actor}" as {actor_id}""")
+                yield f"""class "{actor}" as {actor_id}"""
 
-        content_list.append("")
+        yield ""
 
         ##
         ## add connections
@@ -221,36 +273,25 @@ class ClassDiagramGenerator:
             for base in class_data.bases:
                 to_id = base.item_id
                 if base.access:
-                    content_list.append(f"""' {from_class} --|> {base.name}""")
-                    content_list.append(f""""{from_id}" --|> "{to_id}": "{base.access}\"""")
+                    yield f"""' {from_class} --|> {base.name}"""
+                    yield f""""{from_id}" --|> "{to_id}": "{base.access}\""""
                 else:
-                    content_list.append(f"""' {from_class} ..> {base.name}: spec.""")
-                    content_list.append(f""""{from_id}" ..> "{to_id}": spec.""")
+                    yield f"""' {from_class} ..> {base.name}: spec."""
+                    yield f""""{from_id}" ..> "{to_id}": spec."""
 
             for inner_type in class_data.inner_types:
                 to_id = inner_type.item_id
-                content_list.append(f"""' {from_class} *--> {inner_type.name}""")
-                content_list.append(f""""{from_id}" *--> "{to_id}\"""")
+                yield f"""' {from_class} *--> {inner_type.name}"""
+                yield f""""{from_id}" *--> "{to_id}\""""
 
             ## connect alias
             aliased_type: ClassDiagramGenerator.TypeAlias = class_data.aliasof
             if aliased_type:
                 to_id = aliased_type.item_id
-                content_list.append(f"""' {from_class} ..> {aliased_type.name}""")
-                content_list.append(f""""{from_id}" ..> "{to_id}\": alias""")
-
-        ##
-        ## close diagram
-        ##
-        content_list.append("\n@enduml\n")
-        content = "\n".join(content_list)
-
-        # print(f"\ndiagram:\n{content}")
-
-        _LOGGER.info("writing output to file %s", out_path)
-        write_file(out_path, content)
+                yield f"""' {from_class} ..> {aliased_type.name}"""
+                yield f""""{from_id}" ..> "{to_id}\": alias"""
 
-    def _generate_fields(self, class_data, content_list):
+    def _generate_fields(self, class_data) -> Iterable[str]:
         for field_item in class_data.fields:
             field_name = field_item.name
             field_type = field_item.type
@@ -276,12 +317,12 @@ class ClassDiagramGenerator:
             if field_value is not None:
                 value_string = f" = {field_value}"
 
-            content_list.append(
+            yield (
                 f"""    {{field}} {static_marker}{access_mark} {field_type}"""
                 f""" {field_name}{bitfield_string}{value_string}"""
             )
 
-    def _generate_methods(self, class_data, content_list):
+    def _generate_methods(self, class_data) -> Iterable[str]:
         for method_item in class_data.methods:
             method_name, method_type, method_mod, method_access, method_args, method_static = method_item
             access_mark = self.FIELD_ACCESS_DICT.get(method_access)
@@ -318,7 +359,7 @@ class ClassDiagramGenerator:
                 # in UML static method is marked as underscored
                 static_marker = "{static} "
 
-            content_list.append(
+            yield (
                 f"""    {{method}} {static_marker}{abstract_mark}{access_mark}{method_mod_prefix} {method_type}"""
                 f""" {method_name}({args_string}) {method_mod_suffix}"""
             )
@@ -7,8 +7,9 @@
 #
 
 import os
+import time
 import logging
-from typing import Dict, List, Tuple, Any, Set
+from typing import Dict, List, Tuple, Any, Set, Generator
 
 from gccuml.langcontent import (
     LangContent,
@@ -220,6 +221,10 @@ class EntryExpression:
         return stat_list
 
 
+## handler of expression entry - yields sub-entries to evaluate and receives their results
+ExpressionWork = Generator[Entry, EntryExpression, EntryExpression]
+
+
 class SwitchContext:
 
     def __init__(self):
@@ -293,10 +298,26 @@ class SwitchContext:
         return (label_id, case_value, self.recent_case_fallthrough, self.recent_case_stats)
 
 
+class AnalysisLimitError(RuntimeError):
+    """Raised when analysis exceeds given budget."""
+
+
+class AnalysisTimeLimitError(AnalysisLimitError):
+    """Raised when analysis exceeds given time."""
+
+
 class ScopeAnalysis:
 
-    def __init__(self, content: LangContent):
+    ## how often (in visited nodes) elapsed time is checked
+    TIME_CHECK_INTERVAL = 256
+
+    def __init__(self, content: LangContent, max_nodes: int = None, max_time: float = None):
         self.content = content
+        ## budget of analysis - None means no limit
+        self.max_nodes: int = max_nodes
+        self.max_time: float = max_time  ## in seconds
+        self.visited_nodes = 0
+        self.start_time = time.monotonic()
         self.vars: List[Tuple[str, str]] = []
         self.var_defs: Dict[str, Any] = {}
         self.scope_vars: Set[str] = set()
@@ -308,25 +329,64 @@ class ScopeAnalysis:
         self.decl_expr_counter = -1
 
     def analyze(self, statement_entry: Entry) -> List[ActivityData]:
+        self.start_time = time.monotonic()
+        return self._evaluate(self._analyze_scope(statement_entry))
+
+    def handle_var(self, var_decl: Entry) -> EntryExpression:
+        return self._evaluate(self._handle_var(var_decl))
+
+    ## Evaluate expression tree without recursion.
+    ##
+    ## Handlers are generators: instead of calling '_analyze_func' for sub-entry they yield the sub-entry
+    ## and receive its 'EntryExpression' as result of 'yield'. Pending handlers are kept on explicit
+    ## stack, so depth of analyzed expression is not limited by Python's recursion limit.
+    def _evaluate(self, root_work: Generator[Entry, EntryExpression, Any]) -> Any:
+        work_stack = [root_work]
+        sub_result = None
+        while True:
+            curr_work = work_stack[-1]
+            try:
+                sub_entry = curr_work.send(sub_result)
+            except StopIteration as work_end:
+                ## handler completed - pass result to parent handler
+                work_stack.pop()
+                sub_result = work_end.value
+                if not work_stack:
+                    return sub_result
+                continue
+            self._visit_node()
+            work_stack.append(self._analyze_func(sub_entry))
+            sub_result = None
+
+    def _visit_node(self):
+        self.visited_nodes += 1
+        if self.max_nodes is not None and self.visited_nodes > self.max_nodes:
+            raise AnalysisLimitError(f"visited nodes limit exceeded: {self.max_nodes}")
+        if self.max_time is not None and self.visited_nodes % self.TIME_CHECK_INTERVAL == 0:
+            elapsed_time = time.monotonic() - self.start_time
+            if elapsed_time > self.max_time:
+                raise AnalysisTimeLimitError(f"time limit exceeded: {self.max_time}s")
+
+    def _analyze_scope(self, statement_entry: Entry) -> Generator[Entry, EntryExpression, List[ActivityData]]:
         type_name = statement_entry.get_type()
         if type_name != "bind_expr":
-            entry_expr = self._analyze_func(statement_entry)
+            entry_expr = yield statement_entry
             return entry_expr.statements
         # new scope
-        self._read_var_defs(statement_entry)
+        yield from self._read_var_defs(statement_entry)
         body_entry = statement_entry.get("body")
-        entry_expr = self._analyze_func(body_entry)
+        entry_expr = yield body_entry
         return entry_expr.statements
 
-    def _read_var_defs(self, bind_expr: Entry):
+    def _read_var_defs(self, bind_expr: Entry) -> ExpressionWork:
         bind_vars = bind_expr.get_sub_entries("vars")
         for _var_prop, var_item in bind_vars:
             var_name = get_entry_name(var_item, default_ret="/*anon*/")
-            decl_entry_expr = self.handle_var(var_item)
+            decl_entry_expr = yield from self._handle_var(var_item)
             decl_expr = decl_entry_expr.expression
             self.vars.append((var_name, decl_expr))
 
-    def handle_var(self, var_decl: Entry) -> EntryExpression:
+    def _handle_var(self, var_decl: Entry) -> ExpressionWork:
         var_name = get_entry_name(var_decl, None)
         if var_name is None:
             entry_id = var_decl.get_id()
@@ -339,7 +399,7 @@ class ScopeAnalysis:
         if not init_entry:
             decl_expr = f"{type_label} {var_name}"
             return EntryExpression(decl_expr)
-        init_entry_expr = self._analyze_func(init_entry)
+        init_entry_expr = yield init_entry
         init_expr = init_entry_expr.expression
         if init_expr is None:
             decl_expr = f"{type_label} {var_name}"
@@ -348,7 +408,7 @@ class ScopeAnalysis:
         init_entry_expr.expression = decl_expr
         return init_entry_expr
 
-    def _analyze_func(self, statement_entry: Entry) -> EntryExpression:
+    def _analyze_func(self, statement_entry: Entry) -> ExpressionWork:
         if statement_entry is None:
             return EntryExpression()
 
@@ -358,27 +418,27 @@ class ScopeAnalysis:
             return entry_expr
 
         ## tcc_unary
-        entry_expr = self._handle_unary(statement_entry)
+        entry_expr = yield from self._handle_unary(statement_entry)
         if entry_expr:
             return entry_expr
 
         ## tcc_binary
-        entry_expr = self._handle_binary(statement_entry)
+        entry_expr = yield from self._handle_binary(statement_entry)
         if entry_expr:
             return entry_expr
 
         ## tcc_comparison
-        entry_expr = self._handle_comparison(statement_entry)
+        entry_expr = yield from self._handle_comparison(statement_entry)
         if entry_expr:
             return entry_expr
 
         ## tcc_statement
-        entry_expr = self._handle_statement(statement_entry)
+        entry_expr = yield from self._handle_statement(statement_entry)
         if entry_expr:
             return entry_expr
 
         ## tcc_expression
-        entry_expr = self._handle_expression(statement_entry)
+        entry_expr = yield from self._handle_expression(statement_entry)
         if entry_expr:
             return entry_expr
 
@@ -407,12 +467,12 @@ class ScopeAnalysis:
         if type_name == "array_ref":
             stat_list = []
             op0_entry = statement_entry.get("op 0")  ## element
-            op0_entry_expr = self._analyze_func(op0_entry)
+            op0_entry_expr = yield op0_entry
             stat_list.extend(op0_entry_expr.statements)
             op0_expr = op0_entry_expr.expression
 
             op1_entry = statement_entry.get("op 1")  ## index
-            op1_entry_expr = self._analyze_func(op1_entry)
+            op1_entry_expr = yield op1_entry
             stat_list.extend(op1_entry_expr.statements)
             op1_expr = op1_entry_expr.expression
             return EntryExpression(f"{op0_expr}[{op1_expr}]", stat_list)
@@ -424,11 +484,11 @@ class ScopeAnalysis:
                 return EntryExpression(member_name)
             ## access to unnamed member (base class)
             op0_entry = statement_entry.get("op 0")
-            return self._analyze_func(op0_entry)
+            return (yield op0_entry)
 
         if type_name == "indirect_ref":
             op_entry = statement_entry.get("op 0")
-            op0_entry_expr = self._analyze_func(op_entry)
+            op0_entry_expr = yield op_entry
             op0_expr = op0_entry_expr.expression
             op0_entry_expr.expression = f"(*{op0_expr})"
             return op0_entry_expr
@@ -440,13 +500,13 @@ class ScopeAnalysis:
 
         if type_name == "constructor":
             # array and object initialization
-            return self._handle_constructor(statement_entry)
+            return (yield from self._handle_constructor(statement_entry))
 
         if type_name == "statement_list":
             index_entries = get_index_entries(statement_entry)
             stat_list = []
             for index_item in index_entries:
-                item_entry_expr = self._analyze_func(index_item)
+                item_entry_expr = yield index_item
                 stat_list.extend(item_entry_expr.statements)
             return EntryExpression(statements=stat_list)
 
@@ -456,13 +516,13 @@ class ScopeAnalysis:
             return EntryExpression(statements=[statement])
 
         ## tcc_declaration
-        entry_expr = self._handle_declaration(statement_entry)
+        entry_expr = yield from self._handle_declaration(statement_entry)
         if entry_expr:
             return entry_expr
 
         ## tcc_vl_exp
         if type_name == "call_expr":
-            return self._handle_call(statement_entry)
+            return (yield from self._handle_call(statement_entry))
 
         if type_name == "aggr_init_expr":
             # return self._handle_call(statement_entry)
@@ -480,7 +540,7 @@ class ScopeAnalysis:
         node.color = "#orange"
         return EntryExpression(statements=[node])
 
-    def _handle_statement(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_statement(self, statement_entry: Entry) -> ExpressionWork:
         is_code_class = is_entry_code_class(statement_entry, "tcc_statement")
         if not is_code_class:
             return EntryExpression()
@@ -489,7 +549,7 @@ class ScopeAnalysis:
 
         if type_name == "try_block":
             try_entry_expr = EntryExpression(valid=True)
-            self._handle_try_block(statement_entry, try_entry_expr.statements)
+            yield from self._handle_try_block(statement_entry, try_entry_expr.statements)
             return try_entry_expr
 
         ## case_label_expr - case from switch inside code block
@@ -551,25 +611,25 @@ class ScopeAnalysis:
             return EntryExpression(statements=[statement])
 
         if type_name == "switch_expr":
-            return self._handle_switch(statement_entry)
+            return (yield from self._handle_switch(statement_entry))
 
         if type_name == "switch_stmt":
             ## rare item
-            return self._handle_switch(statement_entry)
+            return (yield from self._handle_switch(statement_entry))
 
         if type_name == "return_expr":
-            return self._handle_return(statement_entry)
+            return (yield from self._handle_return(statement_entry))
 
         if type_name in ("try_finally_expr"):
             try_entry = statement_entry.get("op 0")
-            op0_entry_expr = self._analyze_func(try_entry)
+            op0_entry_expr = yield try_entry
             op0_expr = op0_entry_expr.expression
             try_list = op0_entry_expr.statements
             if not try_list:
                 try_list.append(TypedStatement(op0_expr))
 
             finally_entry = statement_entry.get("op 1")
-            op1_entry_expr = self._analyze_func(finally_entry)
+            op1_entry_expr = yield finally_entry
             finally_list = op1_entry_expr.statements
             op1_expr = op1_entry_expr.expression
             if not finally_list:
@@ -606,7 +666,7 @@ class ScopeAnalysis:
 
         if type_name == "using_stmt":
             namespace_entry = statement_entry.get("nmsp")
-            return self._analyze_func(namespace_entry)
+            return (yield namespace_entry)
 
         _LOGGER.error("unhandled statement type %s %s", statement_entry.get_id(), type_name)
 
@@ -616,9 +676,9 @@ class ScopeAnalysis:
         node.color = "#orange"
         return EntryExpression(statements=[node])
 
-    def _handle_try_block(self, statement_entry: Entry, stat_list: List[Any]):
+    def _handle_try_block(self, statement_entry: Entry, stat_list: List[Any]) -> ExpressionWork:
         body_entry = statement_entry.get("body")
-        try_entry_expr = self._analyze_func(body_entry)
+        try_entry_expr = yield body_entry
         try_stat_list = try_entry_expr.statements
 
         try_fin_grp = StatementList()
@@ -645,7 +705,7 @@ class ScopeAnalysis:
                 else:
                     catch_name = f"{catch_type} {catch_name}"
             hand_body_entry = hand_body_entry.get("body")
-            body_entry_expr = self._analyze_func(hand_body_entry)
+            body_entry_expr = yield hand_body_entry
             hand_stat_list = body_entry_expr.statements
             catch_group = LabeledGroup(f"catch: {catch_name}", hand_stat_list)
             try_fin_grp.append(catch_group)
@@ -670,7 +730,7 @@ class ScopeAnalysis:
         entry_repr = get_entry_repr(statement_entry)
         return EntryExpression(entry_repr)
 
-    def _handle_unary(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_unary(self, statement_entry: Entry) -> ExpressionWork:
         is_code_class = is_entry_code_class(statement_entry, "tcc_unary")
         if not is_code_class:
             return EntryExpression()
@@ -685,7 +745,7 @@ class ScopeAnalysis:
         if cast_op_data:
             cast_op = cast_op_data[0]
             op0_entry = statement_entry.get("op 0")
-            op0_entry_expr = self._analyze_func(op0_entry)
+            op0_entry_expr = yield op0_entry
             op0_expr = op0_entry_expr.expression
             var_type = statement_entry.get("type")
             type_label = get_type_entry_name(var_type)
@@ -703,11 +763,11 @@ class ScopeAnalysis:
         if not op_sign_right:
             op_sign_right = ""
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr = self._analyze_func(op0_entry)
+        op0_entry_expr = yield op0_entry
         op0_expr = op0_entry_expr.expression
         return EntryExpression(f"{op_sign_left}{op0_expr}{op_sign_right}", op0_entry_expr.statements)
 
-    def _handle_binary(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_binary(self, statement_entry: Entry) -> ExpressionWork:
         is_code_class = is_entry_code_class(statement_entry, "tcc_binary")
         if not is_code_class:
             return EntryExpression()
@@ -721,19 +781,22 @@ class ScopeAnalysis:
         stat_list: List[ActivityData] = []
 
         ## convert binary tree into Reverse Polish Notation
+        ## top of 'op_queue' is it's last element, opening parenthesis are only counted
+        ## (instead of inserting at front of 'ret_seq') to keep long chains linear
         op_queue = []
         left_visited = set()
         ret_seq = []
+        open_parenthesis = 0
         # prev_sign = None
         op_queue.append(statement_entry)
         while op_queue:
-            curr_item = op_queue[0]
+            curr_item = op_queue[-1]
 
             curr_type_name = curr_item.get_type()
             op_data = OP_BINARY_DICT.get(curr_type_name)
             if op_data is None:
-                op_queue.pop(0)
-                op0_entry_expr = self._analyze_func(curr_item)
+                op_queue.pop()
+                op0_entry_expr = yield curr_item
                 stat_list.extend(op0_entry_expr.statements)
                 continue
 
@@ -751,10 +814,10 @@ class ScopeAnalysis:
                 op0_entry = curr_item.get("op 0")
                 op0_binary = is_entry_code_class(op0_entry, "tcc_binary")
                 if op0_binary:
-                    op_queue.insert(0, op0_entry)
+                    op_queue.append(op0_entry)
                     continue
 
-                op0_entry_expr = self._analyze_func(op0_entry)
+                op0_entry_expr = yield op0_entry
                 stat_list.extend(op0_entry_expr.statements)
                 op0_expr = op0_entry_expr.expression
                 if op0_expr is None:
@@ -767,18 +830,18 @@ class ScopeAnalysis:
                 ret_seq.append(op_sign)
             else:
                 ret_seq.append(f" {op_sign} ")
-            op_queue.pop(0)
+            op_queue.pop()
 
             op1_entry = curr_item.get("op 1")
             op1_binary = is_entry_code_class(op1_entry, "tcc_binary")
             if op1_binary:
-                op_queue.insert(0, op1_entry)
+                op_queue.append(op1_entry)
                 continue
 
             # is_stronger = self._is_stronger(op_sign, prev_sign)
             # op_sign = prev_sign
 
-            op1_entry_expr = self._analyze_func(op1_entry)
+            op1_entry_expr = yield op1_entry
             stat_list.extend(op1_entry_expr.statements)
             op1_expr = op1_entry_expr.expression
             if op1_expr is None:
@@ -792,7 +855,7 @@ class ScopeAnalysis:
             #     ret_seq.insert(0, "(")
             #     ret_seq.append(op1_expr)
             #     ret_seq.append(")")
-            ret_seq.insert(0, "(")
+            open_parenthesis += 1
             ret_seq.append(op1_expr)
 
             op_sign_end = op_data[2]
@@ -801,6 +864,7 @@ class ScopeAnalysis:
 
             ret_seq.append(")")
 
+        ret_seq = ["("] * open_parenthesis + ret_seq
         if ret_seq:
             ## remove unnecessary parenthesis
             ret_seq = ret_seq[1:]
@@ -809,7 +873,7 @@ class ScopeAnalysis:
         expr_str = "".join(ret_seq)
         return EntryExpression(expr_str, stat_list)
 
-    def _handle_comparison(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_comparison(self, statement_entry: Entry) -> ExpressionWork:
         is_code_class = is_entry_code_class(statement_entry, "tcc_comparison")
         if not is_code_class:
             return EntryExpression()
@@ -829,12 +893,12 @@ class ScopeAnalysis:
         stat_list: List[ActivityData] = []
 
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr = self._analyze_func(op0_entry)
+        op0_entry_expr = yield op0_entry
         stat_list.extend(op0_entry_expr.statements)
         op0_expr = op0_entry_expr.expression
 
         op1_entry = statement_entry.get("op 1")
-        op1_entry_expr = self._analyze_func(op1_entry)
+        op1_entry_expr = yield op1_entry
         stat_list.extend(op1_entry_expr.statements)
         op1_expr = op1_entry_expr.expression
 
@@ -843,16 +907,16 @@ class ScopeAnalysis:
         return EntryExpression(f"{op0_expr} {op_sign} {op1_expr}", stat_list)
 
     # pylint: disable=R0912
-    def _handle_expression(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_expression(self, statement_entry: Entry) -> ExpressionWork:
         is_code_class = is_entry_code_class(statement_entry, "tcc_expression")
         if not is_code_class:
             return EntryExpression()
 
-        other_entry_exp = self._handle_expression_op1(statement_entry)
+        other_entry_exp = yield from self._handle_expression_op1(statement_entry)
         if other_entry_exp:
             return other_entry_exp
 
-        other_entry_exp = self._handle_expression_op2(statement_entry)
+        other_entry_exp = yield from self._handle_expression_op2(statement_entry)
         if other_entry_exp:
             return other_entry_exp
 
@@ -874,32 +938,32 @@ class ScopeAnalysis:
             if op_set.intersection(type_set):
                 ## regular "if" expression
                 if_entry_expr = EntryExpression(valid=True)
-                self._handle_if(statement_entry, if_entry_expr.statements)
+                yield from self._handle_if(statement_entry, if_entry_expr.statements)
                 return if_entry_expr
 
             ## ternary operator
-            ternary_expr = self._handle_ternary(statement_entry)
+            ternary_expr = yield from self._handle_ternary(statement_entry)
             if ternary_expr is not None:
                 return ternary_expr
 
             ## regular "if" expression
             if_entry_expr = EntryExpression(valid=True)
-            self._handle_if(statement_entry, if_entry_expr.statements)
+            yield from self._handle_if(statement_entry, if_entry_expr.statements)
             return if_entry_expr
 
         if type_name == "init_expr":
-            return self._handle_init(statement_entry)
+            return (yield from self._handle_init(statement_entry))
 
         if type_name == "compound_expr":
             stat_list = []
             op0_entry = statement_entry.get("op 0")  # the first value is ignored
-            op0_entry_expr = self._analyze_func(op0_entry)
+            op0_entry_expr = yield op0_entry
             stat_list.extend(op0_entry_expr.statements)
             op0_expr = op0_entry_expr.expression
             if op0_expr:
                 stat_list.append(TypedStatement(op0_expr))
             op1_entry = statement_entry.get("op 1")  # the second value is used
-            op1_entry_expr = self._analyze_func(op1_entry)
+            op1_entry_expr = yield op1_entry
             stat_list.extend(op1_entry_expr.statements)
             op1_expr = op1_entry_expr.expression
             return EntryExpression(f"{op1_expr}", stat_list)
@@ -907,9 +971,9 @@ class ScopeAnalysis:
         if type_name == "target_expr":
             ## initialization of variable (mostly)
             decl_entry = statement_entry.get("decl")
-            decl_expr: EntryExpression = self._analyze_func(decl_entry)
+            decl_expr: EntryExpression = yield decl_entry
             init_entry = statement_entry.get("init")
-            init_expr: EntryExpression = self._analyze_func(init_entry)
+            init_expr: EntryExpression = yield init_entry
             if not decl_expr or not decl_expr.expression:
                 expr = init_expr.expression
                 return EntryExpression(expr)
@@ -922,7 +986,7 @@ class ScopeAnalysis:
 
         if type_name == "addr_expr":
             op_entry = statement_entry.get("op 0")
-            item_entry_expr = self._analyze_func(op_entry)
+            item_entry_expr = yield op_entry
             item_expr = item_entry_expr.expression
             if item_expr is not None:
                 if op_entry.get_type() == "string_cst":
@@ -934,21 +998,21 @@ class ScopeAnalysis:
             # new scope
             # scope_analysis = ScopeAnalysis(self.content)
             # bind_list = scope_analysis.analyze(statement_entry)
-            bind_list = self.analyze(statement_entry)
+            bind_list = yield from self._analyze_scope(statement_entry)
             return EntryExpression(statements=bind_list)
 
         if type_name == "throw_expr":
             op0_entry = statement_entry.get("op 0")
-            return self._analyze_func(op0_entry)
+            return (yield op0_entry)
 
         if type_name == "must_not_throw_expr":
             body_entry = statement_entry.get("body")
-            return self._analyze_func(body_entry)
+            return (yield body_entry)
 
         if type_name == "expr_stmt":
             stat_list = []
             expr_entry = statement_entry.get("expr")
-            entry_expr = self._analyze_func(expr_entry)
+            entry_expr = yield expr_entry
             stat_list.extend(entry_expr.statements)
             expr = entry_expr.expression
             if expr is not None:
@@ -959,11 +1023,11 @@ class ScopeAnalysis:
         if type_name == "cleanup_point_expr":
             ## new scope
             op0_entry = statement_entry.get("op 0")
-            return self._analyze_func(op0_entry)
+            return (yield op0_entry)
 
         if type_name == "save_expr":
             op0_entry = statement_entry.get("op 0")
-            return self._analyze_func(op0_entry)
+            return (yield op0_entry)
 
         if type_name == "typeid_expr":
             ##TODO: no data in dump file
@@ -978,7 +1042,7 @@ class ScopeAnalysis:
 
         return EntryExpression()
 
-    def _handle_expression_op1(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_expression_op1(self, statement_entry: Entry) -> ExpressionWork:
         type_name = statement_entry.get_type()
         op_data = OP1_EXPR_DICT.get(type_name)
         if not op_data:
@@ -989,13 +1053,13 @@ class ScopeAnalysis:
         if not op_sign_right:
             op_sign_right = ""
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr: EntryExpression = self._analyze_func(op0_entry)
+        op0_entry_expr: EntryExpression = yield op0_entry
         op0_expr = op0_entry_expr.expression
         op0_expr = f"{op_sign_left}{op0_expr}{op_sign_right}"
         op0_entry_expr.expression = op0_expr
         return op0_entry_expr
 
-    def _handle_expression_op2(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_expression_op2(self, statement_entry: Entry) -> ExpressionWork:
         type_name = statement_entry.get_type()
         op_data = OP2_EXPR_DICT.get(type_name)
         if op_data is None:
@@ -1010,12 +1074,12 @@ class ScopeAnalysis:
         stat_list: List[ActivityData] = []
 
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr = self._analyze_func(op0_entry)
+        op0_entry_expr = yield op0_entry
         stat_list.extend(op0_entry_expr.statements)
         op0_expr = op0_entry_expr.expression
 
         op1_entry = statement_entry.get("op 1")
-        op1_entry_expr = self._analyze_func(op1_entry)
+        op1_entry_expr = yield op1_entry
         stat_list.extend(op1_entry_expr.statements)
         op1_expr = op1_entry_expr.expression
 
@@ -1023,7 +1087,7 @@ class ScopeAnalysis:
             return EntryExpression(f"{op_before}{op0_expr}{op_sign}{op1_expr}{op_after}", stat_list)
         return EntryExpression(f"{op0_expr} {op_sign} {op1_expr}", stat_list)
 
-    def _handle_declaration(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_declaration(self, statement_entry: Entry) -> ExpressionWork:
         is_code_class = is_entry_code_class(statement_entry, "tcc_declaration")
         if not is_code_class:
             return EntryExpression()
@@ -1077,7 +1141,7 @@ class ScopeAnalysis:
             # expr = f"{var_type} {var_name}"
             # return EntryExpression(expr)
 
-            var_expr: EntryExpression = self.handle_var(statement_entry)
+            var_expr: EntryExpression = yield from self._handle_var(statement_entry)
             stat_list = var_expr.get_all_statements()
             # return EntryExpression(var_expr.expression, stat_list)
 
@@ -1109,16 +1173,16 @@ class ScopeAnalysis:
         node.color = "#orange"
         return EntryExpression(statements=[node])
 
-    def _handle_init(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_init(self, statement_entry: Entry) -> ExpressionWork:
         stat_list: List[ActivityData] = []
 
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr = self._analyze_func(op0_entry)
+        op0_entry_expr = yield op0_entry
         stat_list.extend(op0_entry_expr.statements)
         op0_expr = op0_entry_expr.expression
 
         op1_entry = statement_entry.get("op 1")
-        op1_entry_expr = self._analyze_func(op1_entry)
+        op1_entry_expr = yield op1_entry
         stat_list.extend(op1_entry_expr.statements)
         op1_expr = op1_entry_expr.expression
 
@@ -1126,13 +1190,13 @@ class ScopeAnalysis:
             return EntryExpression(op1_expr, stat_list)
         return EntryExpression(f"{op0_expr} = {op1_expr}", stat_list)
 
-    def _handle_return(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_return(self, statement_entry: Entry) -> ExpressionWork:
         expr_entry = statement_entry.get("expr")
         if expr_entry is None:
             stop_stat = TypedStatement(None, StatementType.STOP)
             return EntryExpression(statements=[stop_stat])
 
-        expr_entry_expr = self._analyze_func(expr_entry)
+        expr_entry_expr = yield expr_entry
         expr_expr = expr_entry_expr.expression
         ret_expr = f"return {expr_expr}"
         stop_stat = TypedStatement(ret_expr, StatementType.STOP)
@@ -1148,7 +1212,7 @@ class ScopeAnalysis:
         func_name = "::".join(name_list)
         return EntryExpression(func_name)
 
-    def _handle_call(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_call(self, statement_entry: Entry) -> ExpressionWork:
         func_name = "???"
         call_name, is_meth = self._get_call_expr_name(statement_entry)
         if call_name is not None:
@@ -1167,7 +1231,7 @@ class ScopeAnalysis:
         params_list = []
         arg_entries = get_index_entries(statement_entry)
         for arg_item in arg_entries:
-            arg_entry_expr = self._analyze_func(arg_item)
+            arg_entry_expr = yield arg_item
             stat_list.extend(arg_entry_expr.statements)
             arg_expr = arg_entry_expr.expression
             if arg_expr is not None:
@@ -1278,64 +1342,66 @@ class ScopeAnalysis:
             func_name = get_entry_repr(func_decl)
         return (func_name, is_meth)
 
-    def _handle_constructor(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_constructor(self, statement_entry: Entry) -> ExpressionWork:
         init_list = []
         items_num = int(statement_entry.get("lngt"))
-        data_list = statement_entry.get_ordered_tuples(["idx", "val"])
-        if len(data_list) != items_num:
-            raise RuntimeError("invalid number of values in entry: {statement_entry}")
+        ## stream tuples - initializers can be huge
+        data_iter = statement_entry.iter_ordered_tuples(["idx", "val"])
+        index = -1
         # stat_list: List[ActivityData] = []
-        for index, data_item in enumerate(data_list):
+        for index, data_item in enumerate(data_iter):
             data_idx = data_item[0]
             data_val = data_item[1]
             idx_expr = str(index)
             if data_idx:
-                idx_entry_expr = self._analyze_func(data_idx)
+                idx_entry_expr = yield data_idx
                 # stat_list.extend(idx_entry_expr.statements)
                 idx_expr = idx_entry_expr.expression
                 if not idx_entry_expr:
                     idx_expr = str(index)
-            val_entry_expr = self._analyze_func(data_val)
+            val_entry_expr = yield data_val
             # stat_list.extend(val_entry_expr.statements)
             val_expr = val_entry_expr.expression
             item_expr = f"[{idx_expr}] = {val_expr}"
             init_list.append(item_expr)
+        if index + 1 != items_num:
+            raise RuntimeError(f"invalid number of values in entry: {statement_entry}")
         whole_expr = ", ".join(init_list)
         return EntryExpression(f"{{{whole_expr}}}")
 
-    def _handle_if(self, statement_entry: Entry, stat_list: List[ActivityData]):
+    def _handle_if(self, statement_entry: Entry, stat_list: List[ActivityData]) -> ExpressionWork:
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr = self._analyze_func(op0_entry)
+        op0_entry_expr = yield op0_entry
         stat_list.extend(op0_entry_expr.statements)
         op0_expr = op0_entry_expr.expression
         if_node = TypedStatement(op0_expr, StatementType.IF)
 
         op1_entry = statement_entry.get("op 1")  ## true branch
-        op1_entry_expr = self._analyze_func(op1_entry)
+        op1_entry_expr = yield op1_entry
         true_stats = op1_entry_expr.statements
         if_node.items.append(true_stats)
 
         op2_entry = statement_entry.get("op 2")  ## false branch
-        op2_entry_expr = self._analyze_func(op2_entry)
+        op2_entry_expr = yield op2_entry
         false_stats = op2_entry_expr.statements
         if_node.items.append(false_stats)
 
         stat_list.append(if_node)
 
-    def _handle_ternary(self, statement_entry: Entry):
+    def _handle_ternary(self, statement_entry: Entry) -> ExpressionWork:
         op0_entry = statement_entry.get("op 0")
-        op0_entry_expr = self._analyze_func(op0_entry)
+        op0_entry_expr = yield op0_entry
         op0_expr = op0_entry_expr.expression
 
         op1_entry = statement_entry.get("op 1")  ## true branch
-        op1_entry_expr = self._analyze_func(op1_entry)
+        op1_entry_expr = yield op1_entry
         true_stats = op1_entry_expr.expression
         if true_stats is None:
             ## will fallthrough to IF handler
             return None
 
         op2_entry = statement_entry.get("op 2")  ## false branch
-        op2_entry_expr = self._analyze_func(op2_entry)
+        op2_entry_expr = yield op2_entry
         false_stats = op2_entry_expr.expression
         if false_stats is None:
             ## will fallthrough to IF handler
@@ -1344,7 +1410,7 @@ class ScopeAnalysis:
         ternary_expr = f"{op0_expr} ? {true_stats} : {false_stats}"
         return EntryExpression(ternary_expr)
 
-    def _handle_switch(self, statement_entry: Entry) -> EntryExpression:
+    def _handle_switch(self, statement_entry: Entry) -> ExpressionWork:
         body_entry = statement_entry
         while True:
             next_body_entry = body_entry.get("body")
@@ -1361,7 +1427,7 @@ class ScopeAnalysis:
         self.switch_stack.append(switch_context)
 
         cond_entry = statement_entry.get("cond")
-        cond_entry_expr = self._analyze_func(cond_entry)
+        cond_entry_expr = yield cond_entry
         cond_expr = cond_entry_expr.expression
         switch_context.set_condition(cond_expr)
 
@@ -1402,7 +1468,7 @@ class ScopeAnalysis:
 
             ## add regular branch
             # TODO: is should be fixed, because "while" from ctrl_switch1.cpp" is missing
-            entry_expr = self._analyze_func(case_entry)
+            entry_expr = yield case_entry
             case_stats = entry_expr.statements
             switch_context.add_statements(case_stats)
 
@@ -8,15 +8,19 @@
 
 import os
 import logging
+import gzip
 
 import json
 
-
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
 _LOGGER = logging.getLogger(__name__)
 
 
+## size of buffer of output files written in parts
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+
 ## read content from file
 def read_file(file_path=None):
     if not os.path.isfile(file_path):
@@ -70,6 +74,15 @@ def write_file(file_path, content):
         content_file.write(content)
 
 
+## open text file for writing content in parts
+## if path ends with ".gz", then content is compressed with gzip
+def open_output_file(file_path):
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, "wt", encoding="utf-8")
+    # pylint: disable=R1732
+    return open(file_path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+
+
 def prepare_filesystem_name(name):
     new_name = name
     new_name = new_name.replace("/", "_")
@@ -149,9 +149,8 @@ def find_class_vtable_var_decl(content: LangContent, record_entry: Entry) -> Ent
 def get_vtable_entries(vtable_var_decl: Entry) -> Dict[int, Entry]:
     tab_dict = {}
     var_init = vtable_var_decl.get("init")
-    items_num = int(var_init.get("lngt"))
-    data_list = var_init.get_indexed_tuples(["idx", "val"], items_num)
-    for index, data_item in enumerate(data_list):
+    data_iter = var_init.iter_ordered_tuples(["idx", "val"])
+    for index, data_item in enumerate(data_iter):
         data_idx = data_item[0]
         data_val = data_item[1]
         idx_expr = index
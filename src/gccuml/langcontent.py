@@ -7,12 +7,23 @@
 #
 
 import logging
-from typing import Dict, List, Any, Tuple
+import hashlib
+import html
+import sys
+import itertools
+from typing import Dict, List, Any, Tuple, Set, Iterable, Callable
 from collections import namedtuple
 import pprint
 
 from munch import Munch
 
+try:
+    import numpy
+except ImportError:
+    ## optional, required only by 'EntryGraphCSR'
+    numpy = None
+
+from gccuml.parallel import map_jobs
 from gccuml.abstracttraversal import (
     GraphAbstractTraversal,
     get_nodes_from_tree,
@@ -21,6 +32,7 @@ from gccuml.abstracttraversal import (
     BreadthFirstTreeTraversal,
     get_nodes_from_tree_ancestors,
     TreeAbstractTraversal,
+    find_strongly_connected_components,
 )
 
 
@@ -28,6 +40,9 @@ from gccuml.abstracttraversal import (
 
 _LOGGER = logging.getLogger(__name__)
 
+## marks missing value of indexed key
+_MISSING = object()
+
 
 class Entry(Munch):
     """Base project representing entry in lang raw file.
@@ -38,7 +53,12 @@ class Entry(Munch):
     def __init__(self, props_dict):
         self._id = None
         self._type = None
-        self._raw: List[Tuple[str, Any]] = []  # props list is needed in "constructor" entry type
+        # order of properties is needed in "constructor" entry type, None for entries added during conversion
+        self._raw: List[str] = None
+        # values of repeated properties, also accessible by legacy keys "{prop}_0", "{prop}_1" etc.
+        self._lists: Dict[str, List[Any]] = None
+        # items of "tree_vec" entry, also accessible by legacy keys "0", "1" etc.
+        self._vector: List[Entry] = None
         self._chains: Dict[str, List[Entry]] = {}
         self._chained = False  # is chain converted?
         super().__init__(props_dict)
@@ -46,12 +66,83 @@ class Entry(Munch):
     # prevents recursive error
     def __str__(self) -> str:
         obj_dict = dict(self)
+        if self._lists or self._vector:
+            ## present repeated properties and vector items by indexed keys
+            obj_dict = {key: val for key, val in obj_dict.items() if is_entry_prop_internal(key)}
+            obj_dict.update(sorted(self.iter_props(), key=lambda item: item[0]))
+        obj_dict["_raw"] = list(self.get_raw_items())
+        del obj_dict["_lists"]
+        del obj_dict["_vector"]
+        obj_dict.pop("_escaped", None)
+        if self._type == "string_cst" and "strg" in obj_dict:
+            strg_value = get_string_cst_value(self)
+            obj_dict["strg"] = strg_value
+            obj_dict["_raw"] = [(key, strg_value if key == "strg" else val) for key, val in obj_dict["_raw"]]
         return obj_dict.__str__()
 
     # prevents recursive error
     def __repr__(self) -> str:
         return f"<Entry {self._id} {self._type}>"
 
+    ## resolves legacy indexed keys ("{prop}_0", "0" etc.) in array operator
+    def __missing__(self, key):
+        value = self._get_indexed(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return self._get_indexed(key, default)
+
+    ## iterate over properties including legacy indexed keys of repeated properties and vector items
+    def iter_props(self) -> Iterable[Tuple[str, Any]]:
+        yield from self.items()
+        lists_dict = dict.get(self, "_lists")
+        if lists_dict:
+            for prop, prop_list in lists_dict.items():
+                for index, prop_val in enumerate(prop_list):
+                    yield f"{prop}_{index}", prop_val
+        vector_items = dict.get(self, "_vector")
+        if vector_items:
+            for index, item in enumerate(vector_items):
+                yield str(index), item
+
+    def _get_indexed(self, key, default=None):
+        if not isinstance(key, str):
+            return default
+        if key.isdigit():
+            container = dict.get(self, "_vector")
+            index = key
+        else:
+            lists_dict = dict.get(self, "_lists")
+            if not lists_dict:
+                return default
+            prop, _, index = key.rpartition("_")
+            if not index.isdigit():
+                return default
+            container = lists_dict.get(prop)
+        if not container:
+            return default
+        index = int(index)
+        if index >= len(container):
+            return default
+        return container[index]
+
+    def _set_indexed(self, key, value) -> bool:
+        if key.isdigit():
+            container = dict.get(self, "_vector")
+            index = key
+        else:
+            lists_dict = dict.get(self, "_lists") or {}
+            prop, _, index = key.rpartition("_")
+            container = lists_dict.get(prop)
+        if not container or not index.isdigit() or int(index) >= len(container):
+            return False
+        container[int(index)] = value
+        return True
+
     def get_id(self):
         return self._id
 
@@ -64,68 +155,78 @@ class Entry(Munch):
     def set_chained(self, value: bool):
         self._chained = value
 
+    def is_chained(self) -> bool:
+        return self._chained
+
     def get_list(self, prop):
         prop_item = self.get(prop)
         if prop_item is not None:
             return [prop_item]
 
-        ret_list = []
-        item_index = 0
-        while True:
-            index_str = f"{prop}_{item_index}"
-            item_index += 1
-            item_entry = self.get(index_str)
-            if item_entry is None:
-                break
-            ret_list.append(item_entry)
+        prop_list = self.get_prop_list(prop)
+        if prop_list:
+            return list(prop_list)
 
-        if not ret_list:
-            entry_chains = self.get_chains()
-            prop_items = entry_chains.get(prop, [])
-            ret_list.extend(prop_items)
+        entry_chains = self.get_chains()
+        prop_items = entry_chains.get(prop, [])
+        return list(prop_items)
 
-        return ret_list
+    ## returns values of repeated property (empty list if property is not repeated)
+    def get_prop_list(self, prop) -> List[Any]:
+        if not self._lists:
+            return []
+        return self._lists.get(prop, [])
+
+    ## returns items of "tree_vec" entry or None if entry is not vector
+    def get_vector(self) -> List["Entry"]:
+        return self._vector
 
     def get_ordered_tuples(self, props_list: List[str]) -> List[List[Any]]:
+        return list(self.iter_ordered_tuples(props_list))
+
+    def iter_ordered_tuples(self, props_list: List[str]) -> Iterable[List[Any]]:
+        """Iterate over tuples of given properties in order of raw file.
+
+        Next tuple starts when property repeats or goes before the last one found
+        (e.g. "idx" and "val" pairs of "constructor" entry).
+        """
         if not self._raw:
             # empty or extra added entry (during graph conversion)
             ret_tuple = []
             for prop in props_list:
                 prop_val = self.get(prop)
                 ret_tuple.append(prop_val)
-            return [ret_tuple]
+            yield ret_tuple
+            return
 
         # regular entry
-        ret_list = []
+        slots_dict = {prop: prop_index for prop_index, prop in enumerate(props_list)}
         tuple_size = len(props_list)
-        ret_tuple = [None] * tuple_size
-        found_list = [False] * tuple_size
-        for prop_key, prop_val in self._raw:
-            if prop_key not in props_list:
+        ret_tuple = None
+        last_index = -1
+        for prop_key, prop_val in self.get_raw_items():
+            prop_index = slots_dict.get(prop_key)
+            if prop_index is None:
                 continue
-            prop_index = props_list.index(prop_key)
-            last_index = get_last_index_of(found_list, True)
             if last_index >= prop_index:
-                # if ret_tuple[0] is None:
-                #     ret_tuple[0] = len(ret_list)
-                ret_list.append(ret_tuple)
+                yield ret_tuple
+                ret_tuple = None
+            if ret_tuple is None:
                 ret_tuple = [None] * tuple_size
-                found_list = [False] * tuple_size
-            found_list[prop_index] = True
+            last_index = prop_index
             ret_tuple[prop_index] = prop_val
-        if True in found_list:
-            # if ret_tuple[0] is None:
-            #     ret_tuple[0] = len(ret_list)
-            ret_list.append(ret_tuple)
-        return ret_list
+        if ret_tuple is not None:
+            yield ret_tuple
 
     def get_indexed_tuples(self, props_list: List[str], elems_num: int) -> List[List[Any]]:
+        values_lists = [self.get_prop_list(prop_item) for prop_item in props_list]
         ret_list = []
         for idx in range(0, elems_num):
             ret_tuple = []
-            for prop_item in props_list:
-                key = f"{prop_item}_{idx}"
-                val = self.get(key)
+            for values_list in values_lists:
+                val = None
+                if idx < len(values_list):
+                    val = values_list[idx]
                 ret_tuple.append(val)
             ret_list.append(ret_tuple)
         return ret_list
@@ -149,7 +250,8 @@ class Entry(Munch):
                 chain_props.add(chain_prop)
                 for chain_item in chain_list:
                     ret_list.append((chain_prop, chain_item))
-            for subprop, subentry in self.items():
+            ## escaping "strg" caches value in entry, so items are copied
+            for subprop, subentry in list(self.iter_props()):
                 if is_entry_prop_internal(subprop):
                     continue
                 if self._chained and subprop == "chain":
@@ -157,36 +259,52 @@ class Entry(Munch):
                 if subprop in chain_props:
                     ## already added
                     continue
+                if subprop == "strg" and self._type == "string_cst":
+                    subentry = get_string_cst_value(self)
                 ret_list.append((subprop, subentry))
         return sorted(ret_list, key=lambda container: container[0])
 
-    def replace_data(self, prop, old_value, new_value):
+    def replace_data(self, prop, new_value):
+        if prop not in self and self._set_indexed(prop, new_value):
+            ## legacy indexed key of repeated property or vector item
+            return
         self[prop] = new_value
-        for raw_index, raw_data in enumerate(self._raw.copy()):
-            if raw_data[0] != prop:
-                continue
-            if raw_data[1] != old_value:
-                continue
-            self._raw[raw_index] = (raw_data[0], new_value)
 
+    def get_raw_items(self) -> Iterable[Tuple[str, Any]]:
+        """Iterate over properties in order of raw file.
 
-def get_last_index_of(container, value):
-    if value not in container:
-        return -1
-    index_of = container[::-1].index(value)
-    return len(container) - 1 - index_of
+        '_raw' holds only names of properties, values are taken from entry itself
+        (values of repeated property are taken from list of the property).
+        Properties removed from entry are skipped.
+        """
+        if not self._raw:
+            return
+        lists_dict = self._lists or {}
+        repeated_dict: Dict[str, int] = {}
+        for prop_key in self._raw:
+            prop_list = lists_dict.get(prop_key)
+            if prop_list is None:
+                prop_val = self.get(prop_key)
+                if prop_val is not None:
+                    yield prop_key, prop_val
+                continue
+            prop_index = repeated_dict.get(prop_key, 0)
+            repeated_dict[prop_key] = prop_index + 1
+            yield prop_key, prop_list[prop_index]
 
 
 class LangContent:
 
-    def __init__(self, content_dict):
+    def __init__(self, content_dict, release_lines=False):
         # id: ( id, type, list of (prop, val) )
+        # released after objectification if 'release_lines' is set
         self.content_lines: Dict[str, Tuple[str, str, List[Tuple[str, str]]]] = content_dict  # raw text lines
 
         self._entry_id_counter = None
 
         # dict with found types and it's properties
         self.types_fields = None
+        self.types_fields_limit = None
 
         # Entries tree
         # dict keys are entry ids (e.g. @123) values are 'Entry' objects
@@ -195,14 +313,35 @@ class LangContent:
         self.parents_dict: Dict[str, List[Tuple[Entry, str]]] = None
         self.ancestors_dict: Dict[str, List[List[Tuple[Entry, str]]]] = None
 
+        # content hashes of entries for given ignored properties
+        self.entries_hashes: Dict[Tuple[str, ...], Dict[str, str]] = {}
+
+        # source file -> list of ids of entries placed in the file
+        self.source_index: Dict[str, List[str]] = None
+
+        # flags of language internal entries
+        self.internal_flags: EntryInternalFlags = None
+
+        # references between entries in CSR format
+        self.entries_graph: EntryGraphCSR = None
+
+        if release_lines:
+            self.release_content_lines()
+
     def _objectify(self):
         # dict: {entry_id}: Entry
         ret_objs_dict = {}
         for key, entry in self.content_lines.items():
             entry_type = entry[1]
             props_list = entry[2]
-            props_dict = props_list_to_dict(props_list)
-            obj_dict = {"_id": key, "_type": entry_type, "_raw": props_list.copy()}
+            props_dict, lists_dict = props_list_to_values(props_list)
+            ## values are stored only in entry, '_raw' keeps order of properties
+            obj_dict = {"_id": key, "_type": entry_type, "_raw": [prop_data[0] for prop_data in props_list]}
+            if lists_dict:
+                obj_dict["_lists"] = lists_dict
+            if entry_type == "tree_vec":
+                vector_keys = sorted((prop for prop in props_dict if prop.isdigit()), key=int)
+                obj_dict["_vector"] = [props_dict.pop(prop) for prop in vector_keys]
             obj_dict.update(props_dict)
             obj_dict = dict(sorted(obj_dict.items()))  # sort by keys
             ret_objs_dict[key] = Entry(obj_dict)
@@ -210,21 +349,6 @@ class LangContent:
         ## convert entry ids to references
         for _key, entry_item in ret_objs_dict.items():
             for field, value in entry_item.items():
-                if field == "_raw":
-                    for prop_index, prop_data in enumerate(value):
-                        prop_val = prop_data[1]
-                        if not prop_val.startswith("@"):
-                            continue
-                        prop_name = prop_data[0]
-                        entry_type = entry_item.get_type()
-                        if prop_name == "strg" and entry_type == "string_cst":
-                            ## skip particular field
-                            continue
-                        prop_key = prop_data[0]
-                        prop_entry = ret_objs_dict[prop_val]
-                        value[prop_index] = (prop_key, prop_entry)
-                    continue
-
                 if is_entry_prop_internal(field):
                     continue
                 if value.startswith("@"):
@@ -235,6 +359,15 @@ class LangContent:
                             continue
                     entry_item[field] = ret_objs_dict[value]
 
+            lists_dict = entry_item["_lists"]
+            if lists_dict:
+                for prop_list in lists_dict.values():
+                    convert_refs_list(prop_list, ret_objs_dict)
+
+            vector_items = entry_item["_vector"]
+            if vector_items:
+                convert_refs_list(vector_items, ret_objs_dict)
+
         return ret_objs_dict
 
     def _get_next_entry_id(self):
@@ -253,67 +386,94 @@ class LangContent:
         entry_id = entry.get_id()
         self.content_objs[entry_id] = entry
 
-    def get_types_fields(self):
-        if self.types_fields is not None:
+    def release_content_lines(self):
+        """Drop raw lines to reduce memory, lines are then rebuilt from entries (see 'get_raw_lines')."""
+        self.content_lines = None
+
+    def get_raw_lines(self) -> Iterable[Tuple[str, str, List[Tuple[str, str]]]]:
+        """Iterate over raw lines: tuples (id, type, list of (prop, val)).
+
+        If lines are released, then they are rebuilt from entries, so
+        they reflect conversions made on entries (e.g. 'convert_entries').
+        """
+        if self.content_lines is not None:
+            yield from self.content_lines.values()
+            return
+        for entry_id, entry in self.content_objs.items():
+            if entry._raw is None:  # pylint: disable=W0212
+                ## entry added during conversion
+                continue
+            props_list = []
+            for prop_key, prop_val in entry.get_raw_items():
+                if isinstance(prop_val, Entry):
+                    prop_val = prop_val.get_id()
+                props_list.append((prop_key, prop_val))
+            yield (entry_id, entry.get_type(), props_list)
+
+    def get_types_fields(self, jobs=1, max_values=None) -> Dict[str, Dict[str, Any]]:
+        """Return description of properties of entries types: {type: {prop: prop_data}}.
+
+        Raw lines are summarized in chunks (see 'summarize_types_fields') using pool of processes,
+        then summaries are merged and values are sorted once. 'max_values' limits number of distinct
+        values recorded for each property (lowest values are kept, 'truncated' is set in prop data).
+        """
+        if self.types_fields is not None and self.types_fields_limit == max_values:
             return self.types_fields
 
+        raw_lines = iter(self.get_raw_lines())
+        args_list = []
+        while True:
+            chunk = list(itertools.islice(raw_lines, TYPES_FIELDS_CHUNK_SIZE))
+            if not chunk:
+                break
+            args_list.append((chunk, max_values))
+        summaries_list = map_jobs(summarize_types_fields, args_list, jobs=jobs)
+        types_summary = merge_types_fields(summaries_list, max_values)
+
         ret_types_dict: Dict[str, Dict[str, Any]] = {}
-        for _key, entry in self.content_lines.items():
-            entry_type = entry[1]
-            entry_list = entry[2]
-            entry_data = props_list_to_dict(entry_list)
-
-            type_props = ret_types_dict.get(entry_type, {})
-
-            optional_props = set()
-            curr_props = set(type_props.keys())
-            if curr_props:
-                new_props = set(entry_data.keys())
-                optional_props.update(curr_props.difference(new_props))
-                optional_props.update(new_props.difference(curr_props))
-
-            for prop_key, prop_val in entry_data.items():
-                if entry_type == "identifier_node":
-                    if prop_key == "strg":
-                        type_props[prop_key] = {"mandatory": True, "values": ["<string>"]}
-                        continue
-                    if prop_key == "lngt":
-                        type_props[prop_key] = {"mandatory": True, "values": ["<unsigned number>"]}
-                        continue
-                if entry_type == "integer_cst":
-                    if prop_key == "int":
-                        type_props[prop_key] = {"mandatory": True, "values": ["<number>"]}
-                        continue
-
-                props_data = type_props.get(prop_key, {"mandatory": True, "values": []})
-                prop_values = props_data["values"]
-                prop_values = set(prop_values)
-                if prop_val.startswith("@"):
-                    # identifier
+        for entry_type, (entries_num, props_summary) in sorted(types_summary.items()):
+            type_props: Dict[str, Any] = {}
+            for prop_key, (prop_num, prop_values, linked_ids, truncated) in sorted(props_summary.items()):
+                placeholder = TYPES_FIELDS_PLACEHOLDERS.get((entry_type, prop_key))
+                if placeholder is not None:
+                    prop_values = {placeholder}
+                elif linked_ids:
                     prop_values.add("<entry-id>")
-                    prop_value_types = props_data.get("allowedtypes", [])
-                    prop_value_types = set(prop_value_types)
-                    linked_element = self.content_lines[prop_val]
-                    linked_type = linked_element[1]
-                    prop_value_types.update([linked_type])
-                    props_data["allowedtypes"] = sorted(prop_value_types)
-                else:
-                    prop_values.add(prop_val)
-                props_data["values"] = sorted(prop_values)
+                props_data = {"mandatory": prop_num == entries_num, "values": sorted(prop_values)}
+                if linked_ids:
+                    ## each linked entry is resolved once
+                    linked_types = {self.content_objs[linked_id].get_type() for linked_id in linked_ids}
+                    props_data["allowedtypes"] = sorted(linked_types)
+                if truncated:
+                    props_data["truncated"] = True
                 type_props[prop_key] = props_data
-
-            if curr_props:
-                for op_key in optional_props:
-                    props_data = type_props[op_key]
-                    props_data["mandatory"] = False
-
-            type_props = dict(sorted(type_props.items()))
             ret_types_dict[entry_type] = type_props
-        ret_types_dict = dict(sorted(ret_types_dict.items()))
 
         self.types_fields = ret_types_dict
+        self.types_fields_limit = max_values
         return self.types_fields
 
+    def get_source_index(self) -> Dict[str, List[str]]:
+        if self.source_index is None:
+            self.source_index = build_source_index(self.get_raw_lines())
+        return self.source_index
+
+    def get_internal_flags(self) -> "EntryInternalFlags":
+        if self.internal_flags is None:
+            self.internal_flags = EntryInternalFlags(self.content_objs.values())
+        return self.internal_flags
+
+    def get_source_files(self) -> List[str]:
+        return list(self.get_source_index().keys())
+
+    def get_entries_ids_by_source(self, check_path: Callable[[str], bool]) -> Set[str]:
+        """Return ids of entries placed in source files accepted by 'check_path'."""
+        ret_set: Set[str] = set()
+        for source_file, entries_ids in self.get_source_index().items():
+            if check_path(source_file):
+                ret_set.update(entries_ids)
+        return ret_set
+
     def size(self):
         return len(self.content_objs)
 
@@ -357,12 +517,24 @@ class LangContent:
                 ret_list.append(entry)
         return ret_list
 
+    def get_entries_graph(self) -> "EntryGraphCSR":
+        """Return graph of references between entries (see 'EntryGraphCSR'), requires NumPy."""
+        if self.entries_graph is None:
+            self.entries_graph = build_entries_graph(self.content_objs.values())
+        return self.entries_graph
+
     # returns dict: {entry_id: [(parent_entry, prop_in_parent)]}
     def get_parents_dict(self) -> Dict[str, List[Tuple[Entry, str]]]:
         if self.parents_dict is not None:
             return self.parents_dict
+        if numpy is None:
+            self.parents_dict = self._calculate_parents_dict()
+        else:
+            self.parents_dict = self._calculate_parents_dict_csr()
+        return self.parents_dict
 
-        self.parents_dict = {}
+    def _calculate_parents_dict(self) -> Dict[str, List[Tuple[Entry, str]]]:
+        parents_dict: Dict[str, List[Tuple[Entry, str]]] = {}
         # entry: Entry
         for entry in self.content_objs.values():
             for entry_prop, entry_val in entry.get_sub_entries():
@@ -371,11 +543,48 @@ class LangContent:
                 if not isinstance(entry_val, Entry):
                     continue
                 dep_id = entry_val.get_id()
-                dep_list: List[Tuple[Entry, str]] = self.parents_dict.get(dep_id, [])
+                dep_list: List[Tuple[Entry, str]] = parents_dict.get(dep_id, [])
                 dep_list.append((entry, entry_prop))
-                self.parents_dict[dep_id] = dep_list
-
-        return self.parents_dict
+                parents_dict[dep_id] = dep_list
+        return parents_dict
+
+    def _calculate_parents_dict_csr(self) -> Dict[str, List[Tuple[Entry, str]]]:
+        graph = self.get_entries_graph()
+        entries_list = list(self.content_objs.values())
+        rev_offsets, rev_sources, rev_props = graph.get_reverse_edges()
+        offsets_list = rev_offsets.tolist()
+        sources_list = rev_sources.tolist()
+        props_list = rev_props.tolist()
+        props_names = graph.props_list
+        parents_dict: Dict[str, List[Tuple[Entry, str]]] = {}
+        for node in numpy.flatnonzero(numpy.diff(rev_offsets)).tolist():
+            edges_range = range(offsets_list[node], offsets_list[node + 1])
+            dep_list = [(entries_list[sources_list[index]], props_names[props_list[index]]) for index in edges_range]
+            parents_dict[graph.ids_list[node]] = dep_list
+        return parents_dict
+
+    def get_entries_hashes(
+        self, ignore_props: Iterable[str] = None, props_filter: Callable[[Entry], Set[str]] = None
+    ) -> Dict[str, str]:
+        """Return dict of content hashes of entries: {entry_id: hash}.
+
+        Hash covers entry type, properties and hashes of referenced entries, so it
+        does not depend on entries ids. Properties given in 'ignore_props' (e.g. 'srcp')
+        are not taken into account. 'props_filter' is described in 'calculate_entries_hashes'.
+        """
+        props_key = tuple(sorted(ignore_props)) if ignore_props else ()
+        cache_key = (props_key, props_filter)
+        hashes_dict = self.entries_hashes.get(cache_key)
+        if hashes_dict is None:
+            hashes_dict = calculate_entries_hashes(self.content_objs.values(), set(props_key), props_filter)
+            self.entries_hashes[cache_key] = hashes_dict
+        return hashes_dict
+
+    def get_entry_hash(
+        self, entry_id: str, ignore_props: Iterable[str] = None, props_filter: Callable[[Entry], Set[str]] = None
+    ) -> str:
+        hashes_dict = self.get_entries_hashes(ignore_props, props_filter)
+        return hashes_dict.get(entry_id)
 
     def get_ancestors_dict(self):
         if self.ancestors_dict is not None:
@@ -441,10 +650,12 @@ class LangContent:
 
     def convert_chain(self):
         self.parents_dict = None
+        self.entries_graph = None
         self.ancestors_dict = None
+        self.entries_hashes = {}
 
         for entry in self.content_objs.values():
-            for prop, value in list(entry.items()):
+            for prop, value in list(entry.iter_props()):
                 if not is_entry_prop_chain(prop):
                     continue
                 if not isinstance(value, Entry):
@@ -465,13 +676,15 @@ class LangContent:
 
     def convert_chan(self):
         self.parents_dict = None
+        self.entries_graph = None
         self.ancestors_dict = None
+        self.entries_hashes = {}
 
         # entry: Entry
         for entry in list(self.content_objs.values()):
             if entry.get_type() == "tree_vec":
                 continue
-            for prop, value in list(entry.items()):
+            for prop, value in list(entry.iter_props()):
                 # if prop != "chan":
                 #     continue
                 if not isinstance(value, Entry):
@@ -484,13 +697,10 @@ class LangContent:
                     continue
                 next_id = self._get_next_entry_id()
                 len_str = str(len(chan_list))
-                entry_data = {"_id": next_id, "_type": "tree_vec", "lngt": len_str}
-                for index, item in enumerate(chan_list):
-                    index_str = str(index)
-                    entry_data[index_str] = item
+                entry_data = {"_id": next_id, "_type": "tree_vec", "_vector": chan_list, "lngt": len_str}
                 tree_vec_entry = Entry(entry_data)
                 self._add_entry(tree_vec_entry)
-                entry.replace_data(prop, value, tree_vec_entry)
+                entry.replace_data(prop, tree_vec_entry)
 
     def _get_chain_entries(self, chain_start: Entry):
         ret_list = []
@@ -515,10 +725,33 @@ class LangContent:
         pprint.pprint(self.types_fields, indent=4)
 
     def print_lines(self):
-        for entry in self.content_lines.values():
+        for entry in self.get_raw_lines():
             print(entry)
 
 
+## returns tuple of dicts: property -> value for single properties
+## and property -> list of values for properties occurring more than once
+def props_list_to_values(props_list: List[Tuple[str, str]]) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
+    values_dict: Dict[str, Any] = {}
+    lists_dict: Dict[str, List[Any]] = {}
+    for next_key, next_val in props_list:
+        sublist = lists_dict.get(next_key)
+        if sublist is not None:
+            sublist.append(next_val)
+        elif next_key in values_dict:
+            lists_dict[next_key] = [values_dict.pop(next_key), next_val]
+        else:
+            values_dict[next_key] = next_val
+    return values_dict, lists_dict
+
+
+## replace entry ids in list with entries
+def convert_refs_list(values_list: List[Any], entries_dict: Dict[str, "Entry"]):
+    for index, value in enumerate(values_list):
+        if value.startswith("@"):
+            values_list[index] = entries_dict[value]
+
+
 def props_list_to_dict(props_list: List[Tuple[str, str]]) -> Dict[str, Any]:
     ret_dict: Dict[str, Any] = {}
     for next_key, next_val in props_list:
@@ -535,15 +768,138 @@ def props_list_to_dict(props_list: List[Tuple[str, str]]) -> Dict[str, Any]:
             val = val_list[0]
             ret_dict[key] = val
             continue
-        # for backward compatibility convert list to list of keys with index like "{prop}_0" etc
+        # convert list to list of keys with index like "{prop}_0" etc
+        # (see 'props_list_to_values' for lists of values)
         del ret_dict[key]
         for index, item in enumerate(val_list):
-            new_key = f"{key}_{index}"
+            new_key = sys.intern(f"{key}_{index}")
             ret_dict[new_key] = item
 
     return ret_dict
 
 
+## ===========================================================
+
+
+## returns entries referenced by properties and chains (lists converted by 'convert_chain') of given entry
+## if 'only_props' is given, then other properties are skipped
+def get_entry_sub_entries(entry: Entry, ignore_props: Set[str] = None, only_props: Set[str] = None) -> List[Entry]:
+    if ignore_props is None:
+        ignore_props = set()
+    ret_list = []
+    for prop, value in entry.iter_props():
+        if not isinstance(value, Entry):
+            continue
+        if is_entry_prop_internal(prop) or prop in ignore_props:
+            continue
+        if only_props is not None and prop not in only_props:
+            continue
+        ret_list.append(value)
+    for prop, chain_list in entry.get_chains().items():
+        if prop in ignore_props:
+            continue
+        if only_props is not None and prop not in only_props:
+            continue
+        ret_list.extend(chain_list)
+    return ret_list
+
+
+def calculate_entries_hashes(
+    entries_list: Iterable[Entry], ignore_props: Set[str] = None, props_filter: Callable[[Entry], Set[str]] = None
+) -> Dict[str, str]:
+    """Calculate Merkle-style hashes of entries in single bottom-up pass.
+
+    Cycles are handled by condensing strongly connected components: entries inside
+    component reference each other by local hashes and are finalized by hash of whole component.
+
+    'props_filter' returns set of properties taken into account for given entry or None
+    for all properties. It allows to stop hashing on entries, e.g. declarations can be
+    identified by name and type without definition.
+    """
+    if ignore_props is None:
+        ignore_props = set()
+    ret_dict: Dict[str, str] = {}
+
+    def get_only_props(entry: Entry):
+        if props_filter is None:
+            return None
+        return props_filter(entry)
+
+    def get_sub_entries(entry: Entry):
+        return get_entry_sub_entries(entry, ignore_props, get_only_props(entry))
+
+    def get_signature(entry: Entry, refs_dict: Dict[str, str] = None):
+        return _get_entry_signature(entry, ret_dict, ignore_props, refs_dict, get_only_props(entry))
+
+    components = find_strongly_connected_components(entries_list, get_sub_entries, Entry.get_id)
+    for component in components:
+        if len(component) == 1:
+            entry = component[0]
+            entry_id = entry.get_id()
+            self_ref = any(sub_entry is entry for sub_entry in get_sub_entries(entry))
+            if not self_ref:
+                ret_dict[entry_id] = _hash_string(get_signature(entry))
+                continue
+
+        ## cycle
+        local_refs = {entry.get_id(): "<cycle>" for entry in component}
+        local_hashes = {}
+        for entry in component:
+            entry_signature = get_signature(entry, local_refs)
+            local_hashes[entry.get_id()] = _hash_string(entry_signature)
+        entry_signatures = {}
+        for entry in component:
+            entry_signatures[entry.get_id()] = get_signature(entry, local_hashes)
+        component_signature = "|".join(sorted(_hash_string(item) for item in entry_signatures.values()))
+        component_hash = _hash_string(component_signature)
+        for entry_id, entry_signature in entry_signatures.items():
+            ret_dict[entry_id] = _hash_string(component_hash + entry_signature)
+
+    return ret_dict
+
+
+def _get_entry_signature(
+    entry: Entry,
+    hashes_dict: Dict[str, str],
+    ignore_props: Set[str],
+    local_refs: Dict[str, str] = None,
+    only_props: Set[str] = None,
+) -> str:
+    def get_value_hash(value: Entry):
+        value_id = value.get_id()
+        value_hash = None
+        if local_refs is not None:
+            value_hash = local_refs.get(value_id)
+        if value_hash is None:
+            value_hash = hashes_dict[value_id]
+        return value_hash
+
+    items_list = [entry.get_type()]
+    for prop, value in sorted(entry.iter_props(), key=lambda item: item[0]):
+        if is_entry_prop_internal(prop):
+            continue
+        if prop in ignore_props:
+            continue
+        if only_props is not None and prop not in only_props:
+            continue
+        if isinstance(value, Entry):
+            items_list.append(f"{prop}=@{get_value_hash(value)}")
+        else:
+            items_list.append(f"{prop}={value}")
+    for prop, chain_list in sorted(entry.get_chains().items()):
+        if prop in ignore_props:
+            continue
+        if only_props is not None and prop not in only_props:
+            continue
+        chain_hashes = [get_value_hash(item) for item in chain_list]
+        items_list.append(f"{prop}[]=@{','.join(chain_hashes)}")
+    return "\n".join(items_list)
+
+
+def _hash_string(value: str) -> str:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
 def is_entry_prop_chain(prop: str):
     return prop in ("args", "dcls", "flds", "vars", "rslt")
 
@@ -552,6 +908,147 @@ def is_entry_prop_internal(prop: str):
     return prop.startswith("_")
 
 
+## number of raw lines summarized by single job of 'LangContent.get_types_fields'
+TYPES_FIELDS_CHUNK_SIZE = 200000
+
+## (type, prop) -> description of values of property recorded instead of values
+TYPES_FIELDS_PLACEHOLDERS = {
+    ("identifier_node", "strg"): "<string>",
+    ("identifier_node", "lngt"): "<unsigned number>",
+    ("integer_cst", "int"): "<number>",
+}
+
+
+def summarize_types_fields(
+    content_lines: Iterable[Tuple[str, str, List[Tuple[str, str]]]], max_values=None
+) -> Dict[str, List[Any]]:
+    """Summarize properties of entries types in given raw lines (map step of 'LangContent.get_types_fields').
+
+    Returns dict: {type: [entries number, {prop: [occurrences number, values set, linked ids set, truncated]}]}.
+    Values are not sorted. Values of properties in 'TYPES_FIELDS_PLACEHOLDERS' are not recorded.
+    """
+    ret_dict: Dict[str, List[Any]] = {}
+    for _, entry_type, entry_list in content_lines:
+        type_summary = ret_dict.get(entry_type)
+        if type_summary is None:
+            type_summary = [0, {}]
+            ret_dict[entry_type] = type_summary
+        type_summary[0] += 1
+        props_summary = type_summary[1]
+        for prop_key, prop_val in props_list_to_dict(entry_list).items():
+            prop_summary = props_summary.get(prop_key)
+            if prop_summary is None:
+                prop_summary = [0, set(), set(), False]
+                props_summary[prop_key] = prop_summary
+            prop_summary[0] += 1
+            if (entry_type, prop_key) in TYPES_FIELDS_PLACEHOLDERS:
+                continue
+            if entry_type == "string_cst" and prop_key == "strg":
+                prop_val = escape_string_cst(prop_val)
+            if prop_val.startswith("@"):
+                # identifier
+                prop_summary[2].add(prop_val)
+                continue
+            prop_values = prop_summary[1]
+            prop_values.add(prop_val)
+            if max_values and len(prop_values) > 2 * max_values:
+                ## limit memory, values are limited precisely during merge
+                prop_summary[1] = set(sorted(prop_values)[:max_values])
+                prop_summary[3] = True
+    return ret_dict
+
+
+def merge_types_fields(summaries_list: Iterable[Dict[str, List[Any]]], max_values=None) -> Dict[str, List[Any]]:
+    """Merge summaries returned by 'summarize_types_fields' (reduce step of 'LangContent.get_types_fields')."""
+    ret_dict: Dict[str, List[Any]] = {}
+    for summary in summaries_list:
+        for entry_type, (entries_num, props_summary) in summary.items():
+            type_summary = ret_dict.get(entry_type)
+            if type_summary is None:
+                ret_dict[entry_type] = [entries_num, props_summary]
+                continue
+            type_summary[0] += entries_num
+            merged_props = type_summary[1]
+            for prop_key, prop_summary in props_summary.items():
+                merged_prop = merged_props.get(prop_key)
+                if merged_prop is None:
+                    merged_props[prop_key] = prop_summary
+                    continue
+                merged_prop[0] += prop_summary[0]
+                merged_prop[1].update(prop_summary[1])
+                merged_prop[2].update(prop_summary[2])
+                merged_prop[3] = merged_prop[3] or prop_summary[3]
+    if max_values:
+        for _, props_summary in ret_dict.values():
+            for prop_summary in props_summary.values():
+                if len(prop_summary[1]) > max_values:
+                    prop_summary[1] = set(sorted(prop_summary[1])[:max_values])
+                    prop_summary[3] = True
+    return ret_dict
+
+
+## returns dict: source file -> list of ids of entries placed in the file
+def build_source_index(content_lines: Iterable[Tuple[str, str, List[Tuple[str, str]]]]) -> Dict[str, List[str]]:
+    ret_dict: Dict[str, List[str]] = {}
+    for entry_data in content_lines:
+        entry_id = entry_data[0]
+        for prop_key, prop_val in entry_data[2]:
+            if prop_key != "srcp":
+                continue
+            source_file = get_source_file(prop_val)
+            ret_dict.setdefault(source_file, []).append(entry_id)
+            break
+    return ret_dict
+
+
+## remove line number from source location (e.g. 'file.cpp:12')
+def get_source_file(source_path: str) -> str:
+    source_file = source_path.rpartition(":")[0] or source_path
+    return sys.intern(source_file)
+
+
+## policies of escaping "strg" value of "string_cst" entry
+STRING_CST_ESCAPE_DOUBLE = "double"  # escaped twice to prevent unescaping in plantuml/dot to svg conversion
+STRING_CST_ESCAPE_HTML = "html"  # escaped twice and HTML escaped
+STRING_CST_ESCAPE_HEX = "hex"  # bytes as hex number
+
+
+def get_string_cst_value(string_cst: Entry, policy=STRING_CST_ESCAPE_DOUBLE) -> str:
+    """Return escaped "strg" value of "string_cst" entry.
+
+    Parser keeps string as it is in raw file, so escaping is done here
+    on demand and the result is cached in entry.
+    """
+    escaped_dict = string_cst.get("_escaped")
+    if escaped_dict is None:
+        escaped_dict = {}
+        string_cst["_escaped"] = escaped_dict
+    escaped = escaped_dict.get(policy)
+    if escaped is None:
+        escaped = escape_string_cst(string_cst.get("strg", ""), policy)
+        escaped_dict[policy] = escaped
+    return escaped
+
+
+def escape_string_cst(value: str, policy=STRING_CST_ESCAPE_DOUBLE) -> str:
+    try:
+        value_bytes = value.encode("utf-8")
+    except UnicodeEncodeError:
+        ## there is rare situation where "strg" field contains UTF-8 invalid characters
+        ## it happens, e.g. during C-array initialization (see 'convert_bytes_string_cst')
+        value_bytes = None
+    if value_bytes is None or policy == STRING_CST_ESCAPE_HEX:
+        value_bytes = value.encode("utf-8", "surrogateescape")
+        return "0x" + value_bytes.hex().upper()
+
+    ## escape twice to prevent unescaping in plantuml/dot to svg conversion
+    escaped = value.encode("unicode-escape").decode("utf-8")  ## escapes newlines (prevents \n)
+    escaped = escaped.encode("unicode-escape").decode("utf-8")
+    if policy == STRING_CST_ESCAPE_HTML:
+        return html.escape(escaped)
+    return escaped
+
+
 def is_entry_language_internal(entry: Entry):
     if not isinstance(entry, Entry):
         return False
@@ -614,6 +1111,233 @@ def is_entry_language_internal(entry: Entry):
     return False
 
 
+class EntryInternalFlags:
+    """Flags of language internal entries (see 'is_entry_language_internal').
+
+    Flags are kept in bitmaps indexed by number of entry id, so after classification
+    check of entry is O(1). Entries not classified yet (e.g. added during conversion)
+    are classified on first check.
+    """
+
+    def __init__(self, entries_list: Iterable[Entry] = None):
+        self.known_bits = bytearray()
+        self.internal_bits = bytearray()
+        if entries_list is not None:
+            self.classify(entries_list)
+
+    def classify(self, entries_list: Iterable[Entry]):
+        entries_list = list(entries_list)
+        numbers_list = [get_entry_number(entry) for entry in entries_list]
+        max_number = max((number for number in numbers_list if number is not None), default=-1)
+        self._reserve(max_number)
+        for entry, entry_number in zip(entries_list, numbers_list):
+            if entry_number is None:
+                continue
+            self._set_flag(entry_number, is_entry_language_internal(entry))
+
+    def is_internal(self, entry) -> bool:
+        if not isinstance(entry, Entry):
+            return False
+        entry_number = get_entry_number(entry)
+        if entry_number is None:
+            return is_entry_language_internal(entry)
+        byte_index = entry_number >> 3
+        bit_mask = 1 << (entry_number & 7)
+        if byte_index < len(self.known_bits) and self.known_bits[byte_index] & bit_mask:
+            return bool(self.internal_bits[byte_index] & bit_mask)
+        internal = is_entry_language_internal(entry)
+        self._reserve(entry_number)
+        self._set_flag(entry_number, internal)
+        return internal
+
+    def _reserve(self, entry_number):
+        bytes_num = (entry_number >> 3) + 1 - len(self.known_bits)
+        if bytes_num > 0:
+            self.known_bits.extend(bytes(bytes_num))
+            self.internal_bits.extend(bytes(bytes_num))
+
+    def _set_flag(self, entry_number, internal: bool):
+        byte_index = entry_number >> 3
+        bit_mask = 1 << (entry_number & 7)
+        self.known_bits[byte_index] |= bit_mask
+        if internal:
+            self.internal_bits[byte_index] |= bit_mask
+
+
+## returns number of entry id (e.g. 123 for '@123') or None if id is not a number
+def get_entry_number(entry: Entry) -> int:
+    entry_id = entry.get_id()
+    if not entry_id:
+        return None
+    entry_number = entry_id[1:]
+    if not entry_number.isdigit():
+        return None
+    return int(entry_number)
+
+
+class EntryGraphCSR:
+    """Graph of references between entries in compressed sparse row format (requires NumPy).
+
+    Nodes are indexes of entries in 'ids_list'. Edges going out of node 'n' are placed
+    in range 'offsets[n]:offsets[n + 1]' of arrays 'targets' (node of referenced entry)
+    and 'props' (code of referencing property, name in 'props_list'). Array 'types'
+    holds code of type of each node (name in 'types_list'). Arrays allow vectorized
+    graph algorithms (e.g. in-degrees, reverse edges, reachability).
+    """
+
+    def __init__(self, ids_list: Iterable[str], types_names: Iterable[str]):
+        if numpy is None:
+            raise RuntimeError("NumPy is required to build graph of entries")
+        self.ids_list: List[str] = list(ids_list)
+        self.index_dict: Dict[str, int] = {entry_id: index for index, entry_id in enumerate(self.ids_list)}
+        self.types_list: List[str] = []
+        self.types = numpy.array(self._get_codes(types_names, self.types_list), dtype=numpy.int32)
+        self.props_list: List[str] = []
+        self.offsets = numpy.zeros(len(self.ids_list) + 1, dtype=numpy.int64)
+        self.targets = numpy.zeros(0, dtype=numpy.int64)
+        self.props = numpy.zeros(0, dtype=numpy.int32)
+
+    def size(self) -> int:
+        return len(self.ids_list)
+
+    def edges_number(self) -> int:
+        return len(self.targets)
+
+    ## returns index of node or -1 if not found
+    def get_index(self, entry_id: str) -> int:
+        return self.index_dict.get(entry_id, -1)
+
+    ## returns code of property or -1 if not found
+    def get_prop_code(self, prop: str) -> int:
+        if prop in self.props_list:
+            return self.props_list.index(prop)
+        return -1
+
+    ## returns code of entry type or -1 if not found
+    def get_type_code(self, entry_type: str) -> int:
+        if entry_type in self.types_list:
+            return self.types_list.index(entry_type)
+        return -1
+
+    def set_edges(self, sources: List[int], props: List[str], targets: List[int], sort_props=False):
+        """Set edges given as parallel lists, 'sources' have to be in non-decreasing order.
+
+        If 'sort_props' is set, then edges of each node are ordered by name of property
+        (stable, as in 'Entry.get_sub_entries()').
+        """
+        sources_array = numpy.array(sources, dtype=numpy.int64)
+        props_array = numpy.array(self._get_codes(props, self.props_list), dtype=numpy.int32)
+        targets_array = numpy.array(targets, dtype=numpy.int64)
+        if sort_props and len(sources_array) > 0:
+            props_rank = numpy.zeros(len(self.props_list), dtype=numpy.int32)
+            props_rank[sorted(range(len(self.props_list)), key=self.props_list.__getitem__)] = numpy.arange(
+                len(self.props_list), dtype=numpy.int32
+            )
+            ## lexsort is stable, last key is primary
+            order = numpy.lexsort((props_rank[props_array], sources_array))
+            props_array = props_array[order]
+            targets_array = targets_array[order]
+        counts = numpy.bincount(sources_array, minlength=self.size())
+        self.offsets = numpy.zeros(self.size() + 1, dtype=numpy.int64)
+        numpy.cumsum(counts, out=self.offsets[1:])
+        self.targets = targets_array
+        self.props = props_array
+
+    def get_in_degrees(self):
+        return numpy.bincount(self.targets, minlength=self.size())
+
+    def get_edges_sources(self):
+        return numpy.repeat(numpy.arange(self.size(), dtype=numpy.int64), numpy.diff(self.offsets))
+
+    ## returns indexes of edges going out of given nodes
+    def get_edges_indexes(self, nodes):
+        nodes = numpy.asarray(nodes, dtype=numpy.int64)
+        starts = self.offsets[nodes]
+        counts = self.offsets[nodes + 1] - starts
+        ## index of edge is start of its node plus position in concatenated ranges
+        shifts = numpy.repeat(starts - (numpy.cumsum(counts) - counts), counts)
+        return shifts + numpy.arange(len(shifts), dtype=numpy.int64)
+
+    def get_reverse_edges(self):
+        """Return tuple (offsets, sources, props) of incoming edges in CSR format.
+
+        Incoming edges of each node keep order of outgoing edges of the graph.
+        """
+        order = numpy.argsort(self.targets, kind="stable")
+        rev_offsets = numpy.zeros(self.size() + 1, dtype=numpy.int64)
+        numpy.cumsum(self.get_in_degrees(), out=rev_offsets[1:])
+        return rev_offsets, self.get_edges_sources()[order], self.props[order]
+
+    def get_reachable_mask(self, roots: Iterable[int], targets=None):
+        """Return boolean array of nodes reachable from given root nodes (breadth first).
+
+        'targets' can replace targets of edges, negative target disables edge.
+        """
+        if targets is None:
+            targets = self.targets
+        visited = numpy.zeros(self.size(), dtype=bool)
+        frontier = numpy.unique(numpy.array(list(roots), dtype=numpy.int64))
+        visited[frontier] = True
+        while len(frontier) > 0:
+            next_nodes = targets[self.get_edges_indexes(frontier)]
+            next_nodes = next_nodes[next_nodes >= 0]
+            frontier = numpy.unique(next_nodes[~visited[next_nodes]])
+            visited[frontier] = True
+        return visited
+
+    @staticmethod
+    def _get_codes(names: Iterable[str], names_list: List[str]) -> List[int]:
+        codes_dict = {name: code for code, name in enumerate(names_list)}
+        ret_list = []
+        for name in names:
+            code = codes_dict.get(name)
+            if code is None:
+                code = len(names_list)
+                codes_dict[name] = code
+                names_list.append(name)
+            ret_list.append(code)
+        return ret_list
+
+
+def build_entries_graph(entries_list: Iterable[Entry]) -> EntryGraphCSR:
+    """Build graph of references between entries.
+
+    Edges are the same as entries returned by 'Entry.get_sub_entries()' (including
+    converted chains) and are in the same order. References to entries not present
+    in the list are skipped.
+    """
+    entries_list = list(entries_list)
+    graph = EntryGraphCSR((entry.get_id() for entry in entries_list), (entry.get_type() for entry in entries_list))
+    ## entries are identified by object, it is faster than getting id of entry
+    index_dict = {id(entry): index for index, entry in enumerate(entries_list)}
+    sources: List[int] = []
+    props: List[str] = []
+    targets: List[int] = []
+    for source, entry in enumerate(entries_list):
+        entry_chains = entry.get_chains()
+        for chain_prop, chain_list in entry_chains.items():
+            if is_entry_prop_internal(chain_prop):
+                continue
+            for chain_item in chain_list:
+                target = index_dict.get(id(chain_item))
+                if target is not None:
+                    sources.append(source)
+                    props.append(chain_prop)
+                    targets.append(target)
+        for prop, value in entry.iter_props():
+            if not isinstance(value, Entry) or is_entry_prop_internal(prop):
+                continue
+            if prop in entry_chains or (prop == "chain" and entry.is_chained()):
+                continue
+            target = index_dict.get(id(value))
+            if target is not None:
+                sources.append(source)
+                props.append(prop)
+                targets.append(target)
+    graph.set_edges(sources, props, targets, sort_props=True)
+    return graph
+
+
 def is_namespace_internal(namepace_list):
     copied_list = namepace_list.copy()
     copied_list = [value for value in copied_list if value != ""]  # remove empty elements
@@ -669,6 +1393,14 @@ def is_method_of_instance(func_decl: Entry) -> bool:
 
 
 def get_vector_items(vector: Entry):
+    vector_items = vector.get_vector()
+    if vector_items is not None:
+        return list(vector_items)
+    return get_vector_items_by_keys(vector)
+
+
+## returns items of vector stored under index keys ("0", "1" etc.)
+def get_vector_items_by_keys(vector: Entry):
     items_num = vector.get("lngt")
     if items_num is None:
         return []
@@ -1155,7 +1887,7 @@ def get_number_entry_value(value: Entry, fail_exception=True):
         return value.get("valu")
 
     if value_type == "string_cst":
-        return value.get("strg")
+        return get_string_cst_value(value)
 
     if value_type == "vector_cst":
         # TODO: fix GCC to dump data
@@ -1256,7 +1988,10 @@ def get_entry_tree(content: LangContent, include_internals=False, depth_first=Fa
     else:
         traversal = EntryGraphBreadthFirstTraversal()
 
-    converter = EntryTreeConverter(include_internals=include_internals)
+    internal_flags = None
+    if not include_internals:
+        internal_flags = content.get_internal_flags()
+    converter = EntryTreeConverter(include_internals=include_internals, internal_flags=internal_flags)
     return converter.convert(first_entry, traversal)
 
 
@@ -1343,15 +2078,20 @@ def get_entry_tree_subnodes(ancestors_list):
 
 
 def print_entry_tree(entry_tree: EntryTreeNode, indent=2) -> str:
-    ret_content = []
-    nodes_list = EntryTreeDepthFirstTraversal.to_list(entry_tree)
-    for curr_item, level in nodes_list:
+    return "".join(iter_entry_tree_lines(entry_tree, indent))
+
+
+## yields lines of text representation of tree (depth first), so the text can be written in parts
+def iter_entry_tree_lines(entry_tree: EntryTreeNode, indent=2) -> Iterable[str]:
+    visit_list = [(entry_tree, 0)]
+    while visit_list:
+        curr_item, level = visit_list.pop()
         spaces = " " * level * indent
         prop = ""
         if curr_item.property is not None:
             prop = f"{curr_item.property}: "
-        ret_content.append(f"{spaces}{prop}entry: {curr_item.entry} items num: {len(curr_item.items)}\n")
-    return "".join(ret_content)
+        yield f"{spaces}{prop}entry: {curr_item.entry} items num: {len(curr_item.items)}\n"
+        visit_list.extend((subnode, level + 1) for subnode in reversed(curr_item.items))
 
 
 ## ==================================================
@@ -1360,8 +2100,11 @@ def print_entry_tree(entry_tree: EntryTreeNode, indent=2) -> str:
 # convert Entries graph to Entry tree
 class EntryTreeConverter:
 
-    def __init__(self, include_internals=False):
+    def __init__(self, include_internals=False, internal_flags: EntryInternalFlags = None):
+        if internal_flags is None:
+            internal_flags = EntryInternalFlags()
         self.include_internals = include_internals
+        self.internal_flags: EntryInternalFlags = internal_flags
         self.entry_node_dict = {}
 
     def convert(self, entry: Entry, traversal: GraphAbstractTraversal) -> EntryTreeNode:
@@ -1381,7 +2124,7 @@ class EntryTreeConverter:
         entry = curr_data[1]
         if isinstance(entry, Entry):
             if not self.include_internals:
-                if is_entry_language_internal(entry):
+                if self.internal_flags.is_internal(entry):
                     return False
 
         prop = curr_data[0]
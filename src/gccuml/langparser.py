@@ -7,11 +7,15 @@
 #
 
 import os
+import sys
 import logging
 import re
-from typing import Dict, Any, Tuple, List
+import pickle
+import hashlib
+from typing import Dict, Any, Tuple, List, Iterable
 
 from gccuml.langcontent import LangContent
+from gccuml.langentrylist import ENTRY_DEF_LIST
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -19,14 +23,356 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 _LOGGER = logging.getLogger(__name__)
 
 
-def parse_raw(input_path: str, reducepaths: str = None) -> LangContent:
-    if not os.path.isfile(input_path):
+## increase when format of parsed content changes
+PARSE_CACHE_VERSION = 2
+
+
+## 'release_lines' drops raw lines after conversion to entries (see 'LangContent.release_content_lines')
+def parse_raw(
+    input_path: str, reducepaths: str = None, cache_dir: str = None, prune_internals=False, release_lines=False
+) -> LangContent:
+    content_dict = parse_raw_dict(input_path, reducepaths, cache_dir, prune_internals=prune_internals)
+    if content_dict is None:
         return None
-    _LOGGER.debug("reading input file")
-    content_lines = read_raw_file(input_path)
-    content_dict = convert_bytes_to_dict(content_lines, reducepaths)
     _LOGGER.debug("parsing raw content")
-    return LangContent(content_dict)
+    return LangContent(content_dict, release_lines=release_lines)
+
+
+def parse_raw_dict(
+    input_path: str, reducepaths: str = None, cache_dir: str = None, prune_internals=False
+) -> Dict[str, Any]:
+    """Read raw file and convert it to dict of entries lines.
+
+    If 'cache_dir' is given, then converted content is stored in the directory
+    and reused until the input file changes. If 'prune_internals' is set, then
+    entries not reachable from user declarations are removed (see 'prune_content_dict').
+    """
+    if not os.path.isfile(input_path):
+        return None
+    content_dict = None
+    cache_path = None
+    if cache_dir:
+        cache_path = get_parse_cache_path(input_path, reducepaths, cache_dir)
+        content_dict = load_parse_cache(cache_path)
+        if content_dict is not None:
+            _LOGGER.info("loaded parsed content of %s from cache", input_path)
+    if content_dict is None:
+        _LOGGER.debug("reading input file")
+        content_lines = read_raw_file(input_path)
+        content_dict = convert_bytes_to_dict(content_lines, reducepaths)
+        if cache_path:
+            store_parse_cache(cache_path, content_dict)
+    if prune_internals:
+        content_dict = prune_content_dict(content_dict)
+    return content_dict
+
+
+def get_parse_cache_path(input_path: str, reducepaths: str, cache_dir: str):
+    file_stat = os.stat(input_path)
+    key_data = f"{PARSE_CACHE_VERSION}\n{os.path.abspath(input_path)}\n{file_stat.st_size}\n{file_stat.st_mtime_ns}"
+    key_data += f"\n{reducepaths}"
+    cache_key = hashlib.blake2b(key_data.encode("utf-8"), digest_size=20).hexdigest()
+    return os.path.join(cache_dir, f"{cache_key}.pickle")
+
+
+def load_parse_cache(cache_path) -> Dict[str, Any]:
+    if not os.path.isfile(cache_path):
+        return None
+    try:
+        with open(cache_path, "rb") as cache_file:
+            return pickle.load(cache_file)
+    except (OSError, EOFError, pickle.UnpicklingError) as exc:
+        _LOGGER.warning("unable to load parse cache %s: %s", cache_path, exc)
+        return None
+
+
+def store_parse_cache(cache_path, content_dict: Dict[str, Any]):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as cache_file:
+        pickle.dump(content_dict, cache_file)
+    os.replace(temp_path, cache_path)
+
+
+# =========================================
+
+
+## properties holding content of entry (members, declarations, body), not needed to describe internal entry
+PRUNE_CONTENT_PROPS = {"dcls", "flds", "chain", "body", "binf", "vfld", "fncs", "csts", "args", "rslt", "vars", "inst", "spcs"}
+
+## properties pointing to chain of declarations
+PRUNE_CHAIN_PROPS = {"dcls", "flds", "chain", "args", "vars"}
+
+
+def prune_content_dict(content_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove entries not reachable from user declarations.
+
+    Roots are the first entry (global namespace) and declarations placed in source files that are not compiler or standard
+    library internals (see 'is_content_entry_internal'). Internal entries referenced
+    by user code are kept, but without their content (e.g. fields or declarations
+    of namespace). Internal declarations are cut out of declarations chains. Properties
+    referencing removed entries are removed.
+    """
+    internal_dict: Dict[str, bool] = {}
+
+    def is_internal(entry_id):
+        return is_content_entry_internal(content_dict, entry_id, internal_dict)
+
+    ## find next not internal entry in chain
+    def skip_chain(entry_id):
+        visited = set()
+        while entry_id is not None and is_internal(entry_id):
+            if entry_id in visited:
+                return None
+            visited.add(entry_id)
+            entry_id = get_content_prop(content_dict, entry_id, "chain")
+        return entry_id
+
+    ## first entry is root of content (global namespace)
+    roots_list = list(content_dict.keys())[:1]
+    for entry_id, entry_data in content_dict.items():
+        if not entry_data[1].endswith("_decl"):
+            continue
+        srcp = get_content_prop(content_dict, entry_id, "srcp")
+        if srcp is None or srcp.startswith("<built-in>"):
+            continue
+        if is_internal(entry_id) or entry_id in roots_list:
+            continue
+        roots_list.append(entry_id)
+
+    ## breadth first traversal
+    ## entry id -> list of properties
+    pruned_dict: Dict[str, List[Tuple[str, str]]] = {}
+    queue = roots_list
+    visited_set = set(roots_list)
+    while queue:
+        next_queue = []
+        for entry_id in queue:
+            entry_internal = is_internal(entry_id)
+            entry_type = content_dict[entry_id][1]
+            props_list = []
+            for prop_key, prop_val in content_dict[entry_id][2]:
+                if not prop_val.startswith("@") or (prop_key == "strg" and entry_type == "string_cst"):
+                    props_list.append((prop_key, prop_val))
+                    continue
+                if entry_internal and prop_key in PRUNE_CONTENT_PROPS:
+                    continue
+                if prop_key in PRUNE_CHAIN_PROPS:
+                    prop_val = skip_chain(prop_val)
+                    if prop_val is None:
+                        continue
+                if prop_val not in content_dict:
+                    continue
+                props_list.append((prop_key, prop_val))
+                if prop_val not in visited_set:
+                    visited_set.add(prop_val)
+                    next_queue.append(prop_val)
+            pruned_dict[entry_id] = props_list
+        queue = next_queue
+
+    ## keep original order of entries
+    ret_dict = {}
+    for entry_id, entry_data in content_dict.items():
+        props_list = pruned_dict.get(entry_id)
+        if props_list is None:
+            continue
+        ret_dict[entry_id] = (entry_id, entry_data[1], props_list)
+
+    _LOGGER.info(
+        "pruned content: kept %s entries, dropped %s entries", len(ret_dict), len(content_dict) - len(ret_dict)
+    )
+    return ret_dict
+
+
+def is_content_entry_internal(content_dict: Dict[str, Any], entry_id, internal_dict: Dict[str, bool] = None) -> bool:
+    """Check if entry is compiler or standard library internal.
+
+    Internal are namespaces 'std' and '__*', built-in declarations, declarations
+    placed inside internal scope and types declared by internal declarations.
+    'internal_dict' serves as cache of results.
+    """
+    if internal_dict is None:
+        internal_dict = {}
+    found = internal_dict.get(entry_id)
+    if found is not None:
+        return found
+    ## prevent infinite recursion on cyclic scopes
+    internal_dict[entry_id] = False
+    entry_data = content_dict.get(entry_id)
+    if entry_data is None:
+        return False
+    entry_type = entry_data[1]
+
+    internal = False
+    if entry_type == "translation_unit_decl":
+        internal = False
+    elif entry_type == "namespace_decl":
+        name_id = get_content_prop(content_dict, entry_id, "name")
+        name = get_content_prop(content_dict, name_id, "strg") if name_id else None
+        if name and (name == "std" or name.startswith("__")):
+            internal = True
+        else:
+            internal = is_content_scope_internal(content_dict, entry_id, internal_dict)
+    elif entry_type.endswith("_decl"):
+        srcp = get_content_prop(content_dict, entry_id, "srcp")
+        if srcp and srcp.startswith("<built-in>"):
+            internal = True
+        else:
+            internal = is_content_scope_internal(content_dict, entry_id, internal_dict)
+    elif entry_type in ("record_type", "union_type", "enumeral_type"):
+        name_id = get_content_prop(content_dict, entry_id, "name")
+        if name_id and content_dict.get(name_id, (None, ""))[1].endswith("_decl"):
+            internal = is_content_entry_internal(content_dict, name_id, internal_dict)
+
+    internal_dict[entry_id] = internal
+    return internal
+
+
+def is_content_scope_internal(content_dict: Dict[str, Any], entry_id, internal_dict: Dict[str, bool]) -> bool:
+    scope_id = get_content_prop(content_dict, entry_id, "scpe")
+    if scope_id is None:
+        return False
+    return is_content_entry_internal(content_dict, scope_id, internal_dict)
+
+
+## states of entries in sub dump
+_SUB_REFERENCE = 1  # referenced declaration or type - content is skipped
+_SUB_ROOT = 2  # selected root - all properties except 'chain' (siblings of root)
+_SUB_CONTAINED = 3  # contained in root - all properties
+
+
+def extract_sub_content_dict(content_dict: Dict[str, Any], roots_ids: List[str]) -> Dict[str, Any]:
+    """Extract entries reachable from given roots.
+
+    Roots and entries contained in them (through 'PRUNE_CONTENT_PROPS' properties, e.g.
+    declarations of namespace or fields of class) are copied with all properties.
+    Other declarations and types referenced from them are copied without content, so
+    the result does not grow to the whole translation unit. Ids are renumbered densely
+    starting from '@1' (first root) and references are rewritten.
+    """
+    if not roots_ids:
+        raise RuntimeError("no roots given")
+    states_dict: Dict[str, int] = {}
+    order_list: List[str] = []
+
+    queue = []
+    for root_id in roots_ids:
+        if root_id not in content_dict:
+            raise RuntimeError(f"unable to find root entry {root_id}")
+        queue.append((root_id, _SUB_ROOT))
+
+    while queue:
+        next_queue = []
+        for entry_id, state in queue:
+            prev_state = states_dict.get(entry_id)
+            if prev_state is None:
+                order_list.append(entry_id)
+            elif prev_state >= state:
+                continue
+            states_dict[entry_id] = state
+            for prop_key, prop_val, sub_state in _get_sub_entries_states(content_dict, entry_id, state):
+                if states_dict.get(prop_val, 0) < sub_state:
+                    next_queue.append((prop_val, sub_state))
+        queue = next_queue
+
+    ids_map = {entry_id: f"@{index + 1}" for index, entry_id in enumerate(order_list)}
+    ret_dict = {}
+    for entry_id in order_list:
+        entry_type = content_dict[entry_id][1]
+        state = states_dict[entry_id]
+        allowed_props = {key for key, _val, _state in _get_sub_entries_states(content_dict, entry_id, state)}
+        props_list = []
+        for prop_key, prop_val in content_dict[entry_id][2]:
+            if not prop_val.startswith("@") or (prop_key == "strg" and entry_type == "string_cst"):
+                props_list.append((prop_key, prop_val))
+                continue
+            if prop_key not in allowed_props:
+                continue
+            props_list.append((prop_key, ids_map[prop_val]))
+        new_id = ids_map[entry_id]
+        ret_dict[new_id] = (new_id, entry_type, props_list)
+
+    _LOGGER.info("extracted %s entries of %s", len(ret_dict), len(content_dict))
+    return ret_dict
+
+
+## returns list of (property, referenced entry id, state of referenced entry)
+def _get_sub_entries_states(content_dict: Dict[str, Any], entry_id, state) -> List[Tuple[str, str, int]]:
+    entry_type = content_dict[entry_id][1]
+    ## only declarations and types have content that can be skipped
+    restricted = entry_type.endswith("_decl") or entry_type.endswith("_type")
+    ret_list = []
+    for prop_key, prop_val in content_dict[entry_id][2]:
+        if not prop_val.startswith("@") or (prop_key == "strg" and entry_type == "string_cst"):
+            continue
+        if prop_val not in content_dict:
+            continue
+        if restricted:
+            if prop_key in PRUNE_CONTENT_PROPS:
+                if state == _SUB_REFERENCE:
+                    continue
+                if prop_key == "chain" and state == _SUB_ROOT:
+                    continue
+                ret_list.append((prop_key, prop_val, _SUB_CONTAINED))
+                continue
+            if prop_key == "type" and state != _SUB_REFERENCE:
+                ## type declared by the declaration (e.g. record of class) is part of it
+                if get_content_prop(content_dict, prop_val, "name") == entry_id:
+                    ret_list.append((prop_key, prop_val, _SUB_CONTAINED))
+                    continue
+            ret_list.append((prop_key, prop_val, _SUB_REFERENCE))
+            continue
+        if entry_type in ("tree_list", "tree_vec"):
+            ## items of list have the same state as list itself (e.g. instances of template)
+            sub_state = _SUB_REFERENCE if state == _SUB_REFERENCE else _SUB_CONTAINED
+            ret_list.append((prop_key, prop_val, sub_state))
+            continue
+        ## expressions and constants are copied entirely, but declarations referenced
+        ## by them are not (except chains of declarations, e.g. local variables)
+        if prop_key in PRUNE_CHAIN_PROPS:
+            ret_list.append((prop_key, prop_val, _SUB_CONTAINED))
+        else:
+            ret_list.append((prop_key, prop_val, _SUB_REFERENCE))
+    return ret_list
+
+
+def write_raw_file(content_dict: Dict[str, Any], out_path):
+    """Write content dict in gcc raw format (readable by 'read_raw_file')."""
+    parent_dir = os.path.dirname(os.path.abspath(out_path))
+    os.makedirs(parent_dir, exist_ok=True)
+    with open(out_path, "wb") as out_file:
+        for line in convert_dict_to_bytes(content_dict):
+            out_file.write(line)
+            out_file.write(b"\n")
+
+
+def convert_dict_to_bytes(content_dict: Dict[str, Any]) -> Iterable[bytes]:
+    for entry_id, entry_type, props_list in content_dict.values():
+        line = f"{entry_id:<7} {entry_type:<16} ".encode("utf-8")
+        props_bytes = []
+        for prop_key, prop_val in props_list:
+            if prop_key == "strg" and entry_type == "string_cst":
+                ## string is followed by its length (see 'convert_bytes_string_cst')
+                props_bytes.append(b"strg: " + unescape_string_cst(prop_val) + b" ")
+                continue
+            props_bytes.append(f"{prop_key}: {prop_val:<8}".encode("utf-8"))
+        yield (line + b" ".join(props_bytes)).rstrip()
+
+
+## revert conversion of 'strg' value done by 'convert_bytes_string_cst'
+def unescape_string_cst(value: str) -> bytes:
+    return value.encode("utf-8", "surrogateescape")
+
+
+## get first value of property of entry in content dict
+def get_content_prop(content_dict: Dict[str, Any], entry_id, prop_key):
+    entry_data = content_dict.get(entry_id)
+    if entry_data is None:
+        return None
+    for key, value in entry_data[2]:
+        if key == prop_key:
+            return value
+    return None
 
 
 # =========================================
@@ -43,6 +389,7 @@ def convert_bytes_to_dict(content_bytes, reducepaths=None) -> Dict[str, Any]:
         reduce_len = len(reducepaths)
     content_dict = {}
     converter = ProprertiesConverter()
+    strings_table = StringTable()
     for line in content_bytes:
         # there can be item with no parameters
         ## regex: <ID><whitespaces><type><properties>
@@ -54,8 +401,9 @@ def convert_bytes_to_dict(content_bytes, reducepaths=None) -> Dict[str, Any]:
         line_type = found.group(2)
         props_raw_data = found.group(3)
 
-        line_id = line_id.decode("utf-8")
-        line_type = line_type.decode("utf-8")
+        ## identifier is shared with references to the entry
+        line_id = strings_table.get(line_id.decode("utf-8"))
+        line_type = strings_table.get(line_type.decode("utf-8"))
         props_list = converter.convert_type_bytes(line_type, props_raw_data)
 
         if reducepaths:
@@ -65,10 +413,76 @@ def convert_bytes_to_dict(content_bytes, reducepaths=None) -> Dict[str, Any]:
                     prop_key = prop_data[0]
                     reduced_val = prop_val[reduce_len:]
                     props_list[index] = (prop_key, reduced_val)
+        for index, (prop_key, prop_val) in enumerate(props_list):
+            prop_key = strings_table.get(prop_key)
+            if prop_key == "srcp":
+                ## source locations repeat a lot - share strings regardless of length
+                prop_val = strings_table.get(prop_val)
+            else:
+                prop_val = strings_table.get_value(prop_val)
+            props_list[index] = (prop_key, prop_val)
         content_dict[line_id] = (line_id, line_type, props_list)
+
+    saved_bytes = strings_table.saved_bytes
+    _LOGGER.info(
+        "shared strings: %s distinct, saved %s bytes (%.1f bytes per entry)",
+        len(strings_table.table),
+        saved_bytes,
+        saved_bytes / max(len(content_dict), 1),
+    )
     return content_dict
 
 
+## maximal length of property value to share (longer values are mostly unique)
+STRING_TABLE_VALUE_MAX_LENGTH = 24
+
+## names of properties occurring in dumps (see 'tools --outtypefields')
+# fmt: off
+PROPERTY_KEYS_LIST = [
+    "accs", "algn", "args", "argt", "base", "bases", "bfld", "binf", "bitfield", "body", "bpos", "chain", "chan",
+    "chld", "clas", "clnp", "cnst", "cond", "dcls", "decl", "domn", "elts", "expr", "flds", "fn", "fncs", "hdlr",
+    "idx", "init", "inst", "int", "labl", "lang", "line", "link", "lngt", "low", "max", "min", "mngl", "name",
+    "note", "op 0", "op 1", "op 2", "orig", "prec", "prms", "ptd", "purp", "qual", "refd", "retn", "rslt", "scpe",
+    "sign", "size", "spcs", "spec", "srcp", "strg", "tag", "type", "unql", "used", "val", "valu", "vars", "vfld",
+]
+# fmt: on
+
+
+class StringTable:
+    """Table of shared strings.
+
+    Equal strings returned by the table are the same object, so repeated keys,
+    entry type names and short values are stored once. Table is seeded with
+    entry type names and properties keys.
+    """
+
+    def __init__(self, max_value_length=STRING_TABLE_VALUE_MAX_LENGTH):
+        self.max_value_length = max_value_length
+        self.table: Dict[str, str] = {}
+        ## memory saved by returning shared strings instead of given ones
+        self.saved_bytes = 0
+        for item in ENTRY_DEF_LIST:
+            self.get(item[1])
+        for item in PROPERTY_KEYS_LIST:
+            self.get(item)
+
+    ## returns shared string equal to given one
+    def get(self, value: str) -> str:
+        found = self.table.get(value)
+        if found is None:
+            self.table[value] = value
+            return value
+        if found is not value:
+            self.saved_bytes += sys.getsizeof(value)
+        return found
+
+    ## returns shared string if value is short enough
+    def get_value(self, value: str) -> str:
+        if len(value) > self.max_value_length:
+            return value
+        return self.get(value)
+
+
 class ProprertiesConverter:
 
     def __init__(self, properties_str=""):
@@ -143,28 +557,17 @@ class ProprertiesConverter:
         ## reading string field
         strg_key = self.consume_key(strip_props=False)
         strg_key = strg_key.decode("utf-8")
-        strg_value = self.raw_properties
+        ## string is kept unescaped - escaping is done on output (see 'langcontent.get_string_cst_value')
         try:
+            ## length includes terminating null
+            strg_value = self.raw_properties[: length_value - 1]
             strg_value = strg_value.decode("utf-8")
-            strg_len = len(strg_value)
-            expected_len = min(strg_len, length_value - 1)
-            strg_value = strg_value[0:expected_len]
-
-            ## escape twice to prevent unescaping in plantuml/dot to svg conversion
-            strg_value = strg_value.encode("unicode-escape")  ## escapes newlines (prevents \n)
-            strg_value = strg_value.decode("utf-8")
-            strg_value = strg_value.encode("unicode-escape")  ## escapes newlines (prevents \n)
-            strg_value = strg_value.decode("utf-8")
-
         except UnicodeDecodeError:
             ## there is rare situation where "strg" field contains UTF-8 invalid characters
             ## it happens, e.g. during C-array initialization
-            strg_value = strg_value.hex()
-            strg_len = len(strg_value)
-            expected_len = min(strg_len, length_value * 2)
-            strg_value = strg_value[0:expected_len]
-            strg_value = strg_value.upper()
-            strg_value = "0x" + strg_value
+            ## invalid bytes are stored as surrogates, so they can be restored
+            strg_value = self.raw_properties[:length_value]
+            strg_value = strg_value.decode("utf-8", "surrogateescape")
         self.raw_properties = b""
         raw_list.append((strg_key, strg_value))
         raw_list.append((last_key, last_val))
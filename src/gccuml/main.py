@@ -21,8 +21,12 @@ import sys
 import os
 import argparse
 import logging
+from typing import Dict, List, Tuple, Any
 
 from gccuml import logger
+from gccuml.langcontent import LangContent
+from gccuml.langparser import parse_raw_dict
+from gccuml.parallel import get_jobs_number, map_jobs
 from gccuml.configyaml import (
     read_config,
     Config,
@@ -32,12 +36,21 @@ from gccuml.configyaml import (
     find_input_files,
     join_paths,
 )
-from gccuml.tool.tools import process_tools_config
+from gccuml.tool.tools import (
+    process_tools_config,
+    BIG_GRAPH_SPLIT_MODES,
+    BIG_GRAPH_DOT_LIMIT,
+    BIG_GRAPH_RENDER_LIMIT,
+)
 from gccuml.tool.printhtml import print_html_config
-from gccuml.tool.inheritgraph import generate_inherit_graph_config
+from gccuml.tool.inheritgraph import (
+    generate_inherit_graph_config,
+    INHERIT_GRAPH_SPLIT_MODES,
+    INHERIT_GRAPH_SPLIT_MIN_SIZE,
+)
 from gccuml.tool.memlayout import generate_memory_layout_graph_config
 from gccuml.tool.ctrlflowgraph import generate_control_flow_graph_config, get_engine_file_extension
-
+from gccuml.tool.batch import process_batch_config, RAW_FILE_PATTERN, MEMORY_FACTOR
 
 if __name__ == "__main__":
     _LOGGER = logging.getLogger("gccuml.main")
@@ -48,30 +61,30 @@ else:
 # =======================================================================
 
 
-def handle_config_printhtml(config_dict, diagram_name, diagram_output_directory):
+def handle_config_printhtml(config_dict, diagram_name, diagram_output_directory, content=None):
     config_dict["outpath"] = os.path.join(diagram_output_directory, f"{diagram_name}")
-    print_html_config(config_dict)
+    print_html_config(config_dict, content=content)
 
 
-def handle_config_inheritgraph(config_dict, diagram_name, diagram_output_directory):
+def handle_config_inheritgraph(config_dict, diagram_name, diagram_output_directory, content=None):
     config_dict["outpath"] = os.path.join(diagram_output_directory, f"{diagram_name}.puml")
-    generate_inherit_graph_config(config_dict)
+    generate_inherit_graph_config(config_dict, content=content)
 
 
-def handle_config_memlayout(config_dict, diagram_name, diagram_output_directory):
+def handle_config_memlayout(config_dict, diagram_name, diagram_output_directory, content=None):
     config_dict["outpath"] = os.path.join(diagram_output_directory, f"{diagram_name}.dot")
-    generate_memory_layout_graph_config(config_dict)
+    generate_memory_layout_graph_config(config_dict, content=content)
 
 
-def handle_config_ctrlflowgraph(config_dict, diagram_name, diagram_output_directory):
+def handle_config_ctrlflowgraph(config_dict, diagram_name, diagram_output_directory, content=None):
     diagram_engine = config_dict.get("engine", "dot")
     out_extension = get_engine_file_extension(diagram_engine)
     config_dict["outpath"] = os.path.join(diagram_output_directory, f"{diagram_name}.{out_extension}")
-    generate_control_flow_graph_config(config_dict)
+    generate_control_flow_graph_config(config_dict, content=content)
 
 
-def handle_config_tools(config_dict, _diagram_name, _diagram_output_directory):
-    process_tools_config(config_dict)
+def handle_config_tools(config_dict, _diagram_name, _diagram_output_directory, content=None):
+    process_tools_config(config_dict, content=content)
 
 
 CONFIG_DIAGRAM_TYPE_HANDLER = {
@@ -100,6 +113,8 @@ def process_config(args):
     ## handled
     # output_directory
     # debug_mode
+    # jobs
+    # parse_cache_directory
 
     ## not applicable:
     # add_compile_flags
@@ -115,6 +130,8 @@ def process_config(args):
     if diagrams_dict is None:
         raise RuntimeError("unable to find 'diagrams' item")
 
+    groups_dict: Dict[Tuple[Any, ...], List[Tuple[str, Dict[str, Any], str, str]]] = {}
+
     for diagram_name, diagram_config in diagrams_dict.items():
         if diagram_config is None:
             _LOGGER.warning("invalid config diagram entry: %s", diagram_name)
@@ -174,7 +191,70 @@ def process_config(args):
         if diagram_type_handler is None:
             raise RuntimeError(f"unknown or unhandled diagram: '{diagram_type}'")
 
-        diagram_type_handler(config_dict, diagram_name, diagram_output_directory)
+        ## group diagrams by input, so each input is parsed once
+        group_key = (
+            tuple(sorted(input_files)),
+            config_dict.get("reducepaths", False),
+            config_dict.get("pruneinternals", False),
+        )
+        diagram_data = (diagram_type, config_dict, diagram_name, diagram_output_directory)
+        groups_dict.setdefault(group_key, []).append(diagram_data)
+
+    groups_list = list(groups_dict.values())
+    jobs = get_jobs_number(config.get("jobs") or 1)
+    _LOGGER.info("found %s diagrams in %s input groups", sum(len(item) for item in groups_list), len(groups_list))
+    if jobs > 1 and len(groups_list) > 1:
+        ## worker processes are not allowed to spawn subprocesses
+        for group in groups_list:
+            for diagram_data in group:
+                diagram_data[1]["jobs"] = 1
+
+    parse_cache_dir = config.get("parse_cache_directory")
+    if parse_cache_dir:
+        parse_cache_dir = join_paths(get_base_directory(config_path, None), parse_cache_dir)
+
+    args_list = [(group, parse_cache_dir) for group in groups_list]
+    map_jobs(process_config_group, args_list, jobs=jobs)
+
+
+## process diagrams sharing the same input
+def process_config_group(diagrams_list: List[Tuple[str, Dict[str, Any], str, str]], parse_cache_dir=None):
+    first_config = diagrams_list[0][1]
+    input_files = first_config["inputfiles"]
+    content_dict = None
+    if len(input_files) == 1:
+        ## multiple input files are parsed by diagram generators
+        raw_file_path = input_files[0]
+        _LOGGER.info("parsing input file %s", raw_file_path)
+        reduce_paths = first_config.get("reducepaths", False)
+        prune_internals = first_config.get("pruneinternals", False)
+        content_dict = parse_raw_dict(
+            raw_file_path, reduce_paths, cache_dir=parse_cache_dir, prune_internals=prune_internals
+        )
+        if content_dict is None:
+            raise RuntimeError(f"unable to parse {raw_file_path}")
+    elif parse_cache_dir:
+        ## each file is parsed by worker of diagram generator
+        for _, config_dict, _, _ in diagrams_list:
+            config_dict["parsecachedir"] = parse_cache_dir
+
+    ## raw lines are needed only by 'tools' (e.g. sub dump)
+    release_lines = all(
+        config_dict.get("releaselines", diagram_type != "tools") for diagram_type, config_dict, _, _ in diagrams_list
+    )
+
+    ## diagrams share content, except 'printhtml' without transformation that needs unconverted entries
+    contents_dict: Dict[bool, LangContent] = {}
+    for diagram_type, config_dict, diagram_name, diagram_output_directory in diagrams_list:
+        content = None
+        if content_dict is not None:
+            raw_content = diagram_type == "printhtml" and config_dict.get("notransform", False)
+            content = contents_dict.get(raw_content)
+            if content is None:
+                content = LangContent(content_dict, release_lines=release_lines)
+                contents_dict[raw_content] = content
+        diagram_type_handler = CONFIG_DIAGRAM_TYPE_HANDLER[diagram_type]
+        diagram_type_handler(config_dict, diagram_name, diagram_output_directory, content=content)
 
 
 def process_printhtml(args):
@@ -194,8 +274,12 @@ def process_printhtml(args):
 
 def process_inheritgraph(args):
     config_dict = {
-        "inputfiles": [args.rawfile],
+        "inputfiles": args.rawfile,
+        "jobs": args.jobs,
         "reducepaths": args.reducepaths,
+        "pruneinternals": args.pruneinternals,
+        "split": args.split,
+        "splitminsize": args.splitminsize,
         "outpath": args.outpath,
     }
     generate_inherit_graph_config(config_dict)
@@ -203,8 +287,10 @@ def process_inheritgraph(args):
 
 def process_memlayout(args):
     config_dict = {
-        "inputfiles": [args.rawfile],
+        "inputfiles": args.rawfile,
+        "jobs": args.jobs,
         "reducepaths": args.reducepaths,
+        "pruneinternals": args.pruneinternals,
         "includeinternals": args.includeinternals,
         "graphnote": args.graphnote,
         "outpath": args.outpath,
@@ -216,20 +302,56 @@ def process_ctrlflowgraph(args):
     config_dict = {
         "inputfiles": [args.rawfile],
         "reducepaths": args.reducepaths,
+        "pruneinternals": args.pruneinternals,
         "includeinternals": args.includeinternals,
         "engine": args.engine,
+        "jobs": args.jobs,
+        "splitfunctions": args.splitfunctions,
+        "maxnodes": args.maxnodes,
+        "maxtime": args.maxtime,
+        "maxstatements": args.maxstatements,
+        "cachedir": args.cachedir,
         "outpath": args.outpath,
     }
     generate_control_flow_graph_config(config_dict)
 
 
+def process_batch(args):
+    config_dict = {
+        "rootdirs": args.rootdir,
+        "pattern": args.pattern,
+        "diagrams": args.diagrams.split(","),
+        "reducepaths": args.reducepaths,
+        "pruneinternals": args.pruneinternals,
+        "jobs": args.jobs,
+        "memorylimit": args.memorylimit,
+        "memoryfactor": args.memoryfactor,
+        "summary": args.summary,
+        "outdir": args.outdir,
+    }
+    summary = process_batch_config(config_dict)
+    if summary["failed"]:
+        return 1
+    return 0
+
+
 def process_tools(args):
     config_dict = {
         "inputfiles": [args.rawfile],
         "reducepaths": args.reducepaths,
+        "pruneinternals": args.pruneinternals,
         "outtypefields": args.outtypefields,
+        "typefieldsmaxvalues": args.typefieldsmaxvalues,
+        "jobs": args.jobs,
         "outtreetxt": args.outtreetxt,
         "outbiggraph": args.outbiggraph,
+        "biggraphsplit": args.biggraphsplit,
+        "biggraphdotlimit": args.biggraphdotlimit,
+        "biggraphrenderlimit": args.biggraphrenderlimit,
+        "outentryhashes": args.outentryhashes,
+        "hashignoreprops": args.hashignoreprops,
+        "outsubdump": args.outsubdump,
+        "subdumproots": args.subdumproots,
         "includeinternals": args.includeinternals,
     }
     process_tools_config(config_dict)
@@ -351,13 +473,46 @@ def main():
     subparser.add_argument(
         "--rawfile",
         action="store",
+        nargs="+",
         required=True,
         default=None,
-        help="Path to internal tree file (.003l.raw) to analyze",
+        help="Path to internal tree file (.003l.raw) to analyze. Multiple files are merged into one diagram.",
+    )
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        required=False,
+        default="auto",
+        help="Number to subprocesses to execute in case of multiple input files. Auto means to spawn job per CPU core.",
     )
     subparser.add_argument(
         "--reducepaths", action="store", required=False, default=None, help="Prefix to remove from paths inside tree"
     )
+    subparser.add_argument(
+        "--pruneinternals",
+        type=str2bool,
+        nargs="?",
+        const=True,
+        default=False,
+        help="Remove compiler and std internals not reachable from user declarations right after parsing",
+    )
+    subparser.add_argument(
+        "--split",
+        action="store",
+        required=False,
+        default=None,
+        choices=INHERIT_GRAPH_SPLIT_MODES,
+        help="Split diagram into files by connected components or by top level namespaces."
+        " Output path then contains index diagram linking the files",
+    )
+    subparser.add_argument(
+        "--splitminsize",
+        type=int,
+        required=False,
+        default=INHERIT_GRAPH_SPLIT_MIN_SIZE,
+        help="Connected components with less classes are gathered in common file",
+    )
     subparser.add_argument(
         "--outpath", action="store", required=True, default=None, help="Output path of PlantUML representation"
     )
@@ -370,7 +525,22 @@ def main():
     )
     subparser.description = description
     subparser.set_defaults(func=process_memlayout)
-    subparser.add_argument("--rawfile", action="store", required=True, default=None, help="Path to raw file to analyze")
+    subparser.add_argument(
+        "--rawfile",
+        action="store",
+        nargs="+",
+        required=True,
+        default=None,
+        help="Path to raw file to analyze. Multiple files are merged into one diagram.",
+    )
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        required=False,
+        default="auto",
+        help="Number to subprocesses to execute in case of multiple input files. Auto means to spawn job per CPU core.",
+    )
     subparser.add_argument(
         "-ii",
         "--includeinternals",
@@ -383,6 +553,14 @@ def main():
     subparser.add_argument(
         "--reducepaths", action="store", required=False, default=None, help="Prefix to remove from paths inside tree"
     )
+    subparser.add_argument(
+        "--pruneinternals",
+        type=str2bool,
+        nargs="?",
+        const=True,
+        default=False,
+        help="Remove compiler and std internals not reachable from user declarations right after parsing",
+    )
     subparser.add_argument("--graphnote", action="store", required=False, default=None, help="Note to put on graph")
     subparser.add_argument(
         "--outpath", action="store", required=True, default=None, help="Output path of DOT representation"
@@ -416,7 +594,63 @@ def main():
         "--reducepaths", action="store", required=False, default=None, help="Prefix to remove from paths inside tree"
     )
     subparser.add_argument(
-        "--engine", action="store", required=False, default="dot", help="Diagram engine: dot, plantuml"
+        "--pruneinternals",
+        type=str2bool,
+        nargs="?",
+        const=True,
+        default=False,
+        help="Remove compiler and std internals not reachable from user declarations right after parsing",
+    )
+    subparser.add_argument(
+        "--engine",
+        action="store",
+        required=False,
+        default="dot",
+        help="Diagram engine: dot, plantuml or comma separated list of engines (e.g. 'dot,plantuml')",
+    )
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        required=False,
+        default="auto",
+        help="Number to subprocesses to execute. Auto means to spawn job per CPU core.",
+    )
+    subparser.add_argument(
+        "--splitfunctions",
+        type=str2bool,
+        nargs="?",
+        const=True,
+        default=False,
+        help="Write diagram of each function to separate file and store index of functions in output path",
+    )
+    subparser.add_argument(
+        "--maxnodes",
+        type=int,
+        required=False,
+        default=None,
+        help="Limit of expression nodes visited during analysis of single function",
+    )
+    subparser.add_argument(
+        "--maxtime",
+        type=float,
+        required=False,
+        default=None,
+        help="Limit of analysis time (in seconds) of single function",
+    )
+    subparser.add_argument(
+        "--maxstatements",
+        type=int,
+        required=False,
+        default=None,
+        help="Limit of statements in diagram of single function",
+    )
+    subparser.add_argument(
+        "--cachedir",
+        action="store",
+        required=False,
+        default=None,
+        help="Directory to store analyzed functions, so unchanged functions are not analyzed again in next run",
     )
     subparser.add_argument(
         "--outpath", action="store", required=True, default=None, help="Output path for DOT representation"
@@ -424,6 +658,72 @@ def main():
 
     ## =================================================
 
+    description = "generate diagrams for all internal tree files found in directory (e.g. build tree)"
+    subparser = subparsers.add_parser("batch", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    subparser.description = description
+    subparser.set_defaults(func=process_batch)
+    subparser.add_argument(
+        "--rootdir",
+        action="store",
+        nargs="+",
+        required=True,
+        default=None,
+        help="Directory to search for internal tree files (or path to internal tree file)",
+    )
+    subparser.add_argument(
+        "--pattern", action="store", required=False, default=RAW_FILE_PATTERN, help="Pattern of internal tree files"
+    )
+    subparser.add_argument(
+        "--diagrams",
+        action="store",
+        required=False,
+        default="inheritgraph",
+        help="Comma separated list of diagrams to generate for each file: inheritgraph, memlayout, ctrlflowgraph",
+    )
+    subparser.add_argument(
+        "--reducepaths", action="store", required=False, default=None, help="Prefix to remove from paths inside tree"
+    )
+    subparser.add_argument(
+        "--pruneinternals",
+        type=str2bool,
+        nargs="?",
+        const=True,
+        default=False,
+        help="Remove compiler and std internals not reachable from user declarations right after parsing",
+    )
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        required=False,
+        default="auto",
+        help="Number to subprocesses to execute. Auto means to spawn job per CPU core.",
+    )
+    subparser.add_argument(
+        "--memorylimit",
+        type=float,
+        required=False,
+        default=None,
+        help="Memory budget (in MB) of all running jobs. Jobs are started while estimated memory fits the budget.",
+    )
+    subparser.add_argument(
+        "--memoryfactor",
+        type=float,
+        required=False,
+        default=MEMORY_FACTOR,
+        help="Estimated memory of job relative to size of internal tree file",
+    )
+    subparser.add_argument(
+        "--summary",
+        action="store",
+        required=False,
+        default=None,
+        help="Output path of summary (JSON lines). By default 'batch_summary.jsonl' in output directory.",
+    )
+    subparser.add_argument("--outdir", action="store", required=True, default=None, help="Output directory of diagrams")
+
+    ## =================================================
+
     description = "various tools"
     subparser = subparsers.add_parser("tools", help=description, formatter_class=argparse.ArgumentDefaultsHelpFormatter)
     subparser.description = description
@@ -435,9 +735,25 @@ def main():
         default=None,
         help="Path to internal tree file (.003l.raw)e to analyze",
     )
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        action="store",
+        required=False,
+        default="auto",
+        help="Number to subprocesses to execute in case of big input file. Auto means to spawn job per CPU core.",
+    )
     subparser.add_argument(
         "--reducepaths", action="store", required=False, default=None, help="Prefix to remove from paths inside tree"
     )
+    subparser.add_argument(
+        "--pruneinternals",
+        type=str2bool,
+        nargs="?",
+        const=True,
+        default=False,
+        help="Remove compiler and std internals not reachable from user declarations right after parsing",
+    )
     subparser.add_argument(
         "-ii",
         "--includeinternals",
@@ -448,13 +764,84 @@ def main():
         help="Should include compiler internals?",
     )
     subparser.add_argument(
-        "--outtypefields", action="store", required=False, default=None, help="Output path to types and fields"
+        "--outtypefields",
+        action="store",
+        required=False,
+        default=None,
+        help="Output path to types and fields (gzipped if path ends with .gz)",
+    )
+    subparser.add_argument(
+        "--typefieldsmaxvalues",
+        type=int,
+        required=False,
+        default=None,
+        help="Maximum number of distinct values recorded for each property in types and fields output",
+    )
+    subparser.add_argument(
+        "--outtreetxt",
+        action="store",
+        required=False,
+        default=None,
+        help="Output path to tree print (gzipped if path ends with .gz)",
+    )
+    subparser.add_argument(
+        "--outbiggraph",
+        action="store",
+        required=False,
+        default=None,
+        help="Output path to big graph. Format of image is taken from extension, 'dot' extension writes only DOT file",
+    )
+    subparser.add_argument(
+        "--biggraphsplit",
+        action="store",
+        required=False,
+        default=None,
+        choices=BIG_GRAPH_SPLIT_MODES,
+        help="Split big graph into files by connected components or by namespaces",
     )
     subparser.add_argument(
-        "--outtreetxt", action="store", required=False, default=None, help="Output path to tree print"
+        "--biggraphdotlimit",
+        type=int,
+        required=False,
+        default=BIG_GRAPH_DOT_LIMIT,
+        help="Graphs with more nodes are rendered using 'sfdp' instead of 'dot'",
+    )
+    subparser.add_argument(
+        "--biggraphrenderlimit",
+        type=int,
+        required=False,
+        default=BIG_GRAPH_RENDER_LIMIT,
+        help="Graphs with more nodes are written only as DOT file",
     )
     subparser.add_argument(
-        "--outbiggraph", action="store", required=False, default=None, help="Output path to big graph"
+        "--outentryhashes",
+        action="store",
+        required=False,
+        default=None,
+        help="Output path to content hashes of entries (independent of entries ids)",
+    )
+    subparser.add_argument(
+        "--hashignoreprops",
+        action="store",
+        nargs="*",
+        required=False,
+        default=None,
+        help="Properties to ignore when calculating entries hashes (e.g. srcp)",
+    )
+    subparser.add_argument(
+        "--outsubdump",
+        action="store",
+        required=False,
+        default=None,
+        help="Output path to raw file containing only entries reachable from roots given by --subdumproots",
+    )
+    subparser.add_argument(
+        "--subdumproots",
+        action="store",
+        nargs="*",
+        required=False,
+        default=None,
+        help="Roots of sub dump: entries ids (e.g. @12) or qualified names of declarations (e.g. ::items::Abc1)",
     )
 
     ## =================================================
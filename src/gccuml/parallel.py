@@ -0,0 +1,66 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import logging
+import multiprocessing
+from typing import List, Any, Callable, Iterable
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+## convert 'jobs' config value to number of processes
+## None or "auto" means number of processes based on number of CPU cores
+def get_jobs_number(jobs) -> int:
+    if jobs is None or jobs == "auto":
+        jobs = os.cpu_count()
+        return int(jobs * 2 / 3) + 1
+    return int(jobs)
+
+
+def map_jobs(func: Callable, args_list: Iterable[Any], jobs=1, mp_context=None) -> List[Any]:
+    """Call 'func' for each item of 'args_list' (tuple of arguments) using pool of processes.
+
+    Returned results keep order of arguments. Calls are executed in current process
+    if there is less than two jobs or items. 'mp_context' is multiprocessing context
+    used to start processes (None means default start method).
+    """
+    args_list = list(args_list)
+    jobs = get_jobs_number(jobs)
+    jobs = min(jobs, len(args_list))
+    if jobs < 2:
+        return [func(*args) for args in args_list]
+
+    if mp_context is None:
+        mp_context = multiprocessing
+    _LOGGER.info("executing %s tasks using %s processes", len(args_list), jobs)
+    with mp_context.Pool(jobs) as process_pool:
+        result_queue = [process_pool.apply_async(func, args) for args in args_list]
+        return [async_result.get() for async_result in result_queue]
+
+
+## returns multiprocessing context starting processes by "fork" or None if not available (e.g. on Windows)
+def get_fork_context():
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def map_jobs_fork(func: Callable, args_list: Iterable[Any], jobs=1) -> List[Any]:
+    """Variant of 'map_jobs' with worker processes started by "fork".
+
+    Forked workers inherit state of current process (e.g. module globals), so big data
+    does not need to be pickled. Calls are executed in current process if "fork" is not
+    available on platform.
+    """
+    fork_context = get_fork_context()
+    if fork_context is None:
+        _LOGGER.info("fork start method not available, executing tasks in current process")
+        return [func(*args) for args in args_list]
+    return map_jobs(func, args_list, jobs=jobs, mp_context=fork_context)
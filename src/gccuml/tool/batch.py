@@ -0,0 +1,398 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import sys
+import logging
+import time
+import fnmatch
+import traceback
+import json
+import multiprocessing
+from typing import List, Dict, Any, Callable, Tuple
+
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from gccuml.langcontent import LangContent
+from gccuml.langparser import parse_raw
+from gccuml.parallel import get_jobs_number
+from gccuml.tool.inheritgraph import generate_inherit_graph_config
+from gccuml.tool.memlayout import generate_memory_layout_graph_config
+from gccuml.tool.ctrlflowgraph import generate_control_flow_graph_config
+
+try:
+    import resource
+except ImportError:
+    ## not available on Windows
+    resource = None
+
+
+_LOGGER = logging.getLogger(__name__)
+
+
+RAW_FILE_PATTERN = "*.003l.raw"
+
+## estimated peak memory of processing raw file relative to size of the file
+MEMORY_FACTOR = 32
+
+
+## diagram type -> (output file extension, generator)
+BATCH_DIAGRAM_TYPES: Dict[str, Any] = {
+    "inheritgraph": ("puml", generate_inherit_graph_config),
+    "memlayout": ("dot", generate_memory_layout_graph_config),
+    "ctrlflowgraph": ("dot", generate_control_flow_graph_config),
+}
+
+
+def process_batch_config(config: Dict[Any, Any]) -> Dict[str, Any]:
+    root_dirs = config.get("rootdirs")
+    if not root_dirs:
+        raise RuntimeError("no root directory given")
+    out_dir = config.get("outdir")
+    if not out_dir:
+        raise RuntimeError("no output directory given")
+    diagram_types = config.get("diagrams") or ["inheritgraph"]
+    for diagram_type in diagram_types:
+        if diagram_type not in BATCH_DIAGRAM_TYPES:
+            raise RuntimeError(f"unsupported batch diagram type: '{diagram_type}'")
+    pattern = config.get("pattern") or RAW_FILE_PATTERN
+    files_list = find_raw_files(root_dirs, pattern)
+    _LOGGER.info("found %s raw files", len(files_list))
+
+    memory_limit = config.get("memorylimit")
+    if memory_limit:
+        ## megabytes to bytes
+        memory_limit = int(float(memory_limit) * 1024 * 1024)
+    batch = BatchProcessor(
+        out_dir,
+        diagram_types,
+        reduce_paths=config.get("reducepaths"),
+        prune_internals=config.get("pruneinternals", False),
+        jobs=config.get("jobs", "auto"),
+        memory_limit=memory_limit,
+        memory_factor=config.get("memoryfactor") or MEMORY_FACTOR,
+    )
+    summary_path = config.get("summary") or os.path.join(out_dir, "batch_summary.jsonl")
+    return batch.execute(files_list, summary_path)
+
+
+## returns list of pairs (root directory, raw file path)
+def find_raw_files(root_dirs: List[str], pattern=RAW_FILE_PATTERN):
+    ret_list = []
+    for root_dir in root_dirs:
+        if os.path.isfile(root_dir):
+            ret_list.append((os.path.dirname(root_dir), root_dir))
+            continue
+        for dir_path, dir_names, file_names in os.walk(root_dir):
+            dir_names.sort()
+            for file_name in sorted(file_names):
+                if fnmatch.fnmatch(file_name, pattern):
+                    ret_list.append((root_dir, os.path.join(dir_path, file_name)))
+    return ret_list
+
+
+class BatchJob:
+    def __init__(self, root_dir, raw_path, memory_factor=MEMORY_FACTOR):
+        self.root_dir = root_dir
+        self.raw_path = raw_path
+        self.file_size = os.path.getsize(raw_path)
+        self.memory = self.file_size * memory_factor
+
+    ## base of output paths (relative path of raw file inside output directory)
+    def get_output_base(self, out_dir):
+        rel_path = os.path.relpath(self.raw_path, self.root_dir)
+        if rel_path.endswith(".003l.raw"):
+            rel_path = rel_path[: -len(".003l.raw")]
+        elif rel_path.endswith(".raw"):
+            rel_path = rel_path[: -len(".raw")]
+        return os.path.join(out_dir, rel_path)
+
+
+## select next job from list sorted by size (largest first)
+## job that does not fit into memory limit is started only if nothing else is running
+def select_batch_job(pending_list: List[BatchJob], running_memory, memory_limit=None) -> BatchJob:
+    if not pending_list:
+        return None
+    if not memory_limit:
+        return pending_list.pop(0)
+    for index, job in enumerate(pending_list):
+        if running_memory + job.memory <= memory_limit:
+            return pending_list.pop(index)
+    if running_memory == 0:
+        job = pending_list.pop(0)
+        _LOGGER.warning("estimated memory of %s exceeds memory limit, running alone", job.raw_path)
+        return job
+    return None
+
+
+class BatchProcessor:
+    def __init__(
+        self,
+        out_dir,
+        diagram_types: List[str],
+        reduce_paths=None,
+        prune_internals=False,
+        jobs=1,
+        memory_limit=None,
+        memory_factor=MEMORY_FACTOR,
+    ):
+        self.out_dir = out_dir
+        self.diagram_types = diagram_types
+        self.reduce_paths = reduce_paths
+        self.prune_internals = prune_internals
+        self.jobs = get_jobs_number(jobs)
+        self.memory_limit = memory_limit
+        self.memory_factor = memory_factor
+
+    ## returns summary dict
+    def execute(self, files_list, summary_path=None) -> Dict[str, Any]:
+        pending_list = [BatchJob(root_dir, raw_path, self.memory_factor) for root_dir, raw_path in files_list]
+        pending_list.sort(key=lambda job: job.file_size, reverse=True)
+
+        summary_file = None
+        if summary_path:
+            os.makedirs(os.path.dirname(os.path.abspath(summary_path)), exist_ok=True)
+            # pylint: disable=R1732
+            summary_file = open(summary_path, "w", encoding="utf-8")
+
+        start_time = time.perf_counter()
+        results_list: List[Dict[str, Any]] = []
+
+        def handle_result(result: Dict[str, Any]):
+            results_list.append(result)
+            if result["error"]:
+                _LOGGER.error("failed to process %s: %s", result["rawfile"], result["error"])
+            else:
+                _LOGGER.info(
+                    "processed %s/%s: %s in %.3fs",
+                    len(results_list),
+                    len(files_list),
+                    result["rawfile"],
+                    result["time"],
+                )
+            if summary_file:
+                ## stream results, so they are not lost if batch is interrupted
+                summary_file.write(json.dumps(result) + "\n")
+                summary_file.flush()
+
+        try:
+            if self.jobs < 2 or len(pending_list) < 2:
+                while pending_list:
+                    job = pending_list.pop(0)
+                    handle_result(self._execute_job(job))
+            else:
+                self._execute_pool(pending_list, handle_result)
+
+            failed_list = [result["rawfile"] for result in results_list if result["error"]]
+            summary = {
+                "files": len(results_list),
+                "failed": failed_list,
+                "time": time.perf_counter() - start_time,
+                "peakrss": max((result["peakrss"] or 0 for result in results_list), default=0),
+            }
+            if summary_file:
+                summary_file.write(json.dumps({"summary": summary}) + "\n")
+        finally:
+            if summary_file:
+                summary_file.close()
+
+        _LOGGER.info(
+            "processed %s files in %.3fs, failed: %s", summary["files"], summary["time"], len(summary["failed"])
+        )
+        return summary
+
+    def _execute_job(self, job: BatchJob):
+        out_base = job.get_output_base(self.out_dir)
+        return process_batch_file(job.raw_path, out_base, self.diagram_types, self.reduce_paths, self.prune_internals)
+
+    def _execute_pool(self, pending_list: List[BatchJob], result_callback: Callable):
+        jobs = min(self.jobs, len(pending_list))
+        _LOGGER.info("executing %s tasks using %s processes", len(pending_list), jobs)
+        ## jobs running when worker process died - it is not known which one caused it
+        suspects_list: List[BatchJob] = []
+        running_dict: Dict[Future, BatchJob] = {}
+        running_memory = 0
+        executor = create_batch_executor(jobs)
+        try:
+            while pending_list or running_dict:
+                while pending_list and len(running_dict) < jobs:
+                    job = select_batch_job(pending_list, running_memory, self.memory_limit)
+                    if job is None:
+                        break
+                    running_dict[self._submit_job(executor, job)] = job
+                    running_memory += job.memory
+                done_set, _ = wait(running_dict, return_when=FIRST_COMPLETED)
+                broken_list: List[BatchJob] = []
+                for future in done_set:
+                    job = running_dict.pop(future)
+                    running_memory -= job.memory
+                    result = get_future_result(future, job)
+                    if result is None:
+                        broken_list.append(job)
+                        continue
+                    result_callback(result)
+                if not broken_list:
+                    continue
+                ## all running jobs are interrupted by broken pool
+                for future, job in running_dict.items():
+                    result = get_future_result(future, job)
+                    if result is None:
+                        broken_list.append(job)
+                        continue
+                    result_callback(result)
+                running_dict.clear()
+                running_memory = 0
+                _LOGGER.warning("worker process terminated abruptly, restarting pool")
+                executor.shutdown(wait=True)
+                executor = create_batch_executor(jobs)
+                if len(broken_list) == 1:
+                    result_callback(get_broken_result(broken_list[0].raw_path))
+                else:
+                    suspects_list.extend(broken_list)
+        finally:
+            executor.shutdown(wait=True)
+
+        ## repeat interrupted jobs one by one to find the one killing worker
+        for job in suspects_list:
+            with create_batch_executor(1) as executor:
+                result = get_future_result(self._submit_job(executor, job), job)
+            if result is None:
+                result = get_broken_result(job.raw_path)
+            result_callback(result)
+
+    def _submit_job(self, executor: ProcessPoolExecutor, job: BatchJob) -> Future:
+        out_base = job.get_output_base(self.out_dir)
+        return executor.submit(
+            process_batch_file, job.raw_path, out_base, self.diagram_types, self.reduce_paths, self.prune_internals
+        )
+
+
+class SingleTaskExecutor:
+    """Executor running each task in new worker process.
+
+    Replacement of 'ProcessPoolExecutor' with 'max_tasks_per_child=1', which is not available
+    before Python 3.11. Each task has its own executor, so died worker breaks only its task.
+    Workers of finished tasks are released when next task is submitted.
+    """
+
+    def __init__(self, mp_context=None):
+        self.mp_context = mp_context
+        self.running_list: List[Tuple[ProcessPoolExecutor, Future]] = []
+
+    def submit(self, func, *args) -> Future:
+        ## release worker processes of finished tasks
+        running_list = []
+        for executor, future in self.running_list:
+            if future.done():
+                executor.shutdown(wait=True)
+            else:
+                running_list.append((executor, future))
+        executor = ProcessPoolExecutor(1, mp_context=self.mp_context)
+        future = executor.submit(func, *args)
+        running_list.append((executor, future))
+        self.running_list = running_list
+        return future
+
+    def shutdown(self, wait=True):
+        for executor, _ in self.running_list:
+            executor.shutdown(wait=wait)
+        self.running_list.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=True)
+        return False
+
+
+def create_batch_executor(jobs) -> ProcessPoolExecutor:
+    if sys.version_info < (3, 11):
+        ## new process for each file, so memory is released and peak RSS is measured per file
+        return SingleTaskExecutor()
+    mp_context = None
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ## "fork" is not allowed with 'max_tasks_per_child', server with preloaded modules
+        ## starts workers much faster than "spawn"
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload(get_preload_modules())
+    ## new process for each file, so memory is released and peak RSS is measured per file
+    return ProcessPoolExecutor(jobs, mp_context=mp_context, max_tasks_per_child=1)
+
+
+## returns names of modules of the package imported by current process
+## main module is skipped, because it is executed again by each worker
+def get_preload_modules() -> List[str]:
+    main_spec = getattr(sys.modules.get("__main__"), "__spec__", None)
+    main_name = getattr(main_spec, "name", None)
+    package_name = __name__.split(".", maxsplit=1)[0]
+    modules_list = [
+        module_name
+        for module_name in sys.modules
+        if module_name.split(".", maxsplit=1)[0] == package_name and module_name != main_name
+    ]
+    return sorted(modules_list)
+
+
+## returns result of finished job or None if worker process died
+def get_future_result(future: Future, job: BatchJob) -> Dict[str, Any]:
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        return None
+    except Exception as exc:  # pylint: disable=W0718
+        return get_error_result(job.raw_path, repr(exc))
+
+
+def get_broken_result(raw_path) -> Dict[str, Any]:
+    return get_error_result(raw_path, "worker process terminated abruptly")
+
+
+def get_error_result(raw_path, error) -> Dict[str, Any]:
+    return {"rawfile": raw_path, "outputs": [], "time": 0.0, "peakrss": None, "error": error}
+
+
+## parse raw file once and generate all diagrams of given types
+## errors are not raised, but returned in result dict
+def process_batch_file(
+    raw_path, out_base, diagram_types: List[str], reduce_paths=None, prune_internals=False
+) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    outputs_list = []
+    error = None
+    try:
+        content: LangContent = parse_raw(raw_path, reduce_paths, prune_internals=prune_internals, release_lines=True)
+        if content is None:
+            raise RuntimeError(f"unable to parse {raw_path}")
+        for diagram_type in diagram_types:
+            out_extension, generator = BATCH_DIAGRAM_TYPES[diagram_type]
+            out_path = f"{out_base}.{diagram_type}.{out_extension}"
+            config_dict = {"inputfiles": [raw_path], "reducepaths": reduce_paths, "jobs": 1, "outpath": out_path}
+            generator(config_dict, content=content)
+            outputs_list.append(out_path)
+    except Exception:  # pylint: disable=W0718
+        error = traceback.format_exc().strip().splitlines()[-1]
+        _LOGGER.debug("failed to process %s:\n%s", raw_path, traceback.format_exc())
+    return {
+        "rawfile": raw_path,
+        "outputs": outputs_list,
+        "time": time.perf_counter() - start_time,
+        "peakrss": get_peak_rss(),
+        "error": error,
+    }
+
+
+## peak resident set size of current process in bytes
+def get_peak_rss():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return max_rss
+    return max_rss * 1024
@@ -7,13 +7,17 @@
 #
 
 import os
+import re
+import shutil
+import pickle
+import hashlib
 import logging
-from typing import List, Any, Dict
+import time
+from typing import List, Any, Dict, Tuple, Set, NamedTuple
 
 from gccuml.langcontent import (
     LangContent,
     Entry,
-    is_entry_language_internal,
     get_function_full_name,
     get_function_args,
     get_function_ret,
@@ -24,26 +28,37 @@ from gccuml.langanalyze import (
 from gccuml.diagram.activitydata import (
     LabeledCard,
     FunctionArg,
+    TypedStatement,
+    StatementType,
+    count_statements,
 )
-from gccuml.diagram.activitydiagram import generate_diagram
+from gccuml.diagram.activitydiagram import generate_diagram, generate_index
 from gccuml.langparser import parse_raw
 from gccuml.configyaml import Filter
-from gccuml.expressionanalyze import ScopeAnalysis
+from gccuml.expressionanalyze import ScopeAnalysis, AnalysisLimitError, AnalysisTimeLimitError
+from gccuml.parallel import get_jobs_number, map_jobs_fork
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def generate_control_flow_graph_config(config: Dict[Any, Any]):
+## 'content' is parsed input file (if not given, then input file is parsed)
+def generate_control_flow_graph_config(config: Dict[Any, Any], content: LangContent = None):
     input_files = config.get("inputfiles")
     if not input_files:
         raise RuntimeError("no input files given")
     if len(input_files) > 1:
         raise RuntimeError(f"multiple input files not supported: {input_files}")
     raw_file_path = input_files[0]
-    _LOGGER.info("parsing input file %s", raw_file_path)
-    reduce_paths = config.get("reducepaths", False)
-    content: LangContent = parse_raw(raw_file_path, reduce_paths)
+    if content is None:
+        _LOGGER.info("parsing input file %s", raw_file_path)
+        reduce_paths = config.get("reducepaths", False)
+        content = parse_raw(
+            raw_file_path,
+            reduce_paths,
+            prune_internals=config.get("pruneinternals", False),
+            release_lines=config.get("releaselines", True),
+        )
     if content is None:
         raise RuntimeError(f"unable to parse {raw_file_path}")
     out_path = config.get("outpath")
@@ -51,12 +66,30 @@ def generate_control_flow_graph_config(config: Dict[Any, Any]):
         raise RuntimeError("no output path given")
     include_internals = config.get("includeinternals", False)
     item_filter: Filter = Filter.create(config)
+    ## converted by 'get_jobs_number'
+    jobs = config.get("jobs", 1)
+    split_functions = config.get("splitfunctions", False)
+    cache_dir = config.get("cachedir")
+    budget = FunctionBudget(
+        max_nodes=config.get("maxnodes"), max_time=config.get("maxtime"), max_statements=config.get("maxstatements")
+    )
     generate_control_flow_graph(
-        content, out_path, include_internals=include_internals, engine=config["engine"], item_filter=item_filter
+        content,
+        out_path,
+        include_internals=include_internals,
+        engine=config.get("engine", "dot"),
+        item_filter=item_filter,
+        jobs=jobs,
+        split_functions=split_functions,
+        budget=budget,
+        cache_dir=cache_dir,
     )
 
 
 def get_engine_file_extension(diagram_engine):
+    engines_list = get_engines_list(diagram_engine)
+    if engines_list:
+        diagram_engine = engines_list[0]
     if diagram_engine == "dot":
         return "dot"
     if diagram_engine == "plantuml":
@@ -64,46 +97,275 @@ def get_engine_file_extension(diagram_engine):
     return "dot"
 
 
+## engine can be given as list or as comma separated string, e.g. "dot,plantuml"
+def get_engines_list(diagram_engine) -> List[str]:
+    if not diagram_engine:
+        return []
+    if isinstance(diagram_engine, str):
+        diagram_engine = diagram_engine.split(",")
+    return [item.strip() for item in diagram_engine if item.strip()]
+
+
+## returns pairs (engine, output path)
+## in case of multiple engines output file extension is replaced by extension of engine
+def get_engines_outputs(diagram_engine, out_path) -> List[Tuple[str, str]]:
+    engines_list = get_engines_list(diagram_engine)
+    if not engines_list:
+        engines_list = ["dot"]
+    if len(engines_list) == 1:
+        return [(engines_list[0], out_path)]
+    out_base = os.path.splitext(out_path)[0]
+    ret_list = []
+    for engine_item in engines_list:
+        out_extension = get_engine_file_extension(engine_item)
+        ret_list.append((engine_item, f"{out_base}.{out_extension}"))
+    return ret_list
+
+
+def get_function_file_name(func_name: str, entry_id: str) -> str:
+    file_name = re.sub(r"[^A-Za-z0-9_.]+", "_", func_name).strip("_")
+    entry_num = entry_id.lstrip("@")
+    if not file_name:
+        return entry_num
+    return f"{file_name}_{entry_num}"
+
+
+## limits of analysis of single function - None means no limit
+class FunctionBudget(NamedTuple):
+    max_nodes: int = None  ## visited expression nodes
+    max_time: float = None  ## analysis time in seconds
+    max_statements: int = None  ## statements in output diagram
+
+
+class FunctionCost(NamedTuple):
+    nodes: int = 0
+    time: float = 0.0
+    statements: int = 0
+    truncated: str = None  ## reason of truncation
+    cached: bool = False  ## is result loaded from cache?
+
+
+class FunctionResult(NamedTuple):
+    info: LabeledCard
+    file_name: str
+    cost: FunctionCost
+
+
 def generate_control_flow_graph(
-    content: LangContent, out_path, include_internals=False, engine="dot", item_filter: Filter = None
+    content: LangContent,
+    out_path,
+    include_internals=False,
+    engine="dot",
+    item_filter: Filter = None,
+    jobs=1,
+    split_functions=False,
+    budget: "FunctionBudget" = None,
+    cache_dir=None,
 ):
+    """Generate control flow diagram(s).
+
+    Analysis of functions is done once and results are passed to all requested engines.
+    If 'split_functions' is set, then each function is stored in separate file in directory
+    named after 'out_path' and 'out_path' contains index of functions.
+    Functions exceeding 'budget' are replaced by placeholder card.
+    If 'cache_dir' is given, then results of unchanged functions are taken from cache.
+    """
     _LOGGER.info("generating control flow graph to %s", out_path)
     if item_filter is None:
         item_filter = Filter()
     parent_dir = os.path.abspath(os.path.join(out_path, os.pardir))
     os.makedirs(parent_dir, exist_ok=True)
 
+    engines_outputs = get_engines_outputs(engine, out_path)
+
     content.convert_entries()
 
-    graph_data = ControlFlowData(content, include_internals)
+    cache = None
+    if cache_dir:
+        cache = FunctionCache(cache_dir)
+    graph_data = ControlFlowData(content, include_internals, item_filter=item_filter, budget=budget, cache=cache)
+
+    functions_dir = None
+    if split_functions:
+        functions_dir = os.path.splitext(out_path)[0]
+        os.makedirs(functions_dir, exist_ok=True)
 
     _LOGGER.info("generating data")
-    graph_info = graph_data.generate_data()
+    functions_list = graph_data.generate_functions(jobs=jobs, functions_dir=functions_dir, engines=engines_outputs)
+    log_functions_summary(functions_list)
+
+    if split_functions:
+        _LOGGER.info("generating index")
+        functions_dir_name = os.path.basename(functions_dir)
+        for engine_item, engine_out_path in engines_outputs:
+            out_extension = get_engine_file_extension(engine_item)
+            index_dict = {}
+            for func_result in functions_list:
+                index_dict[func_result.info.label] = f"{functions_dir_name}/{func_result.file_name}.{out_extension}"
+            generate_index(engine_item, index_dict, engine_out_path)
+        _LOGGER.info("generating completed")
+        return
+
+    graph_info = {}
+    for func_result in functions_list:
+        graph_info[func_result.info.label] = func_result.info
 
     _LOGGER.info("generating diagram")
-    generate_diagram(engine, graph_info, out_path)
+    for engine_item, engine_out_path in engines_outputs:
+        generate_diagram(engine_item, graph_info, engine_out_path)
 
     _LOGGER.info("generating completed")
 
 
+def log_functions_summary(functions_list: List[FunctionResult]):
+    total_time = sum(func_result.cost.time for func_result in functions_list if not func_result.cost.cached)
+    truncated_list = [func_result for func_result in functions_list if func_result.cost.truncated]
+    cached_num = sum(1 for func_result in functions_list if func_result.cost.cached)
+    _LOGGER.info(
+        "analyzed %s functions in %.3fs, truncated: %s, cache hits: %s",
+        len(functions_list),
+        total_time,
+        len(truncated_list),
+        cached_num,
+    )
+    for func_result in truncated_list:
+        cost = func_result.cost
+        _LOGGER.warning(
+            "truncated function %s: %s (nodes: %s time: %.3fs statements: %s)",
+            func_result.info.label,
+            cost.truncated,
+            cost.nodes,
+            cost.time,
+            cost.statements,
+        )
+
+
+## returns body entry of function or None if function is not defined
+def get_function_body(function_decl: Entry) -> Entry:
+    func_body_list = function_decl.get_list("body")
+    if func_body_list and "undefined" in func_body_list:
+        func_body_list.remove("undefined")
+    if not func_body_list:
+        ## no body
+        return None
+    if len(func_body_list) > 1:
+        raise RuntimeError(f"multiple bodies not supported for entry {repr(function_decl)}")
+    return func_body_list[0]
+
+
+class FunctionCache:
+    """Directory storing analyzed functions and their rendered diagrams.
+
+    Items are keyed by hash of function body, so cache can be shared between builds.
+    """
+
+    ## properties not taken into account when calculating hash of function body
+    ## source location and links to sibling declarations do not affect control flow
+    IGNORE_PROPS = {"srcp", "chain", "dcls"}
+
+    ## properties identifying declarations referenced by function body (e.g. called functions)
+    ## definitions of the declarations do not affect control flow of the function
+    DECL_PROPS = {"name", "type", "scpe"}
+
+    ## increase when format of stored data changes
+    VERSION = 2
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    ## returns properties taken into account when calculating hash of given entry (None means all)
+    ## functions and non-local variables are hashed by qualified name and type, so change
+    ## of body of called function does not change hash of caller
+    @staticmethod
+    def get_hash_props(entry: Entry) -> Set[str]:
+        entry_type = entry.get_type()
+        if entry_type == "function_decl":
+            return FunctionCache.DECL_PROPS
+        if entry_type == "var_decl":
+            scope_entry = entry.get("scpe")
+            if scope_entry is None or scope_entry.get_type() != "function_decl":
+                return FunctionCache.DECL_PROPS
+        return None
+
+    ## 'body_hash' is content hash of function body calculated with 'IGNORE_PROPS'
+    def calculate_key(self, body_hash: str, *params) -> str:
+        key_items = [str(self.VERSION), body_hash] + [str(item) for item in params]
+        key_data = "\n".join(key_items)
+        return hashlib.blake2b(key_data.encode("utf-8"), digest_size=20).hexdigest()
+
+    def load_data(self, key: str) -> Any:
+        data_path = self._get_path(key, "pickle")
+        if not os.path.isfile(data_path):
+            return None
+        try:
+            with open(data_path, "rb") as data_file:
+                return pickle.load(data_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError) as exc:
+            _LOGGER.warning("unable to load cache item %s: %s", data_path, exc)
+            return None
+
+    def store_data(self, key: str, data: Any):
+        data_path = self._get_path(key, "pickle")
+        temp_path = f"{data_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as data_file:
+            pickle.dump(data, data_file)
+        os.replace(temp_path, data_path)
+
+    ## copy cached diagram to given path, returns False if there is no cached item
+    def load_fragment(self, key: str, extension: str, out_path) -> bool:
+        fragment_path = self._get_path(key, extension)
+        if not os.path.isfile(fragment_path):
+            return False
+        shutil.copyfile(fragment_path, out_path)
+        return True
+
+    def store_fragment(self, key: str, extension: str, file_path):
+        fragment_path = self._get_path(key, extension)
+        temp_path = f"{fragment_path}.{os.getpid()}.tmp"
+        shutil.copyfile(file_path, temp_path)
+        os.replace(temp_path, fragment_path)
+
+    def _get_path(self, key: str, extension: str):
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+
+## data shared with worker processes
+## workers are forked (see 'map_jobs_fork') after setting the value, so parsed content does not need to be pickled
+_WORKER_FLOW_DATA: "ControlFlowData" = None
+
+
+def _analyze_function_job(entry_id: str, functions_dir=None, engines=None):
+    return _WORKER_FLOW_DATA.analyze_function(entry_id, functions_dir, engines)
+
+
 class ControlFlowData:
 
-    def __init__(self, content: LangContent, include_internals=False):
+    def __init__(
+        self,
+        content: LangContent,
+        include_internals=False,
+        item_filter: Filter = None,
+        budget: FunctionBudget = None,
+        cache: FunctionCache = None,
+    ):
+        if item_filter is None:
+            item_filter = Filter()
+        if budget is None:
+            budget = FunctionBudget()
+        self.budget: FunctionBudget = budget
+        self.cache: FunctionCache = cache
         self.content = content
         self.include_internals = include_internals
+        self.item_filter: Filter = item_filter
         self.analyzer = StructAnalyzer(content, include_internals)
+        self.internal_flags = content.get_internal_flags()
 
-    def generate_data(self):
+    def generate_data(self, jobs=1):
         ret_dict = {}
-
-        all_entries = self.content.get_entries_all()
-        for entry in all_entries:
-            info_list: List[LabeledCard] = self.get_function_info(entry)
-            if info_list:
-                func_names = [item.label for item in info_list]
-                _LOGGER.info("found items %s for entry %s", func_names, entry.get_id())
-                for info in info_list:
-                    ret_dict[info.label] = info
+        functions_list = self.generate_functions(jobs=jobs)
+        for func_result in functions_list:
+            ret_dict[func_result.info.label] = func_result.info
 
         # dcls_list = self.content.get_entries("dcls")
         # for dcls_entry in dcls_list:
@@ -125,10 +387,103 @@ class ControlFlowData:
 
         return ret_dict
 
+    def generate_functions(self, jobs=1, functions_dir=None, engines=None) -> List[FunctionResult]:
+        """Analyze functions and return list of results (function data, function file name, analysis cost).
+
+        Order of items follows order of entries in content regardless of number of jobs.
+        If 'functions_dir' is given, then diagram of each function is written to the directory
+        (by worker analyzing the function) using all given engines.
+        """
+        global _WORKER_FLOW_DATA  # pylint: disable=W0603
+
+        all_entries = self.content.get_entries_all()
+        ## restrict to entries placed in source files passing 'paths' filter
+        source_ids = self.item_filter.get_source_entries_ids(self.content)
+        if source_ids is not None:
+            all_entries = [entry for entry in all_entries if entry.get_id() in source_ids]
+        func_ids = [entry.get_id() for entry in all_entries if self.is_function_selected(entry)]
+        _LOGGER.info("selected %s functions to analyze", len(func_ids))
+
+        jobs = min(get_jobs_number(jobs), len(func_ids))
+
+        results_list = []
+        if jobs < 2:
+            for entry_id in func_ids:
+                func_result = self.analyze_function(entry_id, functions_dir, engines)
+                results_list.append(func_result)
+        else:
+            _LOGGER.info("analyzing %s functions using %s processes", len(func_ids), jobs)
+            if self.cache is not None:
+                ## calculate hashes before fork, so workers do not repeat it
+                self.content.get_entries_hashes(FunctionCache.IGNORE_PROPS, FunctionCache.get_hash_props)
+            _WORKER_FLOW_DATA = self
+            try:
+                args_list = [(entry_id, functions_dir, engines) for entry_id in func_ids]
+                results_list = map_jobs_fork(_analyze_function_job, args_list, jobs=jobs)
+            finally:
+                _WORKER_FLOW_DATA = None
+
+        ret_list = []
+        for entry_id, func_list in zip(func_ids, results_list):
+            if not func_list:
+                continue
+            func_names = [item.info.label for item in func_list]
+            _LOGGER.info("found items %s for entry %s", func_names, entry_id)
+            ret_list.extend(func_list)
+        return ret_list
+
+    def is_function_selected(self, entry: Entry) -> bool:
+        if entry.get_type() != "function_decl":
+            return False
+        if self.internal_flags.is_internal(entry):
+            return False
+        func_name = get_function_full_name(entry)
+        return self.item_filter.check_include_element(func_name, entry.get("srcp"))
+
+    def analyze_function(self, entry_id: str, functions_dir=None, engines=None) -> List[FunctionResult]:
+        entry = self.content.get_entry_by_id(entry_id)
+        data_list: List[Tuple[LabeledCard, FunctionCost, str]] = self.get_function_data(entry)
+        if not data_list:
+            return []
+        ret_list = []
+        for info, cost, cache_key in data_list:
+            func_name = get_function_full_name(entry)
+            file_name = get_function_file_name(func_name, entry_id)
+            if functions_dir:
+                for engine_item, _ in engines:
+                    out_extension = get_engine_file_extension(engine_item)
+                    func_path = os.path.join(functions_dir, f"{file_name}.{out_extension}")
+                    if cache_key and self.cache.load_fragment(cache_key, out_extension, func_path):
+                        continue
+                    generate_diagram(engine_item, {info.label: info}, func_path)
+                    if cache_key:
+                        self.cache.store_fragment(cache_key, out_extension, func_path)
+            ret_list.append(FunctionResult(info, file_name, cost))
+        return ret_list
+
+    def get_function_cache_key(self, dcls_entry: Entry, label: str) -> str:
+        if self.cache is None:
+            return None
+        func_body = get_function_body(dcls_entry)
+        if func_body is None:
+            return None
+        ## hashes are calculated once for whole content
+        body_hash = self.content.get_entry_hash(
+            func_body.get_id(), FunctionCache.IGNORE_PROPS, FunctionCache.get_hash_props
+        )
+        return self.cache.calculate_key(body_hash, label, tuple(self.budget), self.include_internals)
+
     def get_function_info(self, dcls_entry: Entry) -> List[LabeledCard]:
+        data_list = self.get_function_data(dcls_entry)
+        if data_list is None:
+            return None
+        return [item[0] for item in data_list]
+
+    ## returns list of triples (function data, cost of analysis, cache key or None)
+    def get_function_data(self, dcls_entry: Entry) -> List[Tuple[LabeledCard, FunctionCost, str]]:
         if dcls_entry.get_type() != "function_decl":
             return None
-        if is_entry_language_internal(dcls_entry):
+        if self.internal_flags.is_internal(dcls_entry):
             return None
 
         note_entry = dcls_entry.get("note")
@@ -149,17 +504,47 @@ class ControlFlowData:
         func_type_entry = dcls_entry.get("type")
         func_returntype = get_function_ret(func_type_entry)
 
-        func_body_list = dcls_entry.get_list("body")
-        if func_body_list and "undefined" in func_body_list:
-            func_body_list.remove("undefined")
-        if not func_body_list:
+        func_body = get_function_body(dcls_entry)
+        if func_body is None:
             ## no body
             return []
-        if len(func_body_list) > 1:
-            raise RuntimeError(f"multiple bodies not supported for entry {repr(dcls_entry)}")
-        func_body = func_body_list[0]
-        analyzer = ScopeAnalysis(self.content)
-        statements = analyzer.analyze(func_body)
+
+        func_data = LabeledCard()
+        func_data.set_label(func_name, args_list, func_returntype)
+
+        cache_key = self.get_function_cache_key(dcls_entry, func_data.label)
+        if cache_key:
+            cached_data = self.cache.load_data(cache_key)
+            if cached_data is not None:
+                cached_info, cached_cost = cached_data
+                ret_list.append((cached_info, cached_cost._replace(cached=True), cache_key))
+                return ret_list
+
+        start_time = time.monotonic()
+        analyzer = ScopeAnalysis(self.content, max_nodes=self.budget.max_nodes, max_time=self.budget.max_time)
+        truncated = None
+        statements = None
+        try:
+            statements = analyzer.analyze(func_body)
+        except AnalysisLimitError as exc:
+            truncated = str(exc)
+            if isinstance(exc, AnalysisTimeLimitError):
+                ## elapsed time depends on load of machine, so result is not cached
+                cache_key = None
+        statements_num = count_statements(statements)
+        if truncated is None and self.budget.max_statements is not None:
+            if statements_num > self.budget.max_statements:
+                truncated = f"statements limit exceeded: {self.budget.max_statements}"
+        analysis_time = time.monotonic() - start_time
+        cost = FunctionCost(analyzer.visited_nodes, analysis_time, statements_num, truncated)
+
+        if truncated:
+            ## replace content by placeholder
+            func_data.subitems = [TypedStatement(f"analysis truncated: {truncated}", StatementType.UNSUPPORTED)]
+            if cache_key:
+                self.cache.store_data(cache_key, (func_data, cost))
+            ret_list.append((func_data, cost, cache_key))
+            return ret_list
 
         if func_name == "::main" and statements:
             ## remove last element - it's repeated "return" statement
@@ -184,11 +569,11 @@ class ControlFlowData:
         #     decl_node = TypedStatement("", StatementType.STOP)
         #     statements.append(decl_node)
 
-        func_data = LabeledCard()
-        func_data.set_label(func_name, args_list, func_returntype)
         func_data.subitems = statements
         func_data.has_return = True
-        ret_list.append(func_data)
+        if cache_key:
+            self.cache.store_data(cache_key, (func_data, cost))
+        ret_list.append((func_data, cost, cache_key))
         return ret_list
 
 
@@ -8,7 +8,7 @@
 
 import os
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterable
 
 from gccuml.langcontent import (
     LangContent,
@@ -29,34 +29,76 @@ from gccuml.diagram.plantuml.classdiagram import ClassDiagramGenerator
 from gccuml.langparser import parse_raw
 from gccuml.configyaml import Filter
 from gccuml.expressionanalyze import ScopeAnalysis, EntryExpression
-
+from gccuml.parallel import map_jobs
+from gccuml.io import open_output_file, prepare_filesystem_name
 
 _LOGGER = logging.getLogger(__name__)
 
 
 FIELD_ACCESS_CONVERT_DICT = {"priv": "private", "prot": "protected", "pub": "public"}
 
+INHERIT_GRAPH_SPLIT_MODES = ["components", "namespace"]
+
+## connected components with less classes are gathered in common diagram
+INHERIT_GRAPH_SPLIT_MIN_SIZE = 10
+
 
-def generate_inherit_graph_config(config: Dict[Any, Any]):
+## 'content' is parsed input file (if not given, then input file is parsed)
+def generate_inherit_graph_config(config: Dict[Any, Any], content: LangContent = None):
     input_files = config.get("inputfiles")
     if not input_files:
         raise RuntimeError("no input files given")
+    reduce_paths = config.get("reducepaths", False)
     if len(input_files) > 1:
-        raise RuntimeError(f"multiple input files not supported: {input_files}")
+        out_path = config.get("outpath")
+        if not out_path:
+            raise RuntimeError("no output path given")
+        generate_inherit_graph_files(
+            input_files,
+            out_path,
+            reduce_paths=reduce_paths,
+            item_filter=Filter.create(config),
+            jobs=config.get("jobs", "auto"),
+            prune_internals=config.get("pruneinternals", False),
+            split=config.get("split"),
+            split_min_size=config.get("splitminsize") or INHERIT_GRAPH_SPLIT_MIN_SIZE,
+            parse_cache_dir=config.get("parsecachedir"),
+        )
+        return
     raw_file_path = input_files[0]
-    _LOGGER.info("parsing input file %s", raw_file_path)
-    reduce_paths = config.get("reducepaths", False)
-    content: LangContent = parse_raw(raw_file_path, reduce_paths)
+    if content is None:
+        _LOGGER.info("parsing input file %s", raw_file_path)
+        content = parse_raw(
+            raw_file_path,
+            reduce_paths,
+            prune_internals=config.get("pruneinternals", False),
+            release_lines=config.get("releaselines", True),
+        )
     if content is None:
         raise RuntimeError(f"unable to parse {raw_file_path}")
     out_path = config.get("outpath")
     if not out_path:
         raise RuntimeError("no output path given")
     item_filter: Filter = Filter.create(config)
-    generate_inherit_graph(content, out_path, item_filter=item_filter)
-
-
-def generate_inherit_graph(content: LangContent, out_path, include_internals=False, item_filter: Filter = None):
+    generate_inherit_graph(
+        content,
+        out_path,
+        item_filter=item_filter,
+        split=config.get("split"),
+        split_min_size=config.get("splitminsize") or INHERIT_GRAPH_SPLIT_MIN_SIZE,
+        jobs=config.get("jobs", "auto"),
+    )
+
+
+def generate_inherit_graph(
+    content: LangContent,
+    out_path,
+    include_internals=False,
+    item_filter: Filter = None,
+    split=None,
+    split_min_size=INHERIT_GRAPH_SPLIT_MIN_SIZE,
+    jobs=1,
+):
     _LOGGER.info("generating inheritance graph to %s", out_path)
     if item_filter is None:
         item_filter = Filter()
@@ -65,28 +107,298 @@ def generate_inherit_graph(content: LangContent, out_path, include_internals=Fal
 
     content.convert_entries()
 
-    inherit_data = InheritanceData(content, include_internals)
+    inherit_data = InheritanceData(content, include_internals, item_filter=item_filter)
     classes_info = inherit_data.generate_data()
 
+    write_classes_info(classes_info, out_path, split=split, split_min_size=split_min_size, jobs=jobs)
+
+    _LOGGER.info("generating completed")
+
+
+def generate_inherit_graph_files(
+    input_files: List[str],
+    out_path,
+    reduce_paths=None,
+    include_internals=False,
+    item_filter: Filter = None,
+    jobs=1,
+    prune_internals=False,
+    split=None,
+    split_min_size=INHERIT_GRAPH_SPLIT_MIN_SIZE,
+    parse_cache_dir=None,
+):
+    """Generate inheritance graph of classes found in multiple translation units.
+
+    Files are processed in parallel and classes are merged, so each class is presented once.
+    Parsed files are reused from 'parse_cache_dir' if given (see 'parse_raw_dict').
+    """
+    _LOGGER.info("generating inheritance graph of %s files to %s", len(input_files), out_path)
+    parent_dir = os.path.abspath(os.path.join(out_path, os.pardir))
+    os.makedirs(parent_dir, exist_ok=True)
+
+    input_files = sorted(input_files)
+    args_list = [
+        (raw_file_path, reduce_paths, include_internals, item_filter, prune_internals, parse_cache_dir)
+        for raw_file_path in input_files
+    ]
+    classes_info_list = map_jobs(extract_classes_info, args_list, jobs=jobs)
+    classes_info = merge_classes_info(classes_info_list)
+
+    write_classes_info(classes_info, out_path, split=split, split_min_size=split_min_size, jobs=jobs)
+
+    _LOGGER.info("generating completed")
+
+
+def extract_classes_info(
+    raw_file_path,
+    reduce_paths=None,
+    include_internals=False,
+    item_filter: Filter = None,
+    prune_internals=False,
+    parse_cache_dir=None,
+) -> Dict[str, ClassDiagramGenerator.ClassData]:
+    _LOGGER.info("parsing input file %s", raw_file_path)
+    content: LangContent = parse_raw(
+        raw_file_path, reduce_paths, cache_dir=parse_cache_dir, prune_internals=prune_internals, release_lines=True
+    )
+    if content is None:
+        raise RuntimeError(f"unable to parse {raw_file_path}")
+    content.convert_entries()
+    inherit_data = InheritanceData(content, include_internals, item_filter=item_filter)
+    return inherit_data.generate_data()
+
+
+def merge_classes_info(
+    classes_info_list: List[Dict[str, ClassDiagramGenerator.ClassData]],
+) -> Dict[str, ClassDiagramGenerator.ClassData]:
+    """Merge classes extracted from multiple translation units.
+
+    Classes are deduplicated by qualified name (including template arguments). If class
+    is found in many units, then the most complete one is taken. Entry ids are local
+    to translation unit, so they are replaced by ids common for all units.
+    """
+    names_ids: Dict[str, str] = {}
+
+    def get_common_id(unit_index, item_id, item_name):
+        unit_id = f"@{unit_index}_{item_id.lstrip('@')}"
+        if item_name is None:
+            return unit_id
+        return names_ids.setdefault(item_name, unit_id)
+
+    ## find most complete data of each class
+    found_classes: Dict[str, ClassDiagramGenerator.ClassData] = {}
+    classes_units: Dict[str, int] = {}
+    for unit_index, classes_info in enumerate(classes_info_list):
+        for class_data in classes_info.values():
+            common_id = get_common_id(unit_index, class_data.item_id, class_data.name)
+            prev_data = found_classes.get(common_id)
+            if prev_data is not None and get_class_data_size(prev_data) >= get_class_data_size(class_data):
+                continue
+            found_classes[common_id] = class_data
+            classes_units[common_id] = unit_index
+
+    ## convert ids
+    ret_dict: Dict[str, ClassDiagramGenerator.ClassData] = {}
+    for common_id, class_data in found_classes.items():
+        unit_index = classes_units[common_id]
+        class_data.item_id = common_id
+        class_data.bases = [
+            base._replace(item_id=get_common_id(unit_index, base.item_id, base.name)) for base in class_data.bases
+        ]
+        class_data.inner_types = [
+            inner._replace(item_id=get_common_id(unit_index, inner.item_id, inner.name))
+            for inner in class_data.inner_types
+        ]
+        alias_type = class_data.aliasof
+        if alias_type is not None:
+            alias_id = get_common_id(unit_index, alias_type.item_id, alias_type.name)
+            class_data.aliasof = alias_type._replace(item_id=alias_id)
+        ret_dict[common_id] = class_data
+
+    _LOGGER.info("merged %s classes", len(ret_dict))
+    return ret_dict
+
+
+def get_class_data_size(class_data: ClassDiagramGenerator.ClassData) -> int:
+    return len(class_data.bases) + len(class_data.fields) + len(class_data.methods) + len(class_data.inner_types)
+
+
+def write_classes_info(
+    classes_info: Dict[str, ClassDiagramGenerator.ClassData],
+    out_path,
+    split=None,
+    split_min_size=INHERIT_GRAPH_SPLIT_MIN_SIZE,
+    jobs=1,
+):
+    """Write class diagram of given classes.
+
+    If 'split' is given, then classes are divided into parts (see 'partition_classes_info')
+    and each part is written in parallel to separate file ('{out_base}-{part}{out_ext}').
+    Then 'out_path' contains index diagram linking the parts.
+    """
+    if not split:
+        diagram_gen = ClassDiagramGenerator(classes_info)
+        diagram_gen.generate(out_path)
+        return
+
+    parts_list = partition_classes_info(classes_info, split, split_min_size)
+    _LOGGER.info("writing %s classes in %s parts", len(classes_info), len(parts_list))
+
+    out_base, out_ext = os.path.splitext(out_path)
+    parts_paths = []
+    args_list = []
+    for part_name, part_info in parts_list:
+        part_path = f"{out_base}-{prepare_filesystem_name(part_name)}{out_ext}"
+        parts_paths.append(part_path)
+        args_list.append((part_info, part_path))
+    map_jobs(generate_class_diagram, args_list, jobs=jobs)
+
+    _LOGGER.info("writing index to file %s", out_path)
+    with open_output_file(out_path) as out_file:
+        out_file.writelines(get_parts_index_lines(parts_list, parts_paths))
+
+
+def generate_class_diagram(classes_info: Dict[str, ClassDiagramGenerator.ClassData], out_path):
     diagram_gen = ClassDiagramGenerator(classes_info)
     diagram_gen.generate(out_path)
 
-    _LOGGER.info("generating completed")
+
+def partition_classes_info(
+    classes_info: Dict[str, ClassDiagramGenerator.ClassData], split, min_size=INHERIT_GRAPH_SPLIT_MIN_SIZE
+) -> List[Tuple[str, Dict[str, ClassDiagramGenerator.ClassData]]]:
+    """Return list of parts of classes: (name of part, classes dict).
+
+    Mode "components" groups classes connected by inheritance, alias or inner type. Each component
+    with at least 'min_size' classes is separate part (biggest first), smaller components are gathered
+    in part named "other". Mode "namespace" groups classes by top level namespace, part of global
+    namespace is named "global". Order of classes inside parts is preserved.
+    """
+    if split == "components":
+        parts_list: List[Tuple[str, List[str]]] = []
+        other_list: List[str] = []
+        for component in get_classes_components(classes_info):
+            if len(component) < min_size:
+                other_list.extend(component)
+                continue
+            parts_list.append((str(len(parts_list) + 1), component))
+        if other_list:
+            parts_list.append(("other", other_list))
+        ret_list = []
+        for part_name, part_ids in parts_list:
+            part_ids_set = set(part_ids)
+            part_info = {item_id: class_data for item_id, class_data in classes_info.items() if item_id in part_ids_set}
+            ret_list.append((part_name, part_info))
+        return ret_list
+    if split == "namespace":
+        parts_dict: Dict[str, Dict[str, ClassDiagramGenerator.ClassData]] = {}
+        for item_id, class_data in classes_info.items():
+            part_name = get_top_namespace(class_data.name)
+            parts_dict.setdefault(part_name, {})[item_id] = class_data
+        return list(parts_dict.items())
+    raise RuntimeError(f"unsupported split mode: '{split}'")
+
+
+## returns lists of ids of connected classes, biggest first
+def get_classes_components(classes_info: Dict[str, ClassDiagramGenerator.ClassData]) -> List[List[str]]:
+    ## union-find - classes outside of 'classes_info' (e.g. common base) also join components
+    parents_dict: Dict[str, str] = {}
+
+    def find_root(item_id):
+        root_id = parents_dict.setdefault(item_id, item_id)
+        while parents_dict[root_id] != root_id:
+            root_id = parents_dict[root_id]
+        while parents_dict[item_id] != root_id:
+            parents_dict[item_id], item_id = root_id, parents_dict[item_id]
+        return root_id
+
+    for item_id, class_data in classes_info.items():
+        from_root = find_root(item_id)
+        for linked_id in get_class_links(class_data):
+            to_root = find_root(linked_id)
+            if from_root != to_root:
+                parents_dict[to_root] = from_root
+
+    components_dict: Dict[str, List[str]] = {}
+    for item_id in classes_info:
+        components_dict.setdefault(find_root(item_id), []).append(item_id)
+    ## biggest first, equal ones in order of classes
+    return sorted(components_dict.values(), key=len, reverse=True)
+
+
+## returns ids of classes connected to given class (bases, inner types and aliased type)
+def get_class_links(class_data: ClassDiagramGenerator.ClassData) -> List[str]:
+    linked_ids = [base.item_id for base in class_data.bases]
+    linked_ids.extend(inner.item_id for inner in class_data.inner_types)
+    if class_data.aliasof is not None:
+        linked_ids.append(class_data.aliasof.item_id)
+    return linked_ids
+
+
+## returns name of top level namespace of qualified name, "global" for global namespace
+def get_top_namespace(qualified_name: str) -> str:
+    if not qualified_name:
+        return "global"
+    ## template arguments can contain namespaces
+    base_name = qualified_name.split("<", 1)[0]
+    names_list = base_name.lstrip(":").split("::")
+    if len(names_list) < 2 or not names_list[0]:
+        return "global"
+    return names_list[0]
+
+
+## lines of PlantUML diagram with node for each part linked to file of the part
+## parts are connected if class of one part refers class of another part
+def get_parts_index_lines(
+    parts_list: List[Tuple[str, Dict[str, ClassDiagramGenerator.ClassData]]], parts_paths: List[str]
+) -> Iterable[str]:
+    parts_index: Dict[str, int] = {}
+    for part_index, (_, part_info) in enumerate(parts_list):
+        for item_id in part_info:
+            parts_index[item_id] = part_index
+
+    yield "@startuml\n\n"
+    for part_index, (part_name, part_info) in enumerate(parts_list):
+        part_file = os.path.basename(parts_paths[part_index])
+        yield f"""rectangle "{part_name}\\n{len(part_info)} classes" as part_{part_index} [[{part_file}]]\n"""
+
+    links_dict: Dict[Tuple[int, int], int] = {}
+    for part_index, (_, part_info) in enumerate(parts_list):
+        for class_data in part_info.values():
+            for linked_id in get_class_links(class_data):
+                linked_index = parts_index.get(linked_id)
+                if linked_index is None or linked_index == part_index:
+                    continue
+                link_key = (part_index, linked_index)
+                links_dict[link_key] = links_dict.get(link_key, 0) + 1
+
+    if links_dict:
+        yield "\n"
+    for (from_index, to_index), links_num in links_dict.items():
+        yield f"""part_{from_index} ..> part_{to_index}: {links_num}\n"""
+    yield "\n@enduml\n"
 
 
 class InheritanceData:
 
-    def __init__(self, content: LangContent, include_internals: bool = False):
+    def __init__(self, content: LangContent, include_internals: bool = False, item_filter: Filter = None):
+        if item_filter is None:
+            item_filter = Filter()
         self.content: LangContent = content
         self.include_internals: bool = include_internals
+        self.item_filter: Filter = item_filter
         self.analyzer: StructAnalyzer = StructAnalyzer(content, include_internals)
 
     def generate_data(self) -> Dict[str, ClassDiagramGenerator.ClassData]:
         ret_dict: Dict[str, ClassDiagramGenerator.ClassData] = {}
 
+        ## entries placed in source files passing 'paths' filter (None means all)
+        source_ids = self.item_filter.get_source_entries_ids(self.content)
+
         ## add types
         type_decl_list = self.content.get_entries_by_type("type_decl")
         for type_decl_entry in type_decl_list:
+            if source_ids is not None and type_decl_entry.get_id() not in source_ids:
+                continue
             class_data_list = self._get_class_type_decl(type_decl_entry)
             if not class_data_list:
                 continue
@@ -98,6 +410,8 @@ class InheritanceData:
         ## add templates
         type_decl_list = self.content.get_entries_by_type("template_decl")
         for type_decl_entry in type_decl_list:
+            if source_ids is not None and type_decl_entry.get_id() not in source_ids:
+                continue
             class_data_list = self._get_class_template_decl(type_decl_entry)
             if not class_data_list:
                 continue
@@ -109,6 +423,8 @@ class InheritanceData:
         ## adding static fields
         var_decl_list = self.content.get_entries_by_type("var_decl")
         for var_decl_entry in var_decl_list:
+            if source_ids is not None and var_decl_entry.get_id() not in source_ids:
+                continue
             var_scope = var_decl_entry.get("scpe")
             if var_scope is None:
                 continue
@@ -134,7 +450,7 @@ class InheritanceData:
             field = ClassDiagramGenerator.ClassField(
                 field_name, field_type, field_access, is_static, bitfield_size, init_value
             )
-            class_data.fields.insert(0, field)
+            class_data.add_field(field, front=True)
             _LOGGER.info("added static field '%s' of type '%s' to class '%s'", field_name, field_type, scope_name)
 
         # ## add inner types
@@ -21,21 +21,43 @@ from gccuml.diagram.graphviz.memlayoutdiagram import MemoryLayoutDiagramGenerato
 from gccuml.langanalyze import StructAnalyzer, RecordInfo
 from gccuml.langparser import parse_raw
 from gccuml.configyaml import Filter
+from gccuml.parallel import map_jobs
 
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def generate_memory_layout_graph_config(config: Dict[Any, Any]):
+## 'content' is parsed input file (if not given, then input file is parsed)
+def generate_memory_layout_graph_config(config: Dict[Any, Any], content: LangContent = None):
     input_files = config.get("inputfiles")
     if not input_files:
         raise RuntimeError("no input files given")
+    reduce_paths = config.get("reducepaths", False)
     if len(input_files) > 1:
-        raise RuntimeError(f"multiple input files not supported: {input_files}")
+        out_path = config.get("outpath")
+        if not out_path:
+            raise RuntimeError("no output path given")
+        generate_memory_layout_graph_files(
+            input_files,
+            out_path,
+            reduce_paths=reduce_paths,
+            include_internals=config.get("includeinternals", False),
+            graphnote=config.get("graphnote"),
+            item_filter=Filter.create(config),
+            jobs=config.get("jobs", "auto"),
+            prune_internals=config.get("pruneinternals", False),
+            parse_cache_dir=config.get("parsecachedir"),
+        )
+        return
     raw_file_path = input_files[0]
-    _LOGGER.info("parsing input file %s", raw_file_path)
-    reduce_paths = config.get("reducepaths", False)
-    content: LangContent = parse_raw(raw_file_path, reduce_paths)
+    if content is None:
+        _LOGGER.info("parsing input file %s", raw_file_path)
+        content = parse_raw(
+            raw_file_path,
+            reduce_paths,
+            prune_internals=config.get("pruneinternals", False),
+            release_lines=config.get("releaselines", True),
+        )
     if content is None:
         raise RuntimeError(f"unable to parse {raw_file_path}")
     out_path = config.get("outpath")
@@ -69,6 +91,73 @@ def generate_memory_layout_graph(
     _LOGGER.info("generating completed")
 
 
+def generate_memory_layout_graph_files(
+    input_files: List[str],
+    out_path,
+    reduce_paths=None,
+    include_internals=False,
+    graphnote=None,
+    item_filter: Filter = None,
+    jobs=1,
+    prune_internals=False,
+    parse_cache_dir=None,
+):
+    """Generate memory layout graph of structures found in multiple translation units.
+
+    Files are processed in parallel and structures are merged by qualified name.
+    Parsed files are reused from 'parse_cache_dir' if given (see 'parse_raw_dict').
+    """
+    _LOGGER.info("generating memory layout graph of %s files to %s", len(input_files), out_path)
+    parent_dir = os.path.abspath(os.path.join(out_path, os.pardir))
+    os.makedirs(parent_dir, exist_ok=True)
+
+    input_files = sorted(input_files)
+    args_list = [
+        (raw_file_path, reduce_paths, include_internals, item_filter, prune_internals, parse_cache_dir)
+        for raw_file_path in input_files
+    ]
+    mem_info_list = map_jobs(extract_memory_layout_info, args_list, jobs=jobs)
+    mem_info = merge_memory_layout_info(mem_info_list)
+
+    diagram_gen = MemoryLayoutDiagramGenerator(mem_info)
+    diagram_gen.generate(out_path, graphnote=graphnote)
+
+    _LOGGER.info("generating completed")
+
+
+def extract_memory_layout_info(
+    raw_file_path,
+    reduce_paths=None,
+    include_internals=False,
+    item_filter: Filter = None,
+    prune_internals=False,
+    parse_cache_dir=None,
+) -> Dict[str, StructData]:
+    _LOGGER.info("parsing input file %s", raw_file_path)
+    content: LangContent = parse_raw(
+        raw_file_path, reduce_paths, cache_dir=parse_cache_dir, prune_internals=prune_internals, release_lines=True
+    )
+    if content is None:
+        raise RuntimeError(f"unable to parse {raw_file_path}")
+    content.convert_entries()
+    mem_data = MemoryLayoutData(content, include_internals, item_filter=item_filter)
+    return mem_data.generate_data()
+
+
+## structures are identified by qualified name (including template arguments)
+## if structure is found in many translation units, then the one with most fields is taken
+def merge_memory_layout_info(mem_info_list: List[Dict[str, StructData]]) -> Dict[str, StructData]:
+    ret_dict: Dict[str, StructData] = {}
+    for mem_info in mem_info_list:
+        for struct_name, struct_data in mem_info.items():
+            prev_data = ret_dict.get(struct_name)
+            if prev_data is not None and len(prev_data.fields) >= len(struct_data.fields):
+                continue
+            ret_dict[struct_name] = struct_data
+    _LOGGER.info("merged %s structures", len(ret_dict))
+    return ret_dict
+
+
 class MemoryLayoutData:
 
     def __init__(self, content: LangContent, include_internals=False, item_filter: Filter = None):
@@ -81,8 +170,12 @@ class MemoryLayoutData:
 
     def generate_data(self) -> Dict[str, StructData]:
         ret_dict = {}
+        ## entries placed in source files passing 'paths' filter (None means all)
+        source_ids = self.item_filter.get_source_entries_ids(self.content)
         dcls_list = self.content.get_entries("dcls")
         for dcls_entry in dcls_list:
+            if source_ids is not None and dcls_entry.get_id() not in source_ids:
+                continue
             info_list: List[StructData] = self.get_class_info(dcls_entry)
             if info_list:
                 for info in info_list:
@@ -24,11 +24,13 @@ from gccuml.langcontent import (
     Entry,
     EntryTreeNode,
     EntryTreeDepthFirstTraversal,
-    is_entry_language_internal,
+    EntryInternalFlags,
     is_entry_prop_internal,
     EntryTree,
     LangContent,
     get_full_name,
+    get_string_cst_value,
+    STRING_CST_ESCAPE_HTML,
 )
 from gccuml.io import write_file
 from gccuml.vizjs import DATA_DIR
@@ -41,7 +43,8 @@ from gccuml.configyaml import Filter
 _LOGGER = logging.getLogger(__name__)
 
 
-def print_html_config(config: Dict[Any, Any]):
+## 'content' is parsed input file (if not given, then input file is parsed)
+def print_html_config(config: Dict[Any, Any], content: LangContent = None):
     if not config["progressbar"]:
         disable_progressar()
 
@@ -51,9 +54,10 @@ def print_html_config(config: Dict[Any, Any]):
     if len(input_files) > 1:
         raise RuntimeError(f"multiple input files not supported: {input_files}")
     raw_file_path = input_files[0]
-    _LOGGER.info("parsing input file %s", raw_file_path)
-    reduce_paths = config.get("reducepaths", False)
-    content: LangContent = parse_raw(raw_file_path, reduce_paths)
+    if content is None:
+        _LOGGER.info("parsing input file %s", raw_file_path)
+        reduce_paths = config.get("reducepaths", False)
+        content = parse_raw(raw_file_path, reduce_paths)
     if content is None:
         raise RuntimeError(f"unable to parse {raw_file_path}")
 
@@ -90,7 +94,14 @@ def print_html(
     _LOGGER.info("main page: file://%s/@1.html", out_dir)
 
 
-def generate_entry_local_graph(entry: Entry, depends_dict: Dict[str, List[Any]], include_internals=True) -> Graph:
+def generate_entry_local_graph(
+    entry: Entry,
+    depends_dict: Dict[str, List[Any]],
+    include_internals=True,
+    internal_flags: EntryInternalFlags = None,
+) -> Graph:
+    if internal_flags is None:
+        internal_flags = EntryInternalFlags()
     entry_graph = EntryDotGraph()
     entry_graph.get_base_graph().set_rankdir("LR")
     entry_graph.add_node(entry, "red")
@@ -102,7 +113,7 @@ def generate_entry_local_graph(entry: Entry, depends_dict: Dict[str, List[Any]],
             continue
         add_hyperlink = True
         if not include_internals:
-            if is_entry_language_internal(entry_val):
+            if internal_flags.is_internal(entry_val):
                 add_hyperlink = False
         entry_graph.add_edge_forward(entry, entry_val, entry_prop, with_hyperlink=add_hyperlink, to_node_prefix="to_")
 
@@ -111,7 +122,7 @@ def generate_entry_local_graph(entry: Entry, depends_dict: Dict[str, List[Any]],
     for dep_entry, entry_prop in dep_list:
         add_hyperlink = True
         if not include_internals:
-            if is_entry_language_internal(dep_entry):
+            if internal_flags.is_internal(dep_entry):
                 add_hyperlink = False
         entry_graph.add_edge_backward(
             dep_entry, entry, entry_prop, with_hyperlink=add_hyperlink, from_node_prefix="from_"
@@ -124,6 +135,10 @@ def generate_entry_local_graph(entry: Entry, depends_dict: Dict[str, List[Any]],
 def print_html_pages(entry_tree: EntryTree, out_dir, generate_page_graph, use_vizjs, jobs=None):
     content = entry_tree.content
     include_internals = entry_tree.include_internals
+    internal_flags = None
+    if not include_internals:
+        ## classify once, flags are passed to subprocesses
+        internal_flags = content.get_internal_flags()
 
     depends_dict: Dict[str, List[Any]] = content.get_parents_dict()
 
@@ -149,7 +164,9 @@ def print_html_pages(entry_tree: EntryTree, out_dir, generate_page_graph, use_vi
     elif jobs < 2:
         node_list_size = len(node_list)
         _LOGGER.info("nodes num: %s", node_list_size)
-        generate_content_list(node_list, depends_dict, out_dir, generate_page_graph, use_vizjs)
+        generate_content_list(
+            node_list, depends_dict, out_dir, generate_page_graph, use_vizjs, internal_flags=internal_flags
+        )
         return
 
     process_num = jobs
@@ -168,7 +185,16 @@ def print_html_pages(entry_tree: EntryTree, out_dir, generate_page_graph, use_vi
         for proc_index, chunk_item in enumerate(chunks_list):
             async_result = process_pool.apply_async(
                 generate_content_list,
-                [chunk_item, depends_dict, out_dir, generate_page_graph, use_vizjs, include_internals, proc_index],
+                [
+                    chunk_item,
+                    depends_dict,
+                    out_dir,
+                    generate_page_graph,
+                    use_vizjs,
+                    include_internals,
+                    proc_index,
+                    internal_flags,
+                ],
             )
             result_queue.append(async_result)
 
@@ -180,10 +206,20 @@ def print_html_pages(entry_tree: EntryTree, out_dir, generate_page_graph, use_vi
 
 
 def generate_content_list(
-    node_list, depends_dict, out_dir, generate_page_graph, use_vizjs, include_internals=False, proc_index=0
+    node_list,
+    depends_dict,
+    out_dir,
+    generate_page_graph,
+    use_vizjs,
+    include_internals=False,
+    proc_index=0,
+    internal_flags: EntryInternalFlags = None,
 ):
     node_page_gen = NodePageGenerator(
-        include_internals=include_internals, generate_page_graph=generate_page_graph, use_vizjs=use_vizjs
+        include_internals=include_internals,
+        generate_page_graph=generate_page_graph,
+        use_vizjs=use_vizjs,
+        internal_flags=internal_flags,
     )
     # node_page_gen.generate_from_list(node_list, depends_dict, out_dir)
 
@@ -223,11 +259,14 @@ def chunks(data_list, chunk_size):
 
 class NodePageGenerator:
 
-    def __init__(self, include_internals=False, generate_page_graph=True, use_vizjs=True):
+    def __init__(self, include_internals=False, generate_page_graph=True, use_vizjs=True, internal_flags=None):
+        if internal_flags is None:
+            internal_flags = EntryInternalFlags()
         self.include_internals = include_internals
         self.generate_page_graph = generate_page_graph
         self.use_vizjs = use_vizjs
-        self.node_printer = NodePrinter(include_internals)
+        self.internal_flags: EntryInternalFlags = internal_flags
+        self.node_printer = NodePrinter(include_internals, internal_flags)
 
     # def generate_from_tree(self, entry_tree: EntryTreeNode, depends_dict, out_dir):
     #     traversal = EntryTreeDepthFirstTraversal()
@@ -264,7 +303,9 @@ class NodePageGenerator:
         graph_img_content = ""
 
         if self.generate_page_graph:
-            graph: Graph = generate_entry_local_graph(entry, depends_dict, include_internals=self.include_internals)
+            graph: Graph = generate_entry_local_graph(
+                entry, depends_dict, include_internals=self.include_internals, internal_flags=self.internal_flags
+            )
 
             if self.use_vizjs:
                 graph_text = graph.toString()
@@ -403,8 +444,11 @@ function toggle_element(element) {{
 
 
 class NodePrinter:
-    def __init__(self, include_internals=False):
+    def __init__(self, include_internals=False, internal_flags: EntryInternalFlags = None):
+        if internal_flags is None:
+            internal_flags = EntryInternalFlags()
         self.include_internals = include_internals
+        self.internal_flags: EntryInternalFlags = internal_flags
         # self.node_fields_content = {}
         # self.entry_printer = EntryPrinter(include_internals)
 
@@ -477,7 +521,7 @@ class NodePrinter:
     #     return content
 
     def print_node_old(self, node: EntryTreeNode):
-        printer = EntryPrinter(include_internals=self.include_internals)
+        printer = EntryPrinter(include_internals=self.include_internals, internal_flags=self.internal_flags)
         EntryTreeDepthFirstTraversal.traverse(node, self._print_single_node, [printer, node])
         printer.close_sections()
         return printer.get_content()
@@ -497,31 +541,38 @@ class NodePrinter:
 
 
 class EntryPrinter:
-    def __init__(self, include_internals=False):
+    def __init__(self, include_internals=False, internal_flags: EntryInternalFlags = None):
+        if internal_flags is None:
+            internal_flags = EntryInternalFlags()
         self.include_internals = include_internals
+        self.internal_flags: EntryInternalFlags = internal_flags
         self.content_list = []
         self.recent_depth = -1
 
     def get_content(self):
         return "".join(self.content_list)
 
-    def print_item(self, entry, level, _parent: Entry, prop: str):
+    def print_item(self, entry, level, parent: Entry, prop: str):
         if not self.include_internals:
-            if is_entry_language_internal(entry):
+            if self.internal_flags.is_internal(entry):
                 # internal function - do not go deeper
                 return False
 
         self.close_sections(level)
-        head = self.print_head(entry, prop)
+        head = self.print_head(entry, prop, parent)
 
         self.content_list.append(head)
         self.content_list.append("""<div class="entryindent">\n""")
         return True
 
-    def print_head(self, entry, prop):
+    def print_head(self, entry, prop, parent: Entry = None):
         prefix_content = f"""<span onclick='toggle_element(this);'>{prop}:</span> """
         if prop is None:
             prefix_content = ""
+        if prop == "strg" and isinstance(parent, Entry) and parent.get_type() == "string_cst":
+            ## string value escaped for HTML by escaping policy
+            entry_value = get_string_cst_value(parent, STRING_CST_ESCAPE_HTML)
+            return print_head_value(entry_value, prefix_content=prefix_content)
         head = print_head(entry, prefix_content=prefix_content, print_label=True)
         return head
 
@@ -534,7 +585,7 @@ class EntryPrinter:
 def print_head(entry, prefix_content="", postfix_content="", print_label=False):
     if not isinstance(entry, Entry):
         entry_value = escape_html(entry)
-        return f"""<div class="entryhead">{prefix_content}{entry_value}{postfix_content}</div>\n"""
+        return print_head_value(entry_value, prefix_content=prefix_content, postfix_content=postfix_content)
     label_content = ""
     if print_label:
         label_content = " " + get_full_name(entry)
@@ -544,6 +595,11 @@ def print_head(entry, prefix_content="", postfix_content="", print_label=False):
     )
 
 
+## 'entry_value' has to be already escaped
+def print_head_value(entry_value: str, prefix_content="", postfix_content=""):
+    return f"""<div class="entryhead">{prefix_content}{entry_value}{postfix_content}</div>\n"""
+
+
 def get_entry_id_href(entry: Entry):
     entry_id = entry.get_id()
     return f"""<a href="{entry_id}.html">{entry_id}</a>"""
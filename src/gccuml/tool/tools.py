@@ -6,45 +6,68 @@
 # LICENSE file in the root directory of this source tree.
 #
 
+import os
 import io
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Set, Tuple
 import json
 
+import graphviz
+
 from showgraph.graphviz import Graph, set_node_style
 
 from gccuml.langcontent import (
     Entry,
-    EntryTreeDepthFirstTraversal,
-    print_entry_tree,
+    EntryTreeNode,
+    iter_entry_tree_lines,
     EntryTree,
     LangContent,
     get_full_name,
+    get_decl_namespace_list,
 )
-from gccuml.io import write_file, read_file
-from gccuml.langparser import parse_raw
-
+from gccuml.io import write_file, read_file, open_output_file, prepare_filesystem_name
+from gccuml.langparser import parse_raw, extract_sub_content_dict, write_raw_file
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def process_tools_config(config: Dict[Any, Any]):
+## 'content' is parsed input file (if not given, then input file is parsed)
+def process_tools_config(config: Dict[Any, Any], content: LangContent = None):
     input_files = config.get("inputfiles")
     if not input_files:
         raise RuntimeError("no input files given")
     raw_file_path = input_files[-1]
-    _LOGGER.info("parsing input file %s", raw_file_path)
-    reduce_paths = config.get("reducepaths", False)
-    content: LangContent = parse_raw(raw_file_path, reduce_paths)
+    if content is None:
+        _LOGGER.info("parsing input file %s", raw_file_path)
+        reduce_paths = config.get("reducepaths", False)
+        content = parse_raw(raw_file_path, reduce_paths, prune_internals=config.get("pruneinternals", False))
     if content is None:
         raise RuntimeError(f"unable to parse {raw_file_path}")
 
     out_types_fields = config["outtypefields"]
     if out_types_fields:
         _LOGGER.info("dumping types dict")
-        types_fields = content.get_types_fields()
-        types_str = json.dumps(types_fields, indent=4)
-        write_file(out_types_fields, types_str)
+        types_fields = content.get_types_fields(
+            jobs=config.get("jobs", 1), max_values=config.get("typefieldsmaxvalues")
+        )
+        with open_output_file(out_types_fields) as out_file:
+            json.dump(types_fields, out_file, indent=4)
+
+    out_entry_hashes = config.get("outentryhashes")
+    if out_entry_hashes:
+        _LOGGER.info("dumping entries hashes to %s", out_entry_hashes)
+        ignore_props = config.get("hashignoreprops")
+        entries_hashes = content.get_entries_hashes(ignore_props)
+        hashes_str = json.dumps(entries_hashes, indent=4)
+        write_file(out_entry_hashes, hashes_str)
+
+    out_sub_dump = config.get("outsubdump")
+    if out_sub_dump:
+        roots_list = config.get("subdumproots")
+        if not roots_list:
+            raise RuntimeError("no roots of sub dump given")
+        _LOGGER.info("writing sub dump to %s", out_sub_dump)
+        write_sub_dump(content, roots_list, out_sub_dump)
 
     include_internals = config["includeinternals"]
     entry_tree: EntryTree = EntryTree(content)
@@ -56,40 +79,269 @@ def process_tools_config(config: Dict[Any, Any]):
 
     if config["outbiggraph"]:
         _LOGGER.info("dumping nodes dot representation to %s", config["outbiggraph"])
-        generate_big_graph(entry_tree, config["outbiggraph"])
+        generate_big_graph(
+            entry_tree,
+            config["outbiggraph"],
+            split=config.get("biggraphsplit"),
+            dot_limit=config.get("biggraphdotlimit") or BIG_GRAPH_DOT_LIMIT,
+            render_limit=config.get("biggraphrenderlimit") or BIG_GRAPH_RENDER_LIMIT,
+        )
+
+
+## write raw file containing entries reachable from given roots (entry ids or qualified names of declarations)
+def write_sub_dump(content: LangContent, roots_list, out_path):
+    if content.content_lines is None:
+        raise RuntimeError("unable to write sub dump - raw lines are released")
+    roots_ids = find_entries_ids(content, roots_list)
+    sub_content_dict = extract_sub_content_dict(content.content_lines, roots_ids)
+    write_raw_file(sub_content_dict, out_path)
+
+
+## find ids of entries by ids (e.g. '@12') or qualified names of declarations (e.g. '::items::Abc1')
+def find_entries_ids(content: LangContent, names_list) -> List[str]:
+    ret_list = []
+    names_set = set()
+    for name in names_list:
+        if name.startswith("@"):
+            if content.get_entry_by_id(name) is None:
+                raise RuntimeError(f"unable to find entry {name}")
+            ret_list.append(name)
+            continue
+        names_set.add("::" + name.removeprefix("::"))
+    if not names_set:
+        return ret_list
+
+    found_names = set()
+    for entry in content.get_entries_all():
+        if not entry.get_type().endswith("_decl"):
+            continue
+        if entry.get_type() == "translation_unit_decl":
+            continue
+        name_list = get_decl_namespace_list(entry)
+        if not name_list:
+            continue
+        entry_name = "::".join(name_list)
+        if entry_name in names_set:
+            ret_list.append(entry.get_id())
+            found_names.add(entry_name)
+    for name in names_set - found_names:
+        _LOGGER.warning("unable to find declaration %s", name)
+    return ret_list
 
 
 def write_entry_tree(entry_tree: EntryTree, out_path, indent=2):
     tree_root = entry_tree.get_tree_root()
-    tree_content = print_entry_tree(tree_root, indent)
-    write_file(out_path, tree_content)
+    with open_output_file(out_path) as out_file:
+        out_file.writelines(iter_entry_tree_lines(tree_root, indent))
+
+
+## graphs with more nodes are laid out by "sfdp" instead of "dot"
+BIG_GRAPH_DOT_LIMIT = 2000
+
+## graphs with more nodes are written only in DOT format (image is not rendered)
+BIG_GRAPH_RENDER_LIMIT = 50000
+
+BIG_GRAPH_SPLIT_MODES = ["components", "namespace"]
+
+
+def generate_big_graph(
+    entry_tree: EntryTree,
+    out_path,
+    split=None,
+    dot_limit=BIG_GRAPH_DOT_LIMIT,
+    render_limit=BIG_GRAPH_RENDER_LIMIT,
+):
+    """Write graph of entry tree to DOT file and render image in format given by extension of 'out_path'.
+
+    DOT content is written next to image ('{out_path}.dot'). If 'out_path' has extension 'dot'
+    or 'gv', then image is not rendered. 'split' divides graph into separate files (see
+    'BigGraph.get_parts'). Image of part with more than 'dot_limit' nodes is rendered by
+    'sfdp' and part with more than 'render_limit' nodes is written only in DOT format.
+    """
+    big_graph = BigGraph(entry_tree.get_tree_root(), with_namespaces=split == "namespace")
+    parts_list = big_graph.get_parts(split)
+    _LOGGER.info("writing %s nodes in %s parts", len(big_graph.nodes), len(parts_list))
+
+    out_base, out_ext = os.path.splitext(out_path)
+    out_format = out_ext[1:]
+    for part_name, part_nodes in parts_list:
+        part_path = out_path
+        if part_name:
+            part_path = f"{out_base}-{prepare_filesystem_name(part_name)}{out_ext}"
+        nodes_num = len(big_graph.nodes) if part_nodes is None else len(part_nodes)
+
+        if out_format in ("dot", "gv"):
+            with open_output_file(part_path) as out_file:
+                big_graph.write_dot(out_file, part_nodes)
+            continue
+
+        dot_path = f"{part_path}.dot"
+        with open_output_file(dot_path) as out_file:
+            big_graph.write_dot(out_file, part_nodes)
+        if nodes_num > render_limit:
+            _LOGGER.warning("graph %s is too big to render (%s nodes), written only DOT file", dot_path, nodes_num)
+            continue
+        engine = "dot"
+        if nodes_num > dot_limit:
+            engine = "sfdp"
+        _LOGGER.info("rendering %s nodes to %s using %s", nodes_num, part_path, engine)
+        graphviz.render(engine, format=out_format, filepath=dot_path, outfile=part_path)
+
+
+class BigGraph:
+    """Graph of entry tree kept in plain containers, written to DOT file line by line.
+
+    Entries are identified by their ids, values (leafs of tree) get separate node for each occurrence.
+    """
+
+    def __init__(self, tree_root: EntryTreeNode, with_namespaces=False):
+        ## node id -> (label, is value node, name of partition)
+        self.nodes: Dict[str, Tuple[str, bool, str]] = {}
+        ## list of (from node id, to node id, property)
+        self.edges: List[Tuple[str, str, str]] = []
+        self.root_id: str = None
+        self._value_counter = 0
+        self._add_tree(tree_root, with_namespaces)
+
+    def _add_tree(self, tree_root: EntryTreeNode, with_namespaces):
+        self.root_id = self._get_node_id(tree_root.entry)
+        visit_list = [(tree_root, "")]
+        while visit_list:
+            tree_node, partition = visit_list.pop()
+            entry = tree_node.entry
+            if not isinstance(entry, Entry):
+                continue
+            node_id = self._get_node_id(entry)
+            if node_id in self.nodes:
+                ## repeated entry - already added
+                continue
+            if with_namespaces:
+                partition = get_namespace_partition(entry, partition)
+            self.nodes[node_id] = (get_entry_node_label(entry), False, partition)
+            for child_node in tree_node.items:
+                child_entry = child_node.entry
+                if isinstance(child_entry, Entry):
+                    child_id = self._get_node_id(child_entry)
+                else:
+                    child_id = f"v{self._value_counter}"
+                    self._value_counter += 1
+                    self.nodes[child_id] = (str(child_entry), True, partition)
+                self.edges.append((node_id, child_id, child_node.property))
+            visit_list.extend((child_node, partition) for child_node in reversed(tree_node.items))
+
+    def get_parts(self, split=None) -> List[Tuple[str, Set[str]]]:
+        """Return list of parts of graph: (name of part, set of nodes ids).
+
+        Without 'split' single part (named "") with all nodes (None) is returned. Mode
+        "components" returns connected components of graph without root node (root
+        connects everything). Mode "namespace" groups nodes by namespace declaration
+        they are placed in (first occurrence in tree), part of global namespace is named "global".
+        """
+        if not split:
+            return [("", None)]
+        if split == "components":
+            return self._get_components()
+        if split == "namespace":
+            parts_dict: Dict[str, Set[str]] = {}
+            for node_id, (_, _, partition) in self.nodes.items():
+                parts_dict.setdefault(partition or "global", set()).add(node_id)
+            return list(parts_dict.items())
+        raise RuntimeError(f"unsupported split mode: '{split}'")
+
+    def _get_components(self) -> List[Tuple[str, Set[str]]]:
+        ## union-find
+        parents_dict: Dict[str, str] = {node_id: node_id for node_id in self.nodes}
+
+        def find_root(node_id):
+            root_id = node_id
+            while parents_dict[root_id] != root_id:
+                root_id = parents_dict[root_id]
+            while parents_dict[node_id] != root_id:
+                parents_dict[node_id], node_id = root_id, parents_dict[node_id]
+            return root_id
+
+        for from_id, to_id, _ in self.edges:
+            if self.root_id in (from_id, to_id):
+                continue
+            from_root = find_root(from_id)
+            to_root = find_root(to_id)
+            if from_root != to_root:
+                parents_dict[to_root] = from_root
+
+        components_dict: Dict[str, Set[str]] = {}
+        for node_id in self.nodes:
+            if node_id == self.root_id:
+                continue
+            components_dict.setdefault(find_root(node_id), set()).add(node_id)
+        ## biggest first
+        components_list = sorted(components_dict.values(), key=len, reverse=True)
+        return [(str(index), component) for index, component in enumerate(components_list, 1)]
+
+    def write_dot(self, out_file, nodes_set: Set[str] = None):
+        """Write graph to DOT file.
+
+        If 'nodes_set' is given, then only the nodes and edges going out of them are written.
+        Targets of edges outside of the set are written as dashed nodes.
+        """
+        out_file.write("digraph use_graph {\n")
+        for node_id, (label, is_value, _) in self.nodes.items():
+            if nodes_set is not None and node_id not in nodes_set:
+                continue
+            out_file.write(get_big_graph_node_line(node_id, label, is_value))
+        outside_set = set()
+        for from_id, to_id, prop in self.edges:
+            if nodes_set is not None:
+                if from_id not in nodes_set:
+                    continue
+                if to_id not in nodes_set and to_id not in outside_set:
+                    outside_set.add(to_id)
+                    label = self.nodes[to_id][0]
+                    out_file.write(f"{quote_dot(to_id)} [shape=box, style=dashed, label={quote_dot(label)}];\n")
+            out_file.write(f"{quote_dot(from_id)} -> {quote_dot(to_id)} [label={quote_dot(prop)}];\n")
+        out_file.write("}\n")
+
+    def _get_node_id(self, entry: Entry) -> str:
+        entry_id = entry.get_id()
+        if entry_id is None:
+            return str(id(entry))
+        return entry_id
 
 
-def generate_big_graph(entry_tree: EntryTree, out_path):
-    tree_root = entry_tree.get_tree_root()
-    # print_entry_tree(tree_root)
-    nodes_list = EntryTreeDepthFirstTraversal.to_list(tree_root)
+## returns name of partition of entry: full name of namespace declaration or partition of parent entry
+def get_namespace_partition(entry: Entry, parent_partition: str) -> str:
+    if entry.get_type() != "namespace_decl":
+        return parent_partition
+    names_list = get_decl_namespace_list(entry)
+    if not names_list:
+        return parent_partition
+    ## global namespace is named "::"
+    return ".".join(name for name in names_list if name and name != "::")
 
-    entry_graph = EntryDotGraph()
 
-    # add nodes
-    for item in nodes_list:
-        node = item[0]
-        entry = node.entry
-        if isinstance(entry, Entry):
-            entry_graph.add_node(entry)
+def get_big_graph_node_line(node_id, label, is_value=False) -> str:
+    if is_value:
+        return (
+            f"{quote_dot(node_id)} [shape=box, label={quote_dot(label)}, tooltip={quote_dot(label)},"
+            ' style=filled, fillcolor="#dddddd"];\n'
+        )
+    return (
+        f"{quote_dot(node_id)} [shape=box, label={quote_dot(label)}, tooltip={quote_dot(label)},"
+        f" href={quote_dot(node_id + '.html')}];\n"
+    )
+
 
-    # add edges
-    for item in nodes_list:
-        node = item[0]
-        entry = node.entry
+## convert value to quoted DOT string
+def quote_dot(value) -> str:
+    value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{value}"'
 
-        for child_node in node.items:
-            child_entry = child_node.entry
-            prop = child_node.property
-            entry_graph.add_edge_forward(entry, child_entry, prop)
 
-    entry_graph.graph.write(out_path, file_format="png")
+def get_entry_node_label(entry: Entry) -> str:
+    node_label = f"{entry.get_id()} {entry.get_type()}"
+    entry_label = get_full_name(entry)
+    if entry_label:
+        node_label += f"\n{entry_label}"
+    return node_label
 
 
 class EntryDotGraph:
@@ -179,11 +431,7 @@ class EntryDotGraph:
         edge.set_label(prop)  # pylint: disable=E1101
 
     def _get_entry_label(self, entry: Entry) -> str:
-        node_label = f"{entry.get_id()} {entry.get_type()}"
-        entry_label = get_full_name(entry)
-        if entry_label:
-            node_label += f"\n{entry_label}"
-        return node_label
+        return get_entry_node_label(entry)
 
     def _get_entry_id(self, entry: Entry) -> str:
         if isinstance(entry, Entry):
@@ -17,6 +17,7 @@ from gccuml.abstracttraversal import (
     get_nodes_from_tree,
     get_nodes_from_tree_ancestors,
     NodeTreeDepthFirstIterator,
+    find_strongly_connected_components,
 )
 
 
@@ -139,3 +140,20 @@ class NodeTreeBreadthFirstTraversalTest(unittest.TestCase):
         nodes = NodeTreeBreadthFirstTraversal.to_list(tree, bottom_top=True)
         nodes_keys = [item[0].data[0] for item in nodes]
         self.assertEqual([111, 112, 121, 11, 12, 1], nodes_keys)
+
+
+class FindStronglyConnectedComponentsTest(unittest.TestCase):
+
+    def test_components(self):
+        graph_dict = {"a": ["b"], "b": ["c", "d"], "c": ["a"], "d": ["e"], "e": ["e"], "f": []}
+        components = find_strongly_connected_components(graph_dict.keys(), graph_dict.get, str)
+        components = [sorted(item) for item in components]
+        self.assertEqual([["e"], ["d"], ["a", "b", "c"], ["f"]], components)
+
+    def test_deep_chain(self):
+        graph_dict = {index: [index + 1] for index in range(0, 20000)}
+        graph_dict[20000] = []
+        components = find_strongly_connected_components([0], graph_dict.get, int)
+        self.assertEqual(20001, len(components))
+        self.assertEqual([20000], components[0])
+
@@ -8,8 +8,10 @@
 
 import unittest
 
+from gccuml.langcontent import LangContent
 from gccuml.langanalyze import get_entry_type_code_class
 from gccuml.expressionanalyze import (
+    ScopeAnalysis,
     OP_UNARY_DICT,
     OP_BINARY_DICT,
     OP_COMPARISON_DICT,
@@ -66,3 +68,47 @@ class CheckDictsTest(unittest.TestCase):
         for item in UNSUPPORTED_EXPRESSION_SET:
             item_type = get_entry_type_code_class(item)
             self.assertEqual("tcc_expression", item_type, item)
+
+
+class ScopeAnalysisTest(unittest.TestCase):
+
+    def test_analyze_deep_unary(self):
+        depth = 20000
+        data_dict = {
+            "@1": ("@1", "integer_type", [("algn", "32"), ("sign", "signed")]),
+            "@2": ("@2", "integer_cst", [("type", "@1"), ("int", "7")]),
+        }
+        prev_id = "@2"
+        for index in range(0, depth):
+            item_id = f"@{index + 3}"
+            data_dict[item_id] = (item_id, "negate_expr", [("type", "@1"), ("op 0", prev_id)])
+            prev_id = item_id
+        data_dict[f"@{depth + 3}"] = (f"@{depth + 3}", "expr_stmt", [("type", "@1"), ("expr", prev_id)])
+        content = LangContent(data_dict)
+
+        analyzer = ScopeAnalysis(content)
+        statements = analyzer.analyze(content.get_entry_by_id(f"@{depth + 3}"))
+
+        self.assertEqual(1, len(statements))
+        self.assertEqual("-" * depth + "7", statements[0].name)
+
+    def test_analyze_long_binary_chain(self):
+        length = 20000
+        data_dict = {
+            "@1": ("@1", "integer_type", [("algn", "32"), ("sign", "signed")]),
+            "@2": ("@2", "integer_cst", [("type", "@1"), ("int", "7")]),
+        }
+        prev_id = "@2"
+        for index in range(0, length):
+            item_id = f"@{index + 3}"
+            data_dict[item_id] = (item_id, "plus_expr", [("type", "@1"), ("op 0", prev_id), ("op 1", "@2")])
+            prev_id = item_id
+        data_dict[f"@{length + 3}"] = (f"@{length + 3}", "expr_stmt", [("type", "@1"), ("expr", prev_id)])
+        content = LangContent(data_dict)
+
+        analyzer = ScopeAnalysis(content)
+        statements = analyzer.analyze(content.get_entry_by_id(f"@{length + 3}"))
+
+        self.assertEqual(1, len(statements))
+        expected = "(" * (length - 1) + "7" + " + 7)" * (length - 1) + " + 7"
+        self.assertEqual(expected, statements[0].name)
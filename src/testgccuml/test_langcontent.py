@@ -8,7 +8,26 @@
 
 import unittest
 
-from gccuml.langcontent import LangContent, get_entry_tree, EntryTreeDepthFirstTraversal
+from testgccuml.data import get_data_path
+
+from gccuml.langcontent import (
+    LangContent,
+    Entry,
+    EntryInternalFlags,
+    EntryGraphCSR,
+    get_entry_tree,
+    summarize_types_fields,
+    merge_types_fields,
+    get_vector_items,
+    is_entry_language_internal,
+    EntryTreeDepthFirstTraversal,
+)
+from gccuml.langparser import parse_raw_dict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class GetEntryTeeTest(unittest.TestCase):
@@ -39,3 +58,251 @@ class GetEntryTeeTest(unittest.TestCase):
         nodes_list = EntryTreeDepthFirstTraversal.to_list(entry_tree)
 
         self.assertEqual(6, len(nodes_list))
+
+
+class GetEntriesHashesTest(unittest.TestCase):
+
+    def test_hash_ignores_ids(self):
+        data_dict = {
+            "@1": ("@1", "void_type", [("name", "@9"), ("algn", "8")]),
+            "@9": (
+                "@9",
+                "type_decl",
+                [("name", "@13"), ("type", "@1"), ("srcp", "<built-in>:0"), ("note", "artificial")],
+            ),
+            "@13": ("@13", "identifier_node", [("strg", "void"), ("lngt", "4")]),
+        }
+        moved_dict = {
+            "@1": ("@1", "identifier_node", [("strg", "void"), ("lngt", "4")]),
+            "@5": ("@5", "void_type", [("name", "@7"), ("algn", "8")]),
+            "@7": (
+                "@7",
+                "type_decl",
+                [("name", "@1"), ("type", "@5"), ("srcp", "<built-in>:0"), ("note", "artificial")],
+            ),
+        }
+        content = LangContent(data_dict)
+        moved_content = LangContent(moved_dict)
+
+        self.assertEqual(content.get_entry_hash("@1"), moved_content.get_entry_hash("@5"))
+        self.assertEqual(content.get_entry_hash("@9"), moved_content.get_entry_hash("@7"))
+        self.assertEqual(content.get_entry_hash("@13"), moved_content.get_entry_hash("@1"))
+        self.assertNotEqual(content.get_entry_hash("@1"), content.get_entry_hash("@9"))
+
+    def test_hash_changed_subentry(self):
+        data_dict = {
+            "@1": ("@1", "pointer_type", [("ptd", "@2")]),
+            "@2": ("@2", "identifier_node", [("strg", "abc"), ("lngt", "3")]),
+        }
+        changed_dict = {
+            "@1": ("@1", "pointer_type", [("ptd", "@2")]),
+            "@2": ("@2", "identifier_node", [("strg", "abd"), ("lngt", "3")]),
+        }
+        content = LangContent(data_dict)
+        changed_content = LangContent(changed_dict)
+        self.assertNotEqual(content.get_entry_hash("@1"), changed_content.get_entry_hash("@1"))
+
+    def test_hash_ignore_props(self):
+        data_dict = {
+            "@1": ("@1", "type_decl", [("name", "@2"), ("srcp", "file.cpp:10")]),
+            "@2": ("@2", "identifier_node", [("strg", "abc"), ("lngt", "3")]),
+        }
+        changed_dict = {
+            "@1": ("@1", "type_decl", [("name", "@2"), ("srcp", "file.cpp:20")]),
+            "@2": ("@2", "identifier_node", [("strg", "abc"), ("lngt", "3")]),
+        }
+        content = LangContent(data_dict)
+        changed_content = LangContent(changed_dict)
+        self.assertNotEqual(content.get_entry_hash("@1"), changed_content.get_entry_hash("@1"))
+        self.assertEqual(
+            content.get_entry_hash("@1", ignore_props=["srcp"]),
+            changed_content.get_entry_hash("@1", ignore_props=["srcp"]),
+        )
+
+
+class ReleaseContentLinesTest(unittest.TestCase):
+
+    def test_get_raw_lines(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content_dict = parse_raw_dict(raw_path)
+        content = LangContent(content_dict)
+        released_content = LangContent(content_dict, release_lines=True)
+        self.assertIsNone(released_content.content_lines)
+
+        self.assertEqual(list(content.get_raw_lines()), list(released_content.get_raw_lines()))
+        self.assertEqual(content.get_types_fields(), released_content.get_types_fields())
+        self.assertEqual(content.get_source_index(), released_content.get_source_index())
+
+    def test_get_raw_items_repeated(self):
+        data_dict = {
+            "@1": ("@1", "constructor", [("lngt", "2"), ("idx", "@2"), ("val", "@3"), ("idx", "@2"), ("val", "@4")]),
+            "@2": ("@2", "integer_cst", [("int", "0")]),
+            "@3": ("@3", "integer_cst", [("int", "1")]),
+            "@4": ("@4", "integer_cst", [("int", "2")]),
+        }
+        content = LangContent(data_dict, release_lines=True)
+        entry = content.get_entry_by_id("@1")
+        raw_list = [
+            (prop, value.get_id() if isinstance(value, Entry) else value) for prop, value in entry.get_raw_items()
+        ]
+        self.assertEqual(data_dict["@1"][2], raw_list)
+        self.assertEqual(
+            [[entry["idx_0"], entry["val_0"]], [entry["idx_1"], entry["val_1"]]],
+            entry.get_ordered_tuples(["idx", "val"]),
+        )
+
+
+class EntryListsTest(unittest.TestCase):
+
+    def test_repeated_props(self):
+        data_dict = {
+            "@1": ("@1", "constructor", [("lngt", "2"), ("idx", "@2"), ("val", "@3"), ("idx", "@2"), ("val", "@4")]),
+            "@2": ("@2", "integer_cst", [("int", "0")]),
+            "@3": ("@3", "integer_cst", [("int", "1")]),
+            "@4": ("@4", "integer_cst", [("int", "2")]),
+        }
+        content = LangContent(data_dict)
+        entry = content.get_entry_by_id("@1")
+        val_list = entry.get_list("val")
+        self.assertEqual(["@3", "@4"], [item.get_id() for item in val_list])
+        ## compatibility keys
+        self.assertIs(val_list[1], entry["val_1"])
+        self.assertIs(val_list[1], entry.get("val_1"))
+        self.assertNotIn("val_1", dict(entry))
+        self.assertIsNone(entry.get("val_2"))
+        self.assertIn(("val_1", val_list[1]), list(entry.iter_props()))
+        self.assertEqual([], entry.get_list("int"))
+
+        data_list = entry.get_indexed_tuples(["idx", "val"], 2)
+        self.assertEqual([[entry["idx_0"], entry["val_0"]], [entry["idx_1"], entry["val_1"]]], data_list)
+
+        new_entry = content.get_entry_by_id("@2")
+        entry.replace_data("val_0", new_entry)
+        self.assertIs(new_entry, entry.get_list("val")[0])
+
+    def test_vector(self):
+        data_dict = {
+            "@1": ("@1", "tree_vec", [("lngt", "2"), ("0", "@2"), ("1", "@3")]),
+            "@2": ("@2", "integer_cst", [("int", "0")]),
+            "@3": ("@3", "integer_cst", [("int", "1")]),
+        }
+        content = LangContent(data_dict)
+        vector = content.get_entry_by_id("@1")
+        self.assertEqual(["@2", "@3"], [item.get_id() for item in vector.get_vector()])
+        self.assertEqual(vector.get_vector(), get_vector_items(vector))
+        self.assertIs(vector["1"], vector.get_vector()[1])
+        self.assertNotIn("1", dict(vector))
+        with self.assertRaises(KeyError):
+            _ = vector["2"]
+
+    def test_iter_ordered_tuples(self):
+        data_dict = {
+            "@1": ("@1", "constructor", [("lngt", "3"), ("val", "@2"), ("idx", "@2"), ("val", "@3"), ("val", "@4")]),
+            "@2": ("@2", "integer_cst", [("int", "0")]),
+            "@3": ("@3", "integer_cst", [("int", "1")]),
+            "@4": ("@4", "integer_cst", [("int", "2")]),
+        }
+        content = LangContent(data_dict)
+        entry = content.get_entry_by_id("@1")
+        data_list = [
+            [item.get_id() if item else None for item in data_item]
+            for data_item in entry.iter_ordered_tuples(["idx", "val"])
+        ]
+        self.assertEqual([[None, "@2"], ["@2", "@3"], [None, "@4"]], data_list)
+
+
+class EntryInternalFlagsTest(unittest.TestCase):
+
+    def test_is_internal(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content = LangContent(parse_raw_dict(raw_path))
+        internal_flags = content.get_internal_flags()
+        internal_list = []
+        for entry in content.get_entries_all():
+            internal = is_entry_language_internal(entry)
+            self.assertEqual(internal, internal_flags.is_internal(entry), entry)
+            if internal:
+                internal_list.append(entry)
+        self.assertTrue(internal_list)
+        self.assertFalse(internal_flags.is_internal("value"))
+
+    def test_not_classified(self):
+        internal_flags = EntryInternalFlags()
+        entry = Entry({"_id": "@100", "_type": "field_decl"})
+        self.assertTrue(internal_flags.is_internal(entry))
+        self.assertEqual(13, len(internal_flags.known_bits))
+
+
+class TypesFieldsTest(unittest.TestCase):
+
+    def test_merge_chunks(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content = LangContent(parse_raw_dict(raw_path))
+        raw_lines = list(content.get_raw_lines())
+        summary = summarize_types_fields(raw_lines)
+        chunks_list = [
+            summarize_types_fields(raw_lines[index : index + 1000]) for index in range(0, len(raw_lines), 1000)
+        ]
+        merged = merge_types_fields(chunks_list)
+        self.assertEqual(summary, merged)
+
+        types_fields = content.get_types_fields()
+        ## identifiers of operators have only 'note' property
+        self.assertEqual({"mandatory": False, "values": ["<string>"]}, types_fields["identifier_node"]["strg"])
+        self.assertEqual(
+            {
+                "mandatory": False,
+                "values": ["<entry-id>"],
+                "allowedtypes": ["namespace_decl", "record_type", "translation_unit_decl"],
+            },
+            types_fields["function_decl"]["scpe"],
+        )
+
+    def test_max_values(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content = LangContent(parse_raw_dict(raw_path))
+        types_fields = content.get_types_fields()
+        limited_fields = content.get_types_fields(max_values=2)
+        self.assertNotEqual(types_fields, limited_fields)
+
+        srcp_data = types_fields["function_decl"]["srcp"]
+        limited_data = limited_fields["function_decl"]["srcp"]
+        self.assertNotIn("truncated", srcp_data)
+        self.assertEqual(srcp_data["values"][:2], limited_data["values"])
+        self.assertTrue(limited_data["truncated"])
+
+
+@unittest.skipIf(numpy is None, "NumPy not installed")
+class EntryGraphCSRTest(unittest.TestCase):
+
+    def test_parents_dict(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content = LangContent(parse_raw_dict(raw_path))
+        content.convert_entries()
+        parents_dict = content._calculate_parents_dict()  # pylint: disable=W0212
+        csr_dict = content.get_parents_dict()
+        self.assertEqual(parents_dict.keys(), csr_dict.keys())
+        for entry_id, parents_list in parents_dict.items():
+            csr_list = csr_dict[entry_id]
+            self.assertEqual([prop for _, prop in parents_list], [prop for _, prop in csr_list])
+            for (parent, _), (csr_parent, _) in zip(parents_list, csr_list):
+                self.assertIs(parent, csr_parent)
+
+    def test_graph(self):
+        graph = EntryGraphCSR(["@1", "@2", "@3", "@4"], ["type_a", "type_b", "type_a", "type_b"])
+        graph.set_edges([0, 0, 1, 2], ["prop_b", "prop_a", "prop_a", "prop_b"], [1, 2, 2, 0], sort_props=True)
+        self.assertEqual([0, 1, 0, 1], graph.types.tolist())
+        self.assertEqual(1, graph.get_type_code("type_b"))
+        self.assertEqual([0, 2, 3, 4, 4], graph.offsets.tolist())
+        self.assertEqual([2, 1, 2, 0], graph.targets.tolist())
+        self.assertEqual(["prop_b", "prop_a"], graph.props_list)
+        self.assertEqual([1, 0, 1, 0], graph.props.tolist())
+        self.assertEqual([1, 1, 2, 0], graph.get_in_degrees().tolist())
+
+        rev_offsets, rev_sources, rev_props = graph.get_reverse_edges()
+        self.assertEqual([0, 1, 2, 4, 4], rev_offsets.tolist())
+        self.assertEqual([2, 0, 0, 1], rev_sources.tolist())
+        self.assertEqual([0, 0, 1, 1], rev_props.tolist())
+
+        self.assertEqual([True, True, True, False], graph.get_reachable_mask([1]).tolist())
+        self.assertEqual([False, False, False, True], graph.get_reachable_mask([3]).tolist())
@@ -6,11 +6,31 @@
 # LICENSE file in the root directory of this source tree.
 #
 
+import os
 import unittest
+import tempfile
 from testgccuml.data import get_data_path
 
-from gccuml.langparser import ProprertiesConverter, convert_lines_to_dict, parse_raw
-from gccuml.langcontent import LangContent, Entry
+from gccuml.langparser import (
+    ProprertiesConverter,
+    convert_lines_to_dict,
+    parse_raw,
+    parse_raw_dict,
+    prune_content_dict,
+    is_content_entry_internal,
+    extract_sub_content_dict,
+    write_raw_file,
+    unescape_string_cst,
+    StringTable,
+)
+from gccuml.langcontent import (
+    LangContent,
+    Entry,
+    get_entry_name,
+    get_string_cst_value,
+    STRING_CST_ESCAPE_HTML,
+    STRING_CST_ESCAPE_HEX,
+)
 
 
 class ProprertiesConverterTest(unittest.TestCase):
@@ -238,5 +258,132 @@ class LangParserTest(unittest.TestCase):
         self.assertTrue(string_cst_entry)
         length = string_cst_entry.get("lngt")
         self.assertEqual(length, "3")
-        value = string_cst_entry.get("strg")
+        value = get_string_cst_value(string_cst_entry)
         self.assertEqual(value, "0xFF41FF")
+        ## raw bytes are kept
+        raw_value = string_cst_entry.get("strg")
+        self.assertEqual(b"\xffA\xff", unescape_string_cst(raw_value))
+
+    def test_string_cst_escape(self):
+        data_list = ["@1      string_cst       type: @2       strg: a\"b\\c  lngt: 6       "]
+        ret_dict = convert_lines_to_dict(data_list)
+        self.assertEqual(("strg", 'a"b\\c'), ret_dict["@1"][2][1])
+        content = LangContent({"@2": ("@2", "void_type", []), **ret_dict})
+        string_cst_entry: Entry = content.get_entry_by_id("@1")
+        self.assertEqual('a"b\\\\\\\\c', get_string_cst_value(string_cst_entry))
+        self.assertEqual("a&quot;b\\\\\\\\c", get_string_cst_value(string_cst_entry, STRING_CST_ESCAPE_HTML))
+        self.assertEqual("0x6122625C63", get_string_cst_value(string_cst_entry, STRING_CST_ESCAPE_HEX))
+
+    def test_parse_raw_dict_cache(self):
+        raw_path: str = get_data_path("string_cst_invalidchar.003l.raw")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            content_dict = parse_raw_dict(raw_path, cache_dir=cache_dir)
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+            cached_dict = parse_raw_dict(raw_path, cache_dir=cache_dir)
+            self.assertEqual(content_dict, cached_dict)
+            parse_raw_dict(raw_path, reducepaths="/tmp", cache_dir=cache_dir)
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+
+    def test_convert_lines_to_dict_shared_strings(self):
+        data_list = [
+            "@1      integer_type     name: @2       size: @3       algn: 64       prec: 64",
+            "@3      integer_cst      type: @1       int : 64",
+        ]
+        ret_dict = convert_lines_to_dict(data_list)
+        props_1 = ret_dict["@1"][2]
+        props_3 = ret_dict["@3"][2]
+        ## id and reference
+        self.assertIs(ret_dict["@3"][0], props_1[1][1])
+        ## repeated values
+        self.assertIs(props_1[2][1], props_3[1][1])
+        ## entry type and key taken from seed
+        self.assertIs(StringTable().get("integer_type"), ret_dict["@1"][1])
+
+    def test_string_table(self):
+        table = StringTable(max_value_length=4)
+        value = "".join(["ab", "cd"])
+        self.assertIs(value, table.get_value(value))
+        self.assertIs(value, table.get_value("".join(["ab", "cd"])))
+        self.assertGreater(table.saved_bytes, 0)
+        long_value = "abcde"
+        self.assertIs(long_value, table.get_value(long_value))
+        self.assertNotIn(long_value, table.table)
+
+
+class PruneContentDictTest(unittest.TestCase):
+
+    def test_is_content_entry_internal(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content_dict = parse_raw_dict(raw_path)
+        ## namespace 'std'
+        self.assertTrue(is_content_entry_internal(content_dict, "@231"))
+        ## global namespace
+        self.assertFalse(is_content_entry_internal(content_dict, "@1"))
+
+    def test_prune(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content_dict = parse_raw_dict(raw_path)
+        pruned_dict = prune_content_dict(content_dict)
+        self.assertLess(len(pruned_dict), len(content_dict) / 2)
+
+        ## all references point to kept entries
+        for _entry_id, entry_type, props_list in pruned_dict.values():
+            for prop_key, prop_val in props_list:
+                if prop_val.startswith("@") and not (prop_key == "strg" and entry_type == "string_cst"):
+                    self.assertIn(prop_val, pruned_dict)
+
+        content = LangContent(pruned_dict)
+        content.convert_entries()
+        full_content = parse_raw(raw_path)
+        full_content.convert_entries()
+        ## user classes are kept
+        classes_list = [entry.get_id() for entry in full_content.get_entries_by_type("record_type")]
+        for entry_id in classes_list:
+            full_entry = full_content.get_entry_by_id(entry_id)
+            srcp = full_entry.get("name").get("srcp") if full_entry.get("name") else None
+            if srcp and srcp.startswith("inherit_meths.cpp"):
+                self.assertIsNotNone(content.get_entry_by_id(entry_id))
+
+
+class SourceIndexTest(unittest.TestCase):
+
+    def test_get_source_index(self):
+        raw_path: str = get_data_path("inherit_args.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        source_index = content.get_source_index()
+        self.assertIn("<built-in>", source_index)
+        self.assertIn("inherit_args.cpp", source_index)
+        for entry_id in source_index["inherit_args.cpp"]:
+            entry = content.get_entry_by_id(entry_id)
+            self.assertTrue(entry.get("srcp").startswith("inherit_args.cpp:"))
+
+        entries_ids = content.get_entries_ids_by_source(lambda path: path.endswith(".cpp"))
+        self.assertEqual(set(source_index["inherit_args.cpp"]), entries_ids)
+
+
+class SubContentDictTest(unittest.TestCase):
+
+    def test_write_raw_file(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content_dict = parse_raw_dict(raw_path)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = os.path.join(temp_dir, "out.003l.raw")
+            write_raw_file(content_dict, out_path)
+            read_dict = parse_raw_dict(out_path)
+        self.assertEqual(content_dict, read_dict)
+
+    def test_extract(self):
+        raw_path: str = get_data_path("inherit_args.cpp.003l.raw")
+        content_dict = parse_raw_dict(raw_path)
+        ## namespace 'items'
+        sub_dict = extract_sub_content_dict(content_dict, ["@4"])
+        self.assertLess(len(sub_dict), len(content_dict) / 4)
+        ## dense ids
+        self.assertEqual([f"@{index + 1}" for index in range(len(sub_dict))], list(sub_dict.keys()))
+        root_entry = sub_dict["@1"]
+        self.assertEqual("namespace_decl", root_entry[1])
+
+        content = LangContent(sub_dict)
+        content.convert_entries()
+        classes_list = [get_entry_name(entry.get("name")) for entry in content.get_entries_by_type("record_type")]
+        self.assertIn("Abc1", classes_list)
@@ -0,0 +1,145 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import signal
+import unittest
+import tempfile
+import json
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+
+from testgccuml.data import get_data_path
+
+from gccuml.tool import batch
+from gccuml.tool.batch import BatchJob, BatchProcessor, SingleTaskExecutor, select_batch_job
+
+
+## original function (forked worker inherits patched module)
+PROCESS_BATCH_FILE = batch.process_batch_file
+
+
+def kill_process():
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+## kills worker process when processing file named 'killer'
+def kill_batch_file(raw_path, *args):
+    if "killer" in os.path.basename(raw_path):
+        kill_process()
+    return PROCESS_BATCH_FILE(raw_path, *args)
+
+
+class SelectBatchJobTest(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs_list = [
+            BatchJob(None, get_data_path("inherit_meths.cpp.003l.raw"), memory_factor=1),
+            BatchJob(None, get_data_path("string_cst_invalidchar.003l.raw"), memory_factor=1),
+        ]
+        self.jobs_list.sort(key=lambda job: job.file_size, reverse=True)
+
+    def test_no_limit(self):
+        largest = self.jobs_list[0]
+        job = select_batch_job(self.jobs_list, 1000000000)
+        self.assertIs(largest, job)
+
+    def test_fit_smaller(self):
+        smallest = self.jobs_list[-1]
+        job = select_batch_job(self.jobs_list, 10, memory_limit=smallest.memory + 10)
+        self.assertIs(smallest, job)
+        self.assertEqual(1, len(self.jobs_list))
+
+    def test_not_fit(self):
+        job = select_batch_job(self.jobs_list, 10, memory_limit=10)
+        self.assertIsNone(job)
+
+    def test_exceeding_alone(self):
+        largest = self.jobs_list[0]
+        job = select_batch_job(self.jobs_list, 0, memory_limit=10)
+        self.assertIs(largest, job)
+
+
+class BatchProcessorTest(unittest.TestCase):
+
+    def test_execute_failure(self):
+        raw_path = get_data_path("inherit_meths.cpp.003l.raw")
+        data_dir = os.path.dirname(raw_path)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            invalid_path = os.path.join(temp_dir, "invalid.003l.raw")
+            with open(raw_path, "r", encoding="utf-8") as raw_file:
+                raw_content = raw_file.read(4000)
+            with open(invalid_path, "w", encoding="utf-8") as invalid_file:
+                ## truncated dump
+                invalid_file.write(raw_content + "\n@1 invalid\n")
+            summary_path = os.path.join(temp_dir, "summary.jsonl")
+            batch = BatchProcessor(os.path.join(temp_dir, "out"), ["inheritgraph"], jobs=1)
+            summary = batch.execute([(temp_dir, invalid_path), (data_dir, raw_path)], summary_path)
+
+            self.assertEqual(2, summary["files"])
+            self.assertEqual([invalid_path], summary["failed"])
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out", "inherit_meths.cpp.inheritgraph.puml")))
+
+            with open(summary_path, "r", encoding="utf-8") as summary_file:
+                lines_list = [json.loads(line) for line in summary_file]
+            self.assertEqual(3, len(lines_list))
+            ## largest file goes first
+            self.assertEqual(raw_path, lines_list[0]["rawfile"])
+            self.assertIsNone(lines_list[0]["error"])
+            self.assertIn("summary", lines_list[-1])
+
+    @unittest.skipUnless(hasattr(signal, "SIGKILL"), "requires SIGKILL")
+    def test_execute_worker_killed(self):
+        raw_path = get_data_path("inherit_meths.cpp.003l.raw")
+        with tempfile.TemporaryDirectory() as temp_dir:
+            files_list = []
+            for file_name in ["first.003l.raw", "killer.003l.raw", "last.003l.raw"]:
+                file_path = os.path.join(temp_dir, file_name)
+                with open(raw_path, "r", encoding="utf-8") as raw_file:
+                    with open(file_path, "w", encoding="utf-8") as out_file:
+                        out_file.write(raw_file.read())
+                files_list.append((temp_dir, file_path))
+            killer_path = files_list[1][1]
+
+            batch_proc = BatchProcessor(os.path.join(temp_dir, "out"), ["inheritgraph"], jobs=2)
+            with mock.patch.object(batch, "process_batch_file", kill_batch_file):
+                summary = batch_proc.execute(files_list)
+
+            self.assertEqual(3, summary["files"])
+            self.assertEqual([killer_path], summary["failed"])
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out", "first.inheritgraph.puml")))
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out", "last.inheritgraph.puml")))
+
+            ## executor used before Python 3.11
+            batch_proc = BatchProcessor(os.path.join(temp_dir, "out2"), ["inheritgraph"], jobs=2)
+            with mock.patch.object(batch, "process_batch_file", kill_batch_file):
+                with mock.patch.object(batch, "create_batch_executor", lambda jobs: SingleTaskExecutor()):
+                    summary = batch_proc.execute(files_list)
+
+            self.assertEqual(3, summary["files"])
+            self.assertEqual([killer_path], summary["failed"])
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out2", "first.inheritgraph.puml")))
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out2", "last.inheritgraph.puml")))
+
+
+class SingleTaskExecutorTest(unittest.TestCase):
+
+    def test_process_per_task(self):
+        with SingleTaskExecutor() as executor:
+            futures_list = [executor.submit(os.getpid) for _ in range(3)]
+            pids_set = {future.result() for future in futures_list}
+        self.assertEqual(3, len(pids_set))
+        self.assertNotIn(os.getpid(), pids_set)
+
+    def test_worker_killed(self):
+        with SingleTaskExecutor() as executor:
+            killed_future = executor.submit(kill_process)
+            valid_future = executor.submit(os.getpid)
+            with self.assertRaises(BrokenProcessPool):
+                killed_future.result()
+            self.assertNotEqual(os.getpid(), valid_future.result())
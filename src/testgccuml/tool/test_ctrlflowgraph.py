@@ -6,4 +6,228 @@
 # LICENSE file in the root directory of this source tree.
 #
 
-# import unittest
+import os
+import unittest
+import tempfile
+import multiprocessing
+from unittest import mock
+
+from testgccuml.data import get_data_path
+
+from gccuml import langcontent
+from gccuml.langcontent import LangContent
+from gccuml.langparser import parse_raw
+from gccuml.configyaml import Filter
+from gccuml.tool.ctrlflowgraph import (
+    ControlFlowData,
+    FunctionBudget,
+    FunctionCache,
+    get_engines_outputs,
+    get_function_file_name,
+    get_function_body,
+)
+from gccuml.diagram.activitydata import TypedStatement, StatementType
+from gccuml.expressionanalyze import ScopeAnalysis
+
+
+class ControlFlowDataTest(unittest.TestCase):
+
+    def test_generate_functions_jobs(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        flow_data = ControlFlowData(content)
+        serial_list = flow_data.generate_functions(jobs=1)
+        parallel_list = flow_data.generate_functions(jobs=2)
+
+        self.assertTrue(serial_list)
+        serial_labels = [(item.info.label, item.file_name) for item in serial_list]
+        parallel_labels = [(item.info.label, item.file_name) for item in parallel_list]
+        self.assertEqual(serial_labels, parallel_labels)
+
+    def test_generate_functions_jobs_spawn(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        flow_data = ControlFlowData(content)
+        serial_list = flow_data.generate_functions(jobs=1)
+        ## workers have to be forked regardless of default start method
+        start_method = multiprocessing.get_start_method(allow_none=True)
+        multiprocessing.set_start_method("spawn", force=True)
+        try:
+            parallel_list = flow_data.generate_functions(jobs=2)
+        finally:
+            multiprocessing.set_start_method(start_method, force=True)
+
+        serial_labels = [(item.info.label, item.file_name) for item in serial_list]
+        parallel_labels = [(item.info.label, item.file_name) for item in parallel_list]
+        self.assertEqual(serial_labels, parallel_labels)
+
+    def test_generate_functions_filter(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        item_filter = Filter(
+            include_dict={"elements": ["items::Abc1::callfunc1", {"r": "items::Abc3::callfunc6_.*"}]},
+            exclude_dict={"elements": ["::items::Abc3::callfunc6_ref2"]},
+        )
+        flow_data = ControlFlowData(content, item_filter=item_filter)
+        functions_list = flow_data.generate_functions()
+
+        labels_list = [item.info.label for item in functions_list]
+        self.assertEqual(
+            [
+                "::items::Abc1::callfunc1() -> void",
+                "::items::Abc3::callfunc6_ptr1() -> int *",
+                "::items::Abc3::callfunc6_ptr2() -> int const *",
+                "::items::Abc3::callfunc6_ref() -> int &",
+            ],
+            labels_list,
+        )
+
+    def test_generate_functions_filter_paths(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        item_filter = Filter(include_dict={"paths": ["other.cpp"]})
+        flow_data = ControlFlowData(content, item_filter=item_filter)
+        self.assertEqual([], flow_data.generate_functions())
+
+        item_filter = Filter(include_dict={"paths": ["inherit_meths.cpp"], "namespaces": ["items::Abc2"]})
+        flow_data = ControlFlowData(content, item_filter=item_filter)
+        labels_list = [item.info.label for item in flow_data.generate_functions()]
+        self.assertEqual(["::items::Abc2::callfunc2() -> void"], labels_list)
+
+    def test_generate_functions_budget(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        item_filter = Filter(include_dict={"elements": ["items::Abc3::callfunc5"]})
+        flow_data = ControlFlowData(content, item_filter=item_filter)
+        functions_list = flow_data.generate_functions()
+        self.assertEqual(1, len(functions_list))
+        cost = functions_list[0].cost
+        self.assertEqual(None, cost.truncated)
+        self.assertGreater(cost.nodes, 1)
+
+        budget = FunctionBudget(max_nodes=1)
+        flow_data = ControlFlowData(content, item_filter=item_filter, budget=budget)
+        functions_list = flow_data.generate_functions()
+        self.assertEqual(1, len(functions_list))
+        func_result = functions_list[0]
+        self.assertEqual("::items::Abc3::callfunc5() -> bool", func_result.info.label)
+        self.assertEqual("visited nodes limit exceeded: 1", func_result.cost.truncated)
+        subitems = func_result.info.subitems
+        self.assertEqual(1, len(subitems))
+        self.assertIsInstance(subitems[0], TypedStatement)
+        self.assertEqual(StatementType.UNSUPPORTED, subitems[0].type)
+
+        budget = FunctionBudget(max_statements=0)
+        flow_data = ControlFlowData(content, item_filter=item_filter, budget=budget)
+        functions_list = flow_data.generate_functions()
+        self.assertEqual("statements limit exceeded: 0", functions_list[0].cost.truncated)
+
+    def test_generate_functions_cache(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            flow_data = ControlFlowData(content, cache=FunctionCache(cache_dir))
+            first_list = flow_data.generate_functions()
+            self.assertTrue(first_list)
+            self.assertFalse(any(item.cost.cached for item in first_list))
+
+            flow_data = ControlFlowData(content, cache=FunctionCache(cache_dir))
+            second_list = flow_data.generate_functions()
+            self.assertTrue(all(item.cost.cached for item in second_list))
+            self.assertEqual([item.info.label for item in first_list], [item.info.label for item in second_list])
+
+    def test_generate_functions_cache_warm(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            flow_data = ControlFlowData(content, cache=FunctionCache(cache_dir))
+            first_list = flow_data.generate_functions(functions_dir=cache_dir, engines=[("dot", None)])
+
+            ## rerun on newly parsed content
+            content = parse_raw(raw_path)
+            content.convert_entries()
+            hashes_mock = mock.Mock(wraps=langcontent.calculate_entries_hashes)
+            analyze_mock = mock.Mock(wraps=ScopeAnalysis.analyze)
+            with mock.patch.object(langcontent, "calculate_entries_hashes", hashes_mock):
+                with mock.patch.object(ScopeAnalysis, "analyze", analyze_mock):
+                    flow_data = ControlFlowData(content, cache=FunctionCache(cache_dir))
+                    second_list = flow_data.generate_functions(functions_dir=cache_dir, engines=[("dot", None)])
+
+            ## single hashing pass over whole content and no analysis
+            self.assertEqual(1, hashes_mock.call_count)
+            self.assertEqual(0, analyze_mock.call_count)
+            self.assertEqual(len(first_list), len(second_list))
+            self.assertTrue(all(item.cost.cached for item in second_list))
+
+    def test_generate_functions_cache_callee_changed(self):
+        raw_path: str = get_data_path("inherit_ctors.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            flow_data = ControlFlowData(content, cache=FunctionCache(cache_dir))
+            flow_data.generate_functions()
+
+            ## '::items::Abc3D::__dt_del' (@170) calls '::items::Abc3D::__dt_comp' (@135) - change body of callee
+            content = parse_raw(raw_path)
+            content.convert_entries()
+            other_body = get_function_body(content.get_entry_by_id("@110"))
+            self.assertIsNotNone(other_body)
+            content.get_entry_by_id("@135")["body"] = other_body
+
+            flow_data = ControlFlowData(content, cache=FunctionCache(cache_dir))
+            cached_dict = {item.info.label: item.cost.cached for item in flow_data.generate_functions()}
+            self.assertFalse(cached_dict["::items::Abc3D::__dt_comp() -> void"])
+            self.assertTrue(cached_dict["::items::Abc3D::__dt_del() -> void"])
+
+    def test_generate_functions_cache_time_limit(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        content.convert_entries()
+
+        item_filter = Filter(include_dict={"elements": ["items::Abc3::callfunc5"]})
+        budget = FunctionBudget(max_time=0.0)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with mock.patch.object(ScopeAnalysis, "TIME_CHECK_INTERVAL", 1):
+                for _ in range(2):
+                    cache = FunctionCache(cache_dir)
+                    flow_data = ControlFlowData(content, item_filter=item_filter, budget=budget, cache=cache)
+                    functions_list = flow_data.generate_functions()
+                    self.assertEqual(1, len(functions_list))
+                    cost = functions_list[0].cost
+                    self.assertEqual("time limit exceeded: 0.0s", cost.truncated)
+                    ## result truncated by time is not stored
+                    self.assertFalse(cost.cached)
+            self.assertEqual([], os.listdir(cache_dir))
+
+
+class GetEnginesOutputsTest(unittest.TestCase):
+
+    def test_single(self):
+        outputs = get_engines_outputs("plantuml", "out/diagram.txt")
+        self.assertEqual([("plantuml", "out/diagram.txt")], outputs)
+
+    def test_multiple(self):
+        outputs = get_engines_outputs("dot, plantuml", "out/diagram.dot")
+        self.assertEqual([("dot", "out/diagram.dot"), ("plantuml", "out/diagram.puml")], outputs)
+
+
+class GetFunctionFileNameTest(unittest.TestCase):
+
+    def test_name(self):
+        file_name = get_function_file_name("::items::Abc<int>::call()", "@123")
+        self.assertEqual("items_Abc_int_call_123", file_name)
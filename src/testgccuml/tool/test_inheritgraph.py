@@ -6,19 +6,46 @@
 # LICENSE file in the root directory of this source tree.
 #
 
+import os
 import unittest
+import tempfile
+import pickle
+from unittest import mock
 from typing import List, Dict
 
 from testgccuml.data import get_data_path
 
+from gccuml import langparser
 from gccuml.langcontent import LangContent
 from gccuml.langparser import parse_raw
-from gccuml.tool.inheritgraph import InheritanceData
+from gccuml.configyaml import Filter
+from gccuml.tool.inheritgraph import (
+    InheritanceData,
+    generate_inherit_graph_config,
+    extract_classes_info,
+    merge_classes_info,
+    partition_classes_info,
+    get_top_namespace,
+    write_classes_info,
+)
 from gccuml.diagram.plantuml.classdiagram import ClassDiagramGenerator
 
 
 class GetClassesInfoTest(unittest.TestCase):
 
+    def test_filter_paths(self):
+        inherit_raw_path: str = get_data_path("inherit_args.cpp.003l.raw")
+        content: LangContent = parse_raw(inherit_raw_path)
+        content.convert_entries()
+
+        item_filter = Filter(exclude_dict={"paths": ["inherit_args.cpp"]})
+        classes_info = InheritanceData(content, item_filter=item_filter).generate_data()
+        self.assertEqual({}, classes_info)
+
+        item_filter = Filter(include_dict={"paths": ["inherit_args.cpp"]})
+        classes_info = InheritanceData(content, item_filter=item_filter).generate_data()
+        self.assertEqual(1, len(classes_info))
+
     def test_args(self):
         inherit_raw_path: str = get_data_path("inherit_args.cpp.003l.raw")
         content: LangContent = parse_raw(inherit_raw_path)
@@ -351,3 +378,132 @@ class GetClassesInfoTest(unittest.TestCase):
 
         method_list = info.methods
         self.assertEqual(0, len(method_list))
+
+
+class MergeClassesInfoTest(unittest.TestCase):
+
+    def test_merge_repeated(self):
+        meths_raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        args_raw_path: str = get_data_path("inherit_args.cpp.003l.raw")
+        meths_info = extract_classes_info(meths_raw_path)
+        args_info = extract_classes_info(args_raw_path)
+
+        classes_info = merge_classes_info([meths_info, args_info, extract_classes_info(meths_raw_path)])
+
+        names_list = sorted(item.name for item in classes_info.values())
+        ## '::items::Abc1' is defined in both files
+        expected_names = sorted({item.name for item in list(meths_info.values()) + list(args_info.values())})
+        self.assertEqual(expected_names, names_list)
+        for item_id, class_data in classes_info.items():
+            self.assertEqual(item_id, class_data.item_id)
+            for base in class_data.bases:
+                self.assertIn(base.item_id, classes_info)
+
+
+class GenerateInheritGraphConfigTest(unittest.TestCase):
+
+    def test_multiple_files_jobs(self):
+        input_files = [get_data_path("inherit_meths.cpp.003l.raw"), get_data_path("inherit_args.cpp.003l.raw")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = os.path.join(temp_dir, "out.puml")
+            config = {"inputfiles": input_files, "outpath": out_path, "jobs": 2}
+            generate_inherit_graph_config(config)
+            with open(out_path, "r", encoding="utf-8") as out_file:
+                content = out_file.read()
+            self.assertIn("Abc1", content)
+
+            ## the same as processed in single process
+            single_path = os.path.join(temp_dir, "single.puml")
+            config = {"inputfiles": input_files, "outpath": single_path, "jobs": 1}
+            generate_inherit_graph_config(config)
+            with open(single_path, "r", encoding="utf-8") as out_file:
+                self.assertEqual(out_file.read(), content)
+
+    def test_multiple_files_parse_cache(self):
+        input_files = [get_data_path("inherit_meths.cpp.003l.raw"), get_data_path("inherit_args.cpp.003l.raw")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = os.path.join(temp_dir, "cache")
+            out_path = os.path.join(temp_dir, "out.puml")
+            config = {"inputfiles": input_files, "outpath": out_path, "jobs": 1, "parsecachedir": cache_dir}
+            generate_inherit_graph_config(config)
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+
+            ## parsed files are loaded from cache
+            with mock.patch.object(langparser, "read_raw_file") as read_mock:
+                generate_inherit_graph_config(config)
+            read_mock.assert_not_called()
+
+
+class ClassDataTest(unittest.TestCase):
+
+    def test_add_field(self):
+        class_data = ClassDiagramGenerator.ClassData("@1", "Abc")
+        class_data.fields = [ClassDiagramGenerator.ClassField("field1", "int", "public", False)]
+        class_data.add_field(ClassDiagramGenerator.ClassField("field2", "int", "public", False))
+        class_data.add_field(ClassDiagramGenerator.ClassField("static1", "int", "public", True), front=True)
+        class_data.add_field(ClassDiagramGenerator.ClassField("static2", "int", "public", True), front=True)
+        self.assertTrue(class_data.has_field("field1"))
+        self.assertTrue(class_data.has_field("static2"))
+        self.assertFalse(class_data.has_field("field3"))
+        self.assertEqual(["static2", "static1", "field1", "field2"], [field.name for field in class_data.fields])
+
+    def test_add_inner(self):
+        class_data = ClassDiagramGenerator.ClassData("@1", "Abc")
+        class_data.inner_types = [ClassDiagramGenerator.TypeAlias("@2", "Inner1")]
+        class_data.add_inner(ClassDiagramGenerator.TypeAlias("@3", "Inner2"))
+        self.assertTrue(class_data.has_inner("@2"))
+        self.assertTrue(class_data.has_inner("@3"))
+        self.assertFalse(class_data.has_inner("@4"))
+        self.assertEqual(2, len(class_data.inner_types))
+
+
+class PartitionClassesInfoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.classes_info = {}
+        for item_id, name in [("@1", "::ns1::Base"), ("@2", "::ns1::Derived"), ("@3", "::ns2::Item"), ("@4", "::Glob")]:
+            self.classes_info[item_id] = ClassDiagramGenerator.ClassData(item_id, name)
+        self.classes_info["@2"].bases.append(ClassDiagramGenerator.ClassBase("@1", "::ns1::Base", "public"))
+        self.classes_info["@4"].bases.append(ClassDiagramGenerator.ClassBase("@3", "::ns2::Item", "public"))
+        self.classes_info["@4"].add_inner(ClassDiagramGenerator.TypeAlias("@5", "::Glob::Inner"))
+
+    def test_components(self):
+        parts_list = partition_classes_info(self.classes_info, "components", min_size=2)
+        self.assertEqual([("1", ["@1", "@2"]), ("2", ["@3", "@4"])], [(name, list(info)) for name, info in parts_list])
+
+    def test_components_other(self):
+        self.classes_info["@4"].bases.clear()
+        parts_list = partition_classes_info(self.classes_info, "components", min_size=2)
+        self.assertEqual(
+            [("1", ["@1", "@2"]), ("other", ["@3", "@4"])], [(name, list(info)) for name, info in parts_list]
+        )
+
+    def test_namespace(self):
+        parts_list = partition_classes_info(self.classes_info, "namespace")
+        self.assertEqual(
+            [("ns1", ["@1", "@2"]), ("ns2", ["@3"]), ("global", ["@4"])],
+            [(name, list(info)) for name, info in parts_list],
+        )
+
+    def test_top_namespace(self):
+        self.assertEqual("global", get_top_namespace("::Glob"))
+        self.assertEqual("ns1", get_top_namespace("::ns1::ns2::Item"))
+        self.assertEqual("global", get_top_namespace("::Wrapper<::ns1::Item>"))
+
+    def test_pickle(self):
+        ## parts are written in subprocesses
+        class_data = pickle.loads(pickle.dumps(self.classes_info["@4"]))
+        self.assertEqual(self.classes_info["@4"].bases, class_data.bases)
+        self.assertTrue(class_data.has_inner("@5"))
+
+    def test_write_index(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = os.path.join(temp_dir, "out.puml")
+            write_classes_info(self.classes_info, out_path, split="namespace", jobs=1)
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out-ns1.puml")))
+            self.assertTrue(os.path.isfile(os.path.join(temp_dir, "out-global.puml")))
+            with open(out_path, "r", encoding="utf-8") as out_file:
+                content = out_file.read()
+            self.assertIn("[[out-ns2.puml]]", content)
+            ## '::Glob' derives from '::ns2::Item'
+            self.assertIn("part_2 ..> part_1: 1", content)
@@ -0,0 +1,51 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+from unittest import mock
+
+from testgccuml.data import get_data_path
+
+from gccuml import langparser
+from gccuml.tool.memlayout import generate_memory_layout_graph_config
+
+
+class GenerateMemoryLayoutGraphConfigTest(unittest.TestCase):
+
+    def test_multiple_files_jobs(self):
+        input_files = [get_data_path("inherit_meths.cpp.003l.raw"), get_data_path("inherit_args.cpp.003l.raw")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = os.path.join(temp_dir, "out.dot")
+            config = {"inputfiles": input_files, "outpath": out_path, "jobs": 2}
+            generate_memory_layout_graph_config(config)
+            with open(out_path, "r", encoding="utf-8") as out_file:
+                content = out_file.read()
+            self.assertIn("Abc1", content)
+
+            ## the same as processed in single process
+            single_path = os.path.join(temp_dir, "single.dot")
+            config = {"inputfiles": input_files, "outpath": single_path, "jobs": 1}
+            generate_memory_layout_graph_config(config)
+            with open(single_path, "r", encoding="utf-8") as out_file:
+                self.assertEqual(out_file.read(), content)
+
+    def test_multiple_files_parse_cache(self):
+        input_files = [get_data_path("inherit_meths.cpp.003l.raw"), get_data_path("inherit_args.cpp.003l.raw")]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_dir = os.path.join(temp_dir, "cache")
+            out_path = os.path.join(temp_dir, "out.dot")
+            config = {"inputfiles": input_files, "outpath": out_path, "jobs": 1, "parsecachedir": cache_dir}
+            generate_memory_layout_graph_config(config)
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+
+            ## parsed files are loaded from cache
+            with mock.patch.object(langparser, "read_raw_file") as read_mock:
+                generate_memory_layout_graph_config(config)
+            read_mock.assert_not_called()
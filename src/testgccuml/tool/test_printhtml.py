@@ -0,0 +1,26 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import unittest
+
+from gccuml.langcontent import LangContent
+from gccuml.tool.printhtml import EntryPrinter
+
+
+class EntryPrinterTest(unittest.TestCase):
+
+    def test_print_item_string_cst(self):
+        data_dict = {
+            "@1": ("@1", "string_cst", [("strg", "<a>\n")]),
+        }
+        content = LangContent(data_dict)
+        entry = content.get_entry_by_id("@1")
+        sub_entries = dict(entry.get_sub_entries())
+        printer = EntryPrinter()
+        printer.print_item(sub_entries["strg"], 1, entry, "strg")
+        self.assertIn("</span> &lt;a&gt;\\\\n</div>", printer.get_content())
@@ -0,0 +1,79 @@
+#
+# Copyright (c) 2024, Arkadiusz Netczuk <dev.arnet@gmail.com>
+# All rights reserved.
+#
+# This source code is licensed under the BSD 3-Clause license found in the
+# LICENSE file in the root directory of this source tree.
+#
+
+import os
+import unittest
+import tempfile
+import gzip
+
+from testgccuml.data import get_data_path
+
+from gccuml.langcontent import LangContent, EntryTree, print_entry_tree
+from gccuml.langparser import parse_raw
+from gccuml.tool.tools import write_entry_tree, generate_big_graph, BigGraph
+
+
+class WriteEntryTreeTest(unittest.TestCase):
+
+    def test_write_gzip(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        entry_tree = EntryTree(content)
+        entry_tree.generate_tree()
+        tree_content = print_entry_tree(entry_tree.get_tree_root())
+        self.assertTrue(tree_content.startswith("entry: "))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = os.path.join(temp_dir, "tree.txt")
+            write_entry_tree(entry_tree, out_path)
+            with open(out_path, "r", encoding="utf-8") as out_file:
+                self.assertEqual(tree_content, out_file.read())
+
+            out_path = os.path.join(temp_dir, "tree.txt.gz")
+            write_entry_tree(entry_tree, out_path)
+            with gzip.open(out_path, "rt", encoding="utf-8") as out_file:
+                self.assertEqual(tree_content, out_file.read())
+
+
+class BigGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        raw_path: str = get_data_path("inherit_meths.cpp.003l.raw")
+        content: LangContent = parse_raw(raw_path)
+        self.entry_tree = EntryTree(content)
+        self.entry_tree.generate_tree()
+
+    def test_parts(self):
+        big_graph = BigGraph(self.entry_tree.get_tree_root(), with_namespaces=True)
+        self.assertEqual([("", None)], big_graph.get_parts())
+
+        components_list = big_graph.get_parts("components")
+        components_nodes = set()
+        for _, component in components_list:
+            self.assertFalse(components_nodes & component)
+            components_nodes.update(component)
+        self.assertEqual(set(big_graph.nodes.keys()) - {big_graph.root_id}, components_nodes)
+
+        namespace_dict = dict(big_graph.get_parts("namespace"))
+        self.assertIn(big_graph.root_id, namespace_dict["global"])
+        self.assertIn("std", namespace_dict)
+        self.assertEqual(len(big_graph.nodes), sum(len(part) for part in namespace_dict.values()))
+
+        self.assertRaises(RuntimeError, big_graph.get_parts, "invalid")
+
+    def test_write_dot(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            out_path = os.path.join(temp_dir, "graph.dot")
+            generate_big_graph(self.entry_tree, out_path, split="namespace")
+            self.assertFalse(os.path.exists(out_path))
+            with open(os.path.join(temp_dir, "graph-std.dot"), "r", encoding="utf-8") as out_file:
+                content = out_file.read()
+            self.assertTrue(content.startswith("digraph use_graph {\n"))
+            self.assertTrue(content.endswith("}\n"))
+            ## reference to entry outside of namespace
+            self.assertIn("style=dashed", content)